@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.models.signals import post_delete
+
 
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
+
+    def ready(self):
+        from .cache import check_profile_cache
+        from .stats import ad_deleted, review_deleted
+
+        # deletes (direct or cascaded) take their rows back out of ContractorStats (see accounts/stats.py)
+        post_delete.connect(review_deleted, sender="reviews.Review")
+        post_delete.connect(ad_deleted, sender="ads.Ad")
+        checks.register(check_profile_cache, checks.Tags.caches)
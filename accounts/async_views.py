@@ -0,0 +1,109 @@
+# accounts/async_views.py
+"""
+Native async auth and contractor read endpoints for the ASGI stack (config/asgi.py).
+
+Password hashing (~100ms of PBKDF2) runs on accounts.hashing.password_hasher,
+a bounded thread pool, so a login spike can't starve other requests on the
+same worker. When the pool and its queue are full we answer 503 at once.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from config.async_api import AsyncAPIView, json_response
+from config.conditional import make_etag, not_modified, set_validators
+
+from .cache import profile_cache
+from .hashing import HasherBusy, check_login_password, password_hasher
+from .identifiers import find_login_user
+from .models import User
+from .serializers import RegisterSerializer
+from .tokens import token_pair
+from .views import ContractorProfileAPIView, contractor_directory
+
+
+def request_data(request):
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+def busy_response():
+    response = JsonResponse({"detail": "Too many concurrent sign-ins, retry shortly."}, status=503)
+    response["Retry-After"] = "1"
+    return response
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncLoginView(View):
+    async def post(self, request):
+        data = request_data(request)
+        if data is None:
+            return JsonResponse({"detail": "Malformed request body."}, status=400)
+
+        identifier = data.get("identifier")
+        password = data.get("password")
+        if not identifier or not password:
+            return JsonResponse({"detail": "identifier and password are required"}, status=400)
+
+        user = await sync_to_async(find_login_user)(identifier)
+
+        # unknown identifiers still pay for one hash, so response time doesn't reveal them
+        try:
+            valid = await password_hasher.run(check_login_password, password, user)
+        except HasherBusy:
+            return busy_response()
+
+        if not valid:
+            return JsonResponse({"detail": "Invalid credentials"}, status=401)
+
+        return JsonResponse(await sync_to_async(token_pair)(user))
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncRegisterView(View):
+    async def post(self, request):
+        data = request_data(request)
+        if data is None:
+            return JsonResponse({"detail": "Malformed request body."}, status=400)
+
+        ser = RegisterSerializer(data=data)
+        if not await sync_to_async(ser.is_valid)():
+            return JsonResponse(ser.errors, status=400)
+
+        validated = dict(ser.validated_data)
+        password = validated.pop("password")
+        try:
+            encoded = await password_hasher.run(make_password, password)
+        except HasherBusy:
+            return busy_response()
+
+        user = User(**validated, password=encoded)
+        await user.asave()
+        return JsonResponse(RegisterSerializer(user).data, status=201)
+
+
+# -------------------------
+# contractor reads (auth + async ORM, see config/async_api.py)
+# -------------------------
+
+class AsyncContractorsListView(AsyncAPIView):
+    async def get(self, request):
+        return json_response([row async for row in contractor_directory(request.query_params)])
+
+
+class AsyncContractorProfileView(AsyncAPIView):
+    async def get(self, request, contractor_id):
+        # cache hits stay on the event loop; a rebuild runs the sync builder in a thread
+        doc = await profile_cache.aget(contractor_id, ContractorProfileAPIView.build_document)
+        etag = make_etag("contractor-profile", repr(doc))
+        return set_validators(not_modified(request, etag) or json_response(doc), etag)
@@ -0,0 +1,187 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from rest_framework.authentication import BaseAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from config.db_router import PRIMARY
+
+from .models import User
+from .tokens import SCHEDULE_FEED_SALT
+
+
+CLAIM_FIELDS = ("username", "role", "is_superuser", "is_staff")
+
+# cached user id -> token_version; -1 means "no such active user"
+REVOKED = -1
+
+
+def _version_key(user_id):
+    return f"accounts:token-version:{user_id}"
+
+
+def current_token_version(user_id, refresh=False):
+    """
+    Current token_version for an active user, served from the cache.
+    A miss costs one primary-key lookup per user per TOKEN_VERSION_CACHE_TTL,
+    always on the primary: a lagging replica would reject fresh tokens and
+    accept revoked ones.
+    Use a shared cache backend so revocations reach every worker immediately.
+    """
+    key = _version_key(user_id)
+    version = None if refresh else cache.get(key)
+    if version is None:
+        version = (
+            User.objects.using(PRIMARY)
+            .filter(pk=user_id, is_active=True)
+            .values_list("token_version", flat=True)
+            .first()
+        )
+        if version is None:
+            version = REVOKED
+        cache.set(key, version, getattr(settings, "TOKEN_VERSION_CACHE_TTL", 60))
+    return version
+
+
+async def acurrent_token_version(user_id, refresh=False):
+    """current_token_version() for native async views (same cache entry)."""
+    key = _version_key(user_id)
+    version = None if refresh else await cache.aget(key)
+    if version is None:
+        version = await (
+            User.objects.using(PRIMARY)
+            .filter(pk=user_id, is_active=True)
+            .values_list("token_version", flat=True)
+            .afirst()
+        )
+        if version is None:
+            version = REVOKED
+        await cache.aset(key, version, getattr(settings, "TOKEN_VERSION_CACHE_TTL", 60))
+    return version
+
+
+def bump_token_version(user_id):
+    """Invalidate every access token issued to `user_id` so far."""
+    User.objects.filter(pk=user_id).update(token_version=F("token_version") + 1)
+    transaction.on_commit(lambda: cache.delete(_version_key(user_id)))
+
+
+def user_from_claims(validated_token):
+    """
+    Build a User from token claims without a query. Only the claimed fields are
+    loaded; touching any other field loads the rest of the row (see User.refresh_from_db).
+    """
+    values = {
+        # SimpleJWT stores the id claim as a string
+        "id": User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM]),
+        "is_active": True,
+    }
+    for name in CLAIM_FIELDS:
+        values[name] = validated_token[name]
+
+    # from_db() expects values in model field order; db=None lets the router
+    # pick the database when the rest of the row is loaded
+    names = [f.attname for f in User._meta.concrete_fields if f.attname in values]
+    user = User.from_db(None, names, [values[name] for name in names])
+    user._from_token_claims = True
+    user.token_roles = tuple(validated_token.get("roles", (user.role,)))
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the role claims issued at login instead of
+    selecting the user row on every request. Tokens without those claims
+    (issued before this change) fall back to the regular database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if "role" not in validated_token:
+            return super().get_user(validated_token)
+
+        user_id, token_version = self._claimed_version(validated_token)
+        version = current_token_version(user_id)
+        if token_version != version:
+            # confirm against the database before rejecting: the cached value may
+            # predate a bump made by another worker (e.g. a token issued after it)
+            version = current_token_version(user_id, refresh=True)
+        if token_version != version:
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+
+        return user_from_claims(validated_token)
+
+    def _claimed_version(self, validated_token):
+        missing = [name for name in CLAIM_FIELDS if name not in validated_token]
+        if missing or api_settings.USER_ID_CLAIM not in validated_token:
+            raise AuthenticationFailed("Token contained no recognizable user identification", code="bad_token")
+
+        user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        return user_id, validated_token.get("ver", 0)
+
+    # -------- native async views --------
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views. Decoding the token is CPU only; the
+        version check uses the async cache / ORM, so a warm cache means no
+        thread hop at all.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if "role" not in validated_token:
+            return await sync_to_async(super().get_user)(validated_token)
+
+        user_id, token_version = self._claimed_version(validated_token)
+        version = await acurrent_token_version(user_id)
+        if token_version != version:
+            version = await acurrent_token_version(user_id, refresh=True)
+        if token_version != version:
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+
+        return user_from_claims(validated_token)
+
+
+class ScheduleFeedAuthentication(BaseAuthentication):
+    """`?feed=<schedule_feed_token>` on the .ics feed."""
+
+    query_param = "feed"
+
+    def authenticate(self, request):
+        raw = request.query_params.get(self.query_param)
+        if not raw:
+            return None
+
+        try:
+            data = signing.loads(raw, salt=SCHEDULE_FEED_SALT)
+            user_id, token_version = int(data["uid"]), data["ver"]
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise AuthenticationFailed("Invalid feed token.", code="bad_token")
+
+        if token_version != current_token_version(user_id) and token_version != current_token_version(
+            user_id, refresh=True
+        ):
+            raise AuthenticationFailed("Feed token has been revoked", code="token_revoked")
+
+        # username: the calendar name (MyScheduleICSView)
+        user = User.objects.filter(pk=user_id, is_active=True).only("id", "role", "username").first()
+        if user is None:
+            raise AuthenticationFailed("Feed token has been revoked", code="token_revoked")
+        return user, None
+
+    def authenticate_header(self, request):
+        # failures are 401s; clients can still fall back to a bearer token
+        return 'Bearer realm="api"'
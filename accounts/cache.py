@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import connections, transaction
+
+from config.caches import is_shared_cache
+from config.db_router import primary_reads
+
+
+DEFAULTS = {
+    "ENABLED": None,              # None: on only when SHARED_CACHE is shared between processes
+    "MAX_ENTRIES": 1024,          # L1 (per-process LRU) size
+    "TTL": 300,                   # seconds an L1 entry is trusted without re-checking
+    "SHARED_CACHE": None,         # Django cache alias for the shared L2 tier, e.g. "default"
+    "STALE_WHILE_REVALIDATE": False,
+}
+
+
+def profile_cache_settings():
+    return {**DEFAULTS, **getattr(settings, "CONTRACTOR_PROFILE_CACHE", {})}
+
+
+def check_profile_cache(app_configs, **kwargs):
+    """System check: a cache switched on without a shared tier serves other workers' stale profiles."""
+    conf = profile_cache_settings()
+    if conf["ENABLED"] and not is_shared_cache(conf["SHARED_CACHE"]):
+        return [checks.Warning(
+            "CONTRACTOR_PROFILE_CACHE is ENABLED without a SHARED_CACHE shared between processes: with several "
+            "workers, a review or finished job in one leaves the others serving the old profile for up to TTL seconds.",
+            hint='Set CONTRACTOR_PROFILE_CACHE["SHARED_CACHE"] to a Redis / Memcached / database CACHES alias, '
+                 'or leave ENABLED unset (None) to turn the cache on only when there is one.',
+            id="accounts.W001",
+        )]
+    return []
+
+
+def _spawn_thread(fn):
+    def run():
+        try:
+            fn()
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+class ProfileDocumentCache:
+    """
+    Two-tier cache for contractor profile documents.
+
+    - L1: bounded LRU in this process.
+    - L2 (optional): a Django cache alias shared by every worker.
+
+    Each contractor has a version number (kept in L2 when configured, so all
+    workers see a bump). `invalidate()` bumps it; documents built for an older
+    version are never served as fresh.
+
+    With stale-while-revalidate on, a request that finds an outdated L1 entry
+    gets that entry immediately while a single background rebuild runs.
+
+    Switched off (`enabled=False`), every call builds the document.
+    """
+
+    def __init__(self, enabled=True, max_entries=1024, ttl=300, shared_cache=None, stale_while_revalidate=False,
+                 spawn=None):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared_cache = shared_cache
+        self.stale_while_revalidate = stale_while_revalidate
+        self._spawn = spawn or _spawn_thread
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # contractor_id -> (doc, version, stored_at)
+        self._versions = {}             # used when there is no shared tier
+        self._refreshing = set()
+
+    @classmethod
+    def from_settings(cls):
+        conf = profile_cache_settings()
+        enabled = conf["ENABLED"]
+        return cls(
+            enabled=is_shared_cache(conf["SHARED_CACHE"]) if enabled is None else enabled,
+            max_entries=conf["MAX_ENTRIES"],
+            ttl=conf["TTL"],
+            shared_cache=conf["SHARED_CACHE"],
+            stale_while_revalidate=conf["STALE_WHILE_REVALIDATE"],
+        )
+
+    # -------- keys / versions --------
+
+    @property
+    def _shared(self):
+        return caches[self.shared_cache] if self.shared_cache else None
+
+    @staticmethod
+    def _version_key(contractor_id):
+        return f"contractor-profile:v:{contractor_id}"
+
+    @staticmethod
+    def _doc_key(contractor_id, version):
+        return f"contractor-profile:doc:{contractor_id}:{version}"
+
+    def _current_version(self, contractor_id):
+        if self._shared is not None:
+            return self._shared.get(self._version_key(contractor_id), 0)
+        with self._lock:
+            return self._versions.get(contractor_id, 0)
+
+    # -------- L1 --------
+
+    def _local_get(self, contractor_id):
+        with self._lock:
+            entry = self._entries.get(contractor_id)
+            if entry is not None:
+                self._entries.move_to_end(contractor_id)
+            return entry
+
+    def _local_put(self, contractor_id, doc, version):
+        with self._lock:
+            self._entries[contractor_id] = (doc, version, time.monotonic())
+            self._entries.move_to_end(contractor_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _store(self, contractor_id, doc, version):
+        self._local_put(contractor_id, doc, version)
+        if self._shared is not None:
+            self._shared.set(self._doc_key(contractor_id, version), doc, self.ttl)
+
+    @staticmethod
+    def _build(contractor_id, build):
+        # on the primary: the document is stored under the version just read (see primary_reads)
+        with primary_reads():
+            return build(contractor_id)
+
+    # -------- public API --------
+
+    def get(self, contractor_id, build):
+        """
+        Return the profile document for `contractor_id`, calling
+        `build(contractor_id)` on a miss. `build` may raise (e.g. NotFound);
+        nothing is cached in that case.
+        """
+        if not self.enabled:
+            return build(contractor_id)
+
+        version = self._current_version(contractor_id)
+        entry = self._local_get(contractor_id)
+        if self._is_fresh(entry, version):
+            return entry[0]
+
+        if self._shared is not None:
+            doc = self._shared.get(self._doc_key(contractor_id, version))
+            if doc is not None:
+                self._local_put(contractor_id, doc, version)
+                return doc
+
+        if entry is not None and self.stale_while_revalidate:
+            self._refresh_in_background(contractor_id, version, build)
+            return entry[0]
+
+        doc = self._build(contractor_id, build)
+        self._store(contractor_id, doc, version)
+        return doc
+
+    async def aget(self, contractor_id, build):
+        """
+        get() for async views. A fresh L1 hit is answered on the event loop;
+        anything else (shared tier, rebuild) runs get() in a worker thread.
+        """
+        if self.enabled and self._shared is None:
+            entry = self._local_get(contractor_id)
+            if self._is_fresh(entry, self._current_version(contractor_id)):
+                return entry[0]
+        return await sync_to_async(self.get)(contractor_id, build)
+
+    def _is_fresh(self, entry, version):
+        return entry is not None and entry[1] == version and time.monotonic() - entry[2] < self.ttl
+
+    def invalidate(self, contractor_id):
+        if self._shared is not None:
+            key = self._version_key(contractor_id)
+            self._shared.add(key, 0, None)
+            try:
+                self._shared.incr(key)
+            except ValueError:
+                # evicted between add() and incr()
+                self._shared.set(key, 1, None)
+        else:
+            with self._lock:
+                self._versions[contractor_id] = self._versions.get(contractor_id, 0) + 1
+
+        if not self.stale_while_revalidate:
+            with self._lock:
+                self._entries.pop(contractor_id, None)
+
+    def invalidate_on_commit(self, contractor_id):
+        transaction.on_commit(lambda: self.invalidate(contractor_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._refreshing.clear()
+
+    def _refresh_in_background(self, contractor_id, version, build):
+        with self._lock:
+            if contractor_id in self._refreshing:
+                return
+            self._refreshing.add(contractor_id)
+
+        def refresh():
+            try:
+                self._store(contractor_id, self._build(contractor_id, build), version)
+            except Exception:
+                # keep serving the stale copy; the next request retries
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(contractor_id)
+
+        self._spawn(refresh)
+
+
+profile_cache = ProfileDocumentCache.from_settings()
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+DEFAULTS = {
+    "WORKERS": 4,        # threads doing PBKDF2 at once (hashlib releases the GIL)
+    "MAX_PENDING": 32,   # hash jobs allowed to wait for a worker before we answer 503
+}
+
+
+class HasherBusy(Exception):
+    """Raised instead of queueing when every worker and pending slot is taken."""
+
+
+@cache
+def dummy_password_hash():
+    """A real hash to check against when the identifier is unknown, so misses cost the same as hits."""
+    return make_password("dummy-password-for-timing")
+
+
+def check_login_password(password, user):
+    """
+    check_password against `user`'s hash, or the dummy hash when `user` is None.
+    The dummy is built on first use, which costs a full hash too: async callers
+    run this whole function through password_hasher, never on the event loop.
+    """
+    encoded = user.password if user else dummy_password_hash()
+    return check_password(password, encoded) and user is not None
+
+
+class BoundedHasher:
+    """
+    Runs password hashing on a small thread pool with a hard cap on queued
+    jobs, so a login storm can't hold the event loop or grow an unbounded
+    backlog. `run()` fails fast with HasherBusy when the cap is reached.
+    """
+
+    def __init__(self, workers=4, max_pending=32):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        conf = {**DEFAULTS, **getattr(settings, "PASSWORD_HASH_POOL", {})}
+        return cls(workers=conf["WORKERS"], max_pending=conf["MAX_PENDING"])
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    async def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self._slots.release()
+
+
+password_hasher = BoundedHasher.from_settings()
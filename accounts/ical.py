@@ -0,0 +1,84 @@
+# accounts/ical.py
+"""
+Minimal iCalendar (RFC 5545) writer for the contractor schedule feed.
+"""
+from datetime import timezone as dt_timezone
+
+from rest_framework.renderers import BaseRenderer
+
+CRLF = "\r\n"
+
+
+def escape(text):
+    return (
+        (text or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Fold content lines at 75 octets (continuation lines start with a space)."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + CRLF
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # don't split a multi-byte character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return (CRLF + " ").join(parts) + CRLF
+
+
+def format_dt(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def calendar_chunks(rows, domain, name="Schedule"):
+    """
+    Yield the calendar one event at a time.
+    rows: (id, title, description, location, scheduled_at, scheduled_end, created_at)
+    """
+    yield "".join(fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//web-practice-drf-api//schedule//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape(name)}",
+    ))
+    for ad_id, title, description, location, start, end, created_at in rows:
+        yield "".join(fold(line) for line in (
+            "BEGIN:VEVENT",
+            f"UID:ad-{ad_id}@{domain}",
+            f"DTSTAMP:{format_dt(created_at)}",
+            f"DTSTART:{format_dt(start)}",
+            f"DTEND:{format_dt(end)}",
+            f"SUMMARY:{escape(title)}",
+            f"DESCRIPTION:{escape(description)}",
+            f"LOCATION:{escape(location)}",
+            "END:VEVENT",
+        ))
+    yield fold("END:VCALENDAR")
+
+
+class ICalendarRenderer(BaseRenderer):
+    """
+    Lets `Accept: text/calendar` through content negotiation. The feed itself
+    is streamed by the view; only error payloads are rendered here.
+    """
+    media_type = "text/calendar"
+    format = "ics"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, dict) and "detail" in data:
+            data = data["detail"]
+        return str(data).encode(self.charset)
@@ -0,0 +1,78 @@
+import re
+
+from .models import User
+
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+PHONE_RE = re.compile(r"^\+?[\d\s().-]+$")
+PHONE_FORMATTING = str.maketrans("", "", " -().")
+MIN_PHONE_DIGITS = 6
+
+
+def normalize_email(value):
+    return value.strip().lower()
+
+
+def normalize_phone(value):
+    # must match User.phone_normalized
+    return value.strip().translate(PHONE_FORMATTING)
+
+
+def classify_identifier(identifier):
+    """
+    Decide which single indexed column a login identifier should probe.
+    Returns (kind, lookup) where kind is "email", "phone" or "username".
+    """
+    value = identifier.strip()
+
+    if EMAIL_RE.match(value):
+        return "email", {"email_normalized": normalize_email(value)}
+
+    if PHONE_RE.match(value) and sum(c.isdigit() for c in value) >= MIN_PHONE_DIGITS:
+        return "phone", {"phone_normalized": normalize_phone(value)}
+
+    return "username", {"username": identifier}
+
+
+def _probe(kind, identifier):
+    """
+    The user `identifier` names through `kind`'s column, or None. Several
+    case / formatting variants of one email or phone are ambiguous: only an
+    exact match among them counts, otherwise nobody does.
+    """
+    if kind == "username":
+        return User.objects.filter(username=identifier).first()
+    value = identifier.strip()
+    if kind == "email":
+        users = list(User.objects.filter(email_normalized=normalize_email(value)))
+    else:
+        users = list(User.objects.filter(phone_normalized=normalize_phone(value)))
+    if len(users) > 1:
+        users = [user for user in users if getattr(user, kind) == value]
+    return users[0] if len(users) == 1 else None
+
+
+def _fallbacks(kind, identifier):
+    """The other columns an identifier of this shape could still name, as the old OR lookup tried them all."""
+    value = identifier.strip()
+    kinds = ["username"]
+    if "@" in value:
+        kinds.append("email")  # e.g. ops@localhost: no dot in the domain
+    if PHONE_RE.match(value):
+        kinds.append("phone")  # e.g. short internal numbers
+    return [k for k in kinds if k != kind]
+
+
+def find_login_user(identifier):
+    """
+    One indexed equality probe chosen by the identifier's shape. A miss falls
+    back to the other columns the identifier could name (usernames may look
+    like an email or a phone number; emails and phones may not look like
+    one), each still an indexed lookup.
+    """
+    kind, _ = classify_identifier(identifier)
+    for probe in [kind, *_fallbacks(kind, identifier)]:
+        user = _probe(probe, identifier)
+        if user is not None:
+            return user
+    return None
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from accounts.stats import rebuild_contractor_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ContractorStats read model from Review and Ad."
+
+    def handle(self, *args, **options):
+        written, drift = rebuild_contractor_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt stats for {written} contractor(s); {drift} row(s) were out of date.")
+        )
@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from config.db_router import PRIMARY, replica_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database onto each read replica alias "
+        "(READ_REPLICAS) with SQLite's online backup API, so the copy is "
+        "consistent even while the primary is being written. Local stand-in "
+        "for real replication."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("aliases", nargs="*", help="replica aliases (default: READ_REPLICAS['ALIASES'])")
+
+    def handle(self, *args, **opts):
+        aliases = opts["aliases"] or replica_settings()["ALIASES"]
+        if not aliases:
+            raise CommandError("No read replicas configured (READ_REPLICAS['ALIASES'], e.g. DJANGO_READ_REPLICA=1).")
+
+        primary = connections[PRIMARY].settings_dict
+        if primary["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("sync_replica only copies SQLite databases.")
+
+        for alias in aliases:
+            if alias not in connections:
+                raise CommandError(f"Unknown database alias: {alias}")
+            replica = connections[alias].settings_dict
+            if replica["ENGINE"] != primary["ENGINE"] or str(replica["NAME"]) == str(primary["NAME"]):
+                raise CommandError(f"{alias} is not a separate SQLite database.")
+
+            # drop the replica's open connection so nothing reads a half-copied file
+            connections[alias].close()
+            started = time.perf_counter()
+            source = sqlite3.connect(primary["NAME"])
+            target = sqlite3.connect(replica["NAME"])
+            try:
+                with target:
+                    source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(
+                self.style.SUCCESS(f"{alias}: copied from {PRIMARY} in {time.perf_counter() - started:.2f}s")
+            )
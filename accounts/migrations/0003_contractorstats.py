@@ -0,0 +1,55 @@
+# Generated by Django 6.0 on 2026-10-17 01:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_stats(apps, schema_editor):
+    ContractorStats = apps.get_model("accounts", "ContractorStats")
+    Review = apps.get_model("reviews", "Review")
+    Ad = apps.get_model("ads", "Ad")
+
+    stats = {}
+    for row in Review.objects.values("contractor_id").annotate(n=Count("id"), total=Sum("rating")):
+        stats[row["contractor_id"]] = ContractorStats(
+            contractor_id=row["contractor_id"],
+            review_count=row["n"],
+            rating_sum=row["total"],
+            avg_rating=row["total"] / row["n"],
+        )
+
+    done = (
+        Ad.objects.filter(status="DONE", assigned_contractor__isnull=False)
+        .values("assigned_contractor_id")
+        .annotate(n=Count("id"))
+    )
+    for row in done:
+        contractor_id = row["assigned_contractor_id"]
+        stats.setdefault(contractor_id, ContractorStats(contractor_id=contractor_id)).completed_ads_count = row["n"]
+
+    ContractorStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_phone'),
+        ('ads', '0004_ad_ad_created_id_idx'),
+        ('reviews', '0002_alter_review_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractorStats',
+            fields=[
+                ('contractor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contractor_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('avg_rating', models.FloatField(default=0.0)),
+                ('completed_ads_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
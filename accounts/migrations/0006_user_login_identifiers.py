@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-17 01:44
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_token_version'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_normalized',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Lower('email'), output_field=models.CharField(max_length=254)),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='phone_normalized',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace('phone', models.Value(' '), models.Value('')), models.Value('-'), models.Value('')), models.Value('('), models.Value('')), models.Value(')'), models.Value('')), models.Value('.'), models.Value('')), output_field=models.CharField(max_length=20)),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email_normalized'], name='user_email_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['phone_normalized'], name='user_phone_norm_idx'),
+        ),
+    ]
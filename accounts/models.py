@@ -1,6 +1,14 @@
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Lower, Replace
+
+
+def _strip_phone_formatting(expression):
+    for char in (" ", "-", "(", ")", "."):
+        expression = Replace(expression, Value(char), Value(""))
+    return expression
 
 class User(AbstractUser):
     class Role(models.TextChoices):
@@ -12,5 +20,59 @@ class User(AbstractUser):
     phone = models.CharField(max_length=20, unique=True)
     role = models.CharField(max_length=20, choices=Role.choices, default=Role.CUSTOMER)
 
+    # bumped on role changes; access tokens carry it as the `ver` claim
+    token_version = models.PositiveIntegerField(default=0)
+
+    # login identifiers in canonical form (see accounts/identifiers.py), maintained by the database
+    email_normalized = models.GeneratedField(
+        expression=Lower("email"),
+        output_field=models.CharField(max_length=254),
+        db_persist=True,
+    )
+    phone_normalized = models.GeneratedField(
+        expression=_strip_phone_formatting("phone"),
+        output_field=models.CharField(max_length=20),
+        db_persist=True,
+    )
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # login by email (username/phone are already unique -> indexed)
+            models.Index(fields=["email"], name="user_email_idx"),
+            # single-probe login lookups (accounts/identifiers.py)
+            models.Index(fields=["email_normalized"], name="user_email_norm_idx"),
+            models.Index(fields=["phone_normalized"], name="user_phone_norm_idx"),
+            # contractor directory: role='CONTRACTOR'
+            models.Index(fields=["role"], name="user_role_idx"),
+        ]
+
     def __str__(self):
         return self.username or self.email or f"user:{self.pk}"
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # A request user hydrated from token claims only has a few fields loaded.
+        # The first access to any other field loads the rest of the row in one query.
+        if fields is not None and getattr(self, "_from_token_claims", False):
+            fields = set(fields) | self.get_deferred_fields()
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+
+class ContractorStats(models.Model):
+    """
+    Denormalized per-contractor aggregates, kept in step with the
+    review / confirm-done write paths (see accounts/stats.py).
+    `rebuild_contractor_stats` recomputes it from Review and Ad.
+    """
+    contractor = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="contractor_stats",
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    avg_rating = models.FloatField(default=0.0)
+    completed_ads_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Stats({self.contractor_id}) avg={self.avg_rating:.2f} n={self.review_count}"
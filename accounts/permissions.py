@@ -13,6 +13,11 @@ def is_contractor(user):
     return bool(user and user.is_authenticated and getattr(user, "role", None) == "CONTRACTOR")
 
 
+class IsAdmin(BasePermission):
+    def has_permission(self, request, view):
+        return is_admin(request.user)
+
+
 class IsSupportOrAdmin(BasePermission):
     def has_permission(self, request, view):
         return is_support(request.user)
@@ -0,0 +1,140 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+from ads.models import Ad
+from reviews.models import Review
+
+from .cache import profile_cache
+from .models import ContractorStats
+
+
+def _ensure_row(contractor_id):
+    ContractorStats.objects.bulk_create(
+        [ContractorStats(contractor_id=contractor_id)],
+        ignore_conflicts=True,
+    )
+
+
+def record_review(contractor_id, rating):
+    """
+    Fold one new review into the contractor's stats.
+    Call inside the transaction that creates the Review.
+    """
+    _ensure_row(contractor_id)
+    ContractorStats.objects.filter(contractor_id=contractor_id).update(
+        review_count=F("review_count") + 1,
+        rating_sum=F("rating_sum") + rating,
+        # right-hand side sees the old column values
+        avg_rating=Cast(F("rating_sum") + rating, FloatField()) / (F("review_count") + 1),
+    )
+    profile_cache.invalidate_on_commit(contractor_id)
+
+
+def record_completed_ad(contractor_id):
+    """
+    Count one more DONE ad for the contractor.
+    Call inside the transaction that moves the ad to DONE.
+    """
+    _ensure_row(contractor_id)
+    ContractorStats.objects.filter(contractor_id=contractor_id).update(
+        completed_ads_count=F("completed_ads_count") + 1,
+    )
+    profile_cache.invalidate_on_commit(contractor_id)
+
+
+def _drop_if_empty(contractor_id):
+    # rebuild_contractor_stats() keeps no row for a contractor with nothing to count
+    ContractorStats.objects.filter(contractor_id=contractor_id, review_count=0, completed_ads_count=0).delete()
+
+
+def forget_review(contractor_id, rating):
+    """Take a deleted review back out of the contractor's stats."""
+    ContractorStats.objects.filter(contractor_id=contractor_id, review_count__gt=0).update(
+        review_count=F("review_count") - 1,
+        rating_sum=F("rating_sum") - rating,
+        avg_rating=Case(
+            When(review_count=1, then=Value(0.0)),
+            default=Cast(F("rating_sum") - rating, FloatField()) / (F("review_count") - 1),
+        ),
+    )
+    _drop_if_empty(contractor_id)
+    profile_cache.invalidate_on_commit(contractor_id)
+
+
+def forget_completed_ad(contractor_id):
+    """Count one DONE ad less for the contractor (the ad was deleted)."""
+    ContractorStats.objects.filter(contractor_id=contractor_id, completed_ads_count__gt=0).update(
+        completed_ads_count=F("completed_ads_count") - 1,
+    )
+    _drop_if_empty(contractor_id)
+    profile_cache.invalidate_on_commit(contractor_id)
+
+
+def review_deleted(sender, instance, **kwargs):
+    """post_delete receiver for Review (connected in AccountsConfig.ready); covers cascades too."""
+    forget_review(instance.contractor_id, instance.rating)
+
+
+def ad_deleted(sender, instance, **kwargs):
+    """post_delete receiver for Ad: a deleted DONE ad no longer counts as completed."""
+    if instance.status == Ad.Status.DONE and instance.assigned_contractor_id is not None:
+        forget_completed_ad(instance.assigned_contractor_id)
+
+
+def compute_contractor_stats():
+    """Recompute every contractor's stats from Review and Ad."""
+    stats = {}
+
+    reviews = (
+        Review.objects.values("contractor_id")
+        .annotate(n=Count("id"), total=Sum("rating"))
+        .values_list("contractor_id", "n", "total")
+    )
+    for contractor_id, n, total in reviews:
+        stats[contractor_id] = ContractorStats(
+            contractor_id=contractor_id,
+            review_count=n,
+            rating_sum=total,
+            avg_rating=total / n,
+        )
+
+    done = (
+        Ad.objects.filter(status=Ad.Status.DONE, assigned_contractor__isnull=False)
+        .values("assigned_contractor_id")
+        .annotate(n=Count("id"))
+        .values_list("assigned_contractor_id", "n")
+    )
+    for contractor_id, n in done:
+        row = stats.setdefault(contractor_id, ContractorStats(contractor_id=contractor_id))
+        row.completed_ads_count = n
+
+    return stats
+
+
+def rebuild_contractor_stats():
+    """
+    Replace the ContractorStats table with values recomputed from source.
+    Returns (rows_written, rows_that_were_out_of_date).
+    """
+    with transaction.atomic():
+        fresh = compute_contractor_stats()
+
+        drift = 0
+        current = {s.contractor_id: s for s in ContractorStats.objects.all()}
+        fields = ("review_count", "rating_sum", "avg_rating", "completed_ads_count")
+        for contractor_id in current.keys() | fresh.keys():
+            old = current.get(contractor_id)
+            new = fresh.get(contractor_id)
+            old_values = tuple(getattr(old, f) for f in fields) if old else None
+            new_values = tuple(getattr(new, f) for f in fields) if new else None
+            if old_values != new_values:
+                drift += 1
+
+        ContractorStats.objects.all().delete()
+        ContractorStats.objects.bulk_create(fresh.values(), batch_size=1000)
+
+    # cached profiles were built from the old numbers
+    profile_cache.clear()
+
+    return len(fresh), drift
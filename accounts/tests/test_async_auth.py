@@ -0,0 +1,101 @@
+# accounts/tests/test_async_auth.py
+import asyncio
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from accounts.hashing import BoundedHasher, HasherBusy, dummy_password_hash
+
+User = get_user_model()
+
+
+class BoundedHasherTests(SimpleTestCase):
+    def test_rejects_when_workers_and_queue_are_full(self):
+        hasher = BoundedHasher(workers=1, max_pending=1)
+
+        async def scenario():
+            release = asyncio.Event()
+            loop = asyncio.get_running_loop()
+
+            def slow():
+                asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+                return "done"
+
+            first = asyncio.ensure_future(hasher.run(slow))
+            second = asyncio.ensure_future(hasher.run(slow))
+            await asyncio.sleep(0)
+            with self.assertRaises(HasherBusy):
+                await hasher.run(slow)
+            release.set()
+            return await first, await second
+
+        self.assertEqual(asyncio.run(scenario()), ("done", "done"))
+
+
+class AsyncAuthViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="as_user", email="as_user@test.com", phone="09120001111", role="CUSTOMER")
+        cls.user.set_password("testpass123")
+        cls.user.save()
+
+    def test_login(self):
+        r = self.client.post("/api/auth/login/async/", {"identifier": "as_user@test.com", "password": "testpass123"}, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+        self.assertIn("access", r.json())
+
+        r = self.client.post("/api/auth/login/async/", {"identifier": "as_user", "password": "nope"}, content_type="application/json")
+        self.assertEqual(r.status_code, 401)
+
+        r = self.client.post("/api/auth/login/async/", {"identifier": "as_user"}, content_type="application/json")
+        self.assertEqual(r.status_code, 400)
+
+    def test_unknown_identifier_still_hashes(self):
+        with mock.patch("accounts.hashing.check_password", return_value=True) as check:
+            r = self.client.post("/api/auth/login/async/", {"identifier": "ghost", "password": "x"}, content_type="application/json")
+        self.assertEqual(r.status_code, 401)
+        check.assert_called_once()
+
+    def test_first_dummy_hash_is_built_off_the_event_loop(self):
+        dummy_password_hash.cache_clear()
+        self.addCleanup(dummy_password_hash.cache_clear)
+        threads = []
+
+        def make_password(password):
+            threads.append(threading.current_thread().name)
+            return "md5$salt$0"
+
+        with mock.patch("accounts.hashing.make_password", side_effect=make_password):
+            r = self.client.post("/api/auth/login/async/", {"identifier": "ghost", "password": "x"}, content_type="application/json")
+        self.assertEqual(r.status_code, 401)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("password-hash"))
+
+    def test_register(self):
+        r = self.client.post(
+            "/api/auth/register/async/",
+            {"username": "as_new", "email": "as_new@test.com", "phone": "09120002222", "role": "CONTRACTOR", "password": "secret123"},
+            content_type="application/json",
+        )
+        self.assertEqual(r.status_code, 201, r.content)
+        self.assertEqual(r.json()["role"], "CONTRACTOR")
+        self.assertNotIn("password", r.json())
+        self.assertTrue(User.objects.get(username="as_new").check_password("secret123"))
+
+        dup = self.client.post(
+            "/api/auth/register/async/",
+            {"username": "as_new", "email": "x@test.com", "phone": "09120003333", "password": "secret123"},
+            content_type="application/json",
+        )
+        self.assertEqual(dup.status_code, 400)
+        self.assertIn("username", dup.json())
+
+    def test_saturated_pool_answers_503(self):
+        full = BoundedHasher(workers=1, max_pending=0)
+        full._slots.acquire()
+        with mock.patch("accounts.async_views.password_hasher", full):
+            r = self.client.post("/api/auth/login/async/", {"identifier": "as_user", "password": "testpass123"}, content_type="application/json")
+        self.assertEqual(r.status_code, 503)
+        self.assertEqual(r["Retry-After"], "1")
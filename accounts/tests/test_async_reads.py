@@ -0,0 +1,65 @@
+# accounts/tests/test_async_reads.py
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from accounts.cache import profile_cache
+from accounts.stats import record_review
+from accounts.tokens import RoleRefreshToken
+from ads.models import Ad
+from reviews.models import Review
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class AsyncContractorReadTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("acr_customer", "CUSTOMER", "09127830001")
+        cls.contractors = [create_user(f"acr_contractor{i}", "CONTRACTOR", f"0912783010{i}") for i in range(3)]
+        for rating, contractor in zip((5, 3), cls.contractors):
+            ad = Ad.objects.create(
+                title="t", description="d", category="c", creator=cls.customer,
+                status=Ad.Status.DONE, assigned_contractor=contractor,
+            )
+            Review.objects.create(ad=ad, contractor=contractor, author=cls.customer, text="x", rating=rating)
+            record_review(contractor.id, rating)
+
+    def setUp(self):
+        profile_cache.clear()
+        enabled = mock.patch.object(profile_cache, "enabled", True)
+        enabled.start()
+        self.addCleanup(enabled.stop)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(self.customer).access_token}")
+
+    def assertSameAnswer(self, url):
+        sync = self.client.get(url)
+        asynchronous = self.client.get(url.replace("?", "async/?") if "?" in url else f"{url}async/")
+        self.assertEqual((asynchronous.status_code, asynchronous.json()), (sync.status_code, sync.json()))
+        return asynchronous
+
+    def test_contractor_list(self):
+        r = self.assertSameAnswer("/api/contractors/?ordering=-avg_rating,id")
+        self.assertEqual([c["id"] for c in r.json()][:2], [self.contractors[0].id, self.contractors[1].id])
+        self.assertSameAnswer("/api/contractors/?min_review_count=1")
+
+    def test_profile_and_reviews(self):
+        contractor = self.contractors[0]
+        self.assertSameAnswer(f"/api/contractors/{contractor.id}/profile/")
+        self.assertSameAnswer(f"/api/contractors/{contractor.id}/reviews/")
+        self.assertSameAnswer(f"/api/contractors/{contractor.id}/reviews/?min_rating=4")
+        self.assertSameAnswer(f"/api/contractors/{self.customer.id}/reviews/")  # 404
+
+        r = self.assertSameAnswer(f"/api/contractors/{contractor.id}/reviews/?rating=9")
+        self.assertEqual(r.status_code, 400)
+
+    def test_cached_profile_stays_on_the_event_loop(self):
+        url = f"/api/contractors/{self.contractors[0].id}/profile/async/"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 200)
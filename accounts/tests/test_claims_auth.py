@@ -0,0 +1,87 @@
+# accounts/tests/test_claims_auth.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts.authentication import ClaimsJWTAuthentication
+from accounts.tokens import RoleRefreshToken
+
+User = get_user_model()
+
+
+def create_user(username, role, phone, password="testpass123"):
+    u = User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+    u.set_password(password)
+    u.save()
+    return u
+
+
+class ClaimsAuthenticationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user("ca_admin", "ADMIN", "09129990001")
+        cls.customer = create_user("ca_customer", "CUSTOMER", "09129990002")
+        support, _ = Group.objects.get_or_create(name="SUPPORT")
+        cls.customer.groups.add(support)
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, identifier):
+        r = self.client.post("/api/auth/login/", {"identifier": identifier, "password": "testpass123"}, format="json")
+        self.assertEqual(r.status_code, 200)
+        return r.data["access"]
+
+    def test_login_token_carries_role_claims(self):
+        token = AccessToken(self.login("ca_customer"))
+        self.assertEqual(token["role"], "CUSTOMER")
+        self.assertEqual(token["roles"], ["CUSTOMER", "SUPPORT"])
+        self.assertEqual(token["username"], "ca_customer")
+        self.assertEqual(token["ver"], 0)
+
+    def test_authenticated_request_skips_user_select(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('ca_customer')}")
+        self.client.get("/api/me/profile/")  # warms the token-version cache
+
+        with self.assertNumQueries(2):  # the ETag aggregate + the ads list, no user SELECT
+            r = self.client.get("/api/me/profile/")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["user"], {"id": self.customer.id, "username": "ca_customer", "role": "CUSTOMER"})
+
+    def test_user_row_is_loaded_lazily_in_one_query(self):
+        token = AccessToken(str(RoleRefreshToken.for_user(self.customer).access_token))
+        auth = ClaimsJWTAuthentication()
+        auth.get_user(token)  # warm cache
+
+        with self.assertNumQueries(0):
+            user = auth.get_user(token)
+            self.assertEqual((user.pk, user.role, user.is_authenticated), (self.customer.pk, "CUSTOMER", True))
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "ca_customer@test.com")
+            self.assertEqual(user.phone, "09129990002")
+            self.assertTrue(user.check_password("testpass123"))
+
+    def test_role_change_revokes_old_tokens(self):
+        old_token = self.login("ca_customer")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {old_token}")
+        self.assertEqual(self.client.get("/api/me/profile/").status_code, 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('ca_admin')}")
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(f"/api/users/{self.customer.id}/roles/", {"roles": ["SUPPORT"]}, format="json")
+        self.assertEqual(r.status_code, 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {old_token}")
+        self.assertEqual(self.client.get("/api/me/profile/").status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.login('ca_customer')}")
+        r = self.client.get("/api/me/profile/")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["user"]["role"], "SUPPORT")
+
+    def test_tokens_without_role_claims_still_work(self):
+        token = RefreshToken.for_user(self.customer).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(self.client.get("/api/me/profile/").status_code, 200)
@@ -0,0 +1,57 @@
+# accounts/tests/test_conditional_get.py
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from accounts.tokens import RoleRefreshToken
+from ads.models import Ad
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class ProfileConditionalGetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("pcg_customer", "CUSTOMER", "09127790001")
+        cls.contractor = create_user("pcg_contractor", "CONTRACTOR", "09127790002")
+        cls.ad = Ad.objects.create(
+            title="t", description="d", category="c", creator=cls.customer,
+            status=Ad.Status.DONE, assigned_contractor=cls.contractor,
+        )
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(self.customer).access_token}")
+
+    def revalidate(self, url):
+        """(status of a fresh GET, status of the same GET with its ETag)."""
+        r = self.client.get(url)
+        return r.status_code, self.client.get(url, HTTP_IF_NONE_MATCH=r["ETag"]).status_code
+
+    def test_me_profile(self):
+        self.assertEqual(self.revalidate("/api/me/profile/"), (200, 304))
+
+        etag = self.client.get("/api/me/profile/")["ETag"]
+        Ad.objects.create(title="new", description="d", category="c", creator=self.customer)
+        self.assertEqual(self.client.get("/api/me/profile/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_contractor_reviews_and_profile(self):
+        reviews_url = f"/api/contractors/{self.contractor.id}/reviews/"
+        profile_url = f"/api/contractors/{self.contractor.id}/profile/"
+        self.assertEqual(self.revalidate(reviews_url), (200, 304))
+        self.assertEqual(self.revalidate(profile_url), (200, 304))
+
+        reviews_etag = self.client.get(reviews_url)["ETag"]
+        profile_etag = self.client.get(profile_url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):  # profile_cache invalidates on commit
+            r = self.client.post(f"/api/ads/{self.ad.id}/review/", {"rating": 4, "text": "good"}, format="json")
+        self.assertEqual(r.status_code, 201)
+
+        r = self.client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        self.assertEqual((r.status_code, r.data["review_count"], r.data["avg_rating"]), (200, 1, 4.0))
+        self.assertEqual(self.client.get(profile_url, HTTP_IF_NONE_MATCH=profile_etag).status_code, 200)
+
+        # a rating filter is a different representation
+        self.assertEqual(self.client.get(f"{reviews_url}?rating=5", HTTP_IF_NONE_MATCH=reviews_etag).status_code, 200)
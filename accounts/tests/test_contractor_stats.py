@@ -0,0 +1,113 @@
+# accounts/tests/test_contractor_stats.py
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.cache import profile_cache
+from accounts.models import ContractorStats
+from accounts.stats import rebuild_contractor_stats
+from ads.models import Ad
+from reviews.models import Review
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class ContractorStatsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("st_customer", "CUSTOMER", "09126660001")
+        cls.contractor = create_user("st_contractor", "CONTRACTOR", "09126660002")
+        cls.idle_contractor = create_user("st_idle", "CONTRACTOR", "09126660003")
+
+    def setUp(self):
+        profile_cache.clear()
+
+    def as_user(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def finish_ad(self, rating):
+        ad = Ad.objects.create(
+            title="job", description="d", category="c", creator=self.customer,
+            status=Ad.Status.ASSIGNED, assigned_contractor=self.contractor, contractor_marked_done=True,
+        )
+        self.as_user(self.customer)
+        self.assertEqual(self.client.post(f"/api/ads/{ad.id}/confirm-done/").status_code, 200)
+        r = self.client.post(f"/api/ads/{ad.id}/review/", {"rating": rating, "text": "ok"}, format="json")
+        self.assertEqual(r.status_code, 201)
+        return ad
+
+    def test_write_paths_keep_stats_in_step(self):
+        self.finish_ad(5)
+        self.finish_ad(4)
+
+        stats = ContractorStats.objects.get(contractor=self.contractor)
+        self.assertEqual(stats.review_count, 2)
+        self.assertEqual(stats.rating_sum, 9)
+        self.assertEqual(stats.avg_rating, 4.5)
+        self.assertEqual(stats.completed_ads_count, 2)
+
+        r = self.client.get(f"/api/contractors/{self.contractor.id}/profile/")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["avg_rating"], 4.5)
+        self.assertEqual(r.data["review_count"], 2)
+        self.assertEqual(r.data["completed_ads_count"], 2)
+        self.assertEqual(len(r.data["reviews"]), 2)
+
+    def test_list_includes_contractors_without_stats(self):
+        self.finish_ad(3)
+
+        r = self.client.get("/api/contractors/?ordering=-avg_rating")
+        self.assertEqual(r.status_code, 200)
+        rows = {row["id"]: row for row in r.data}
+        self.assertEqual(rows[self.contractor.id]["avg_rating"], 3.0)
+        self.assertEqual(rows[self.contractor.id]["completed_ads_count"], 1)
+        self.assertEqual(rows[self.idle_contractor.id]["avg_rating"], 0.0)
+        self.assertEqual(rows[self.idle_contractor.id]["review_count"], 0)
+        self.assertEqual(r.data[0]["id"], self.contractor.id)
+
+        r2 = self.client.get("/api/contractors/?min_review_count=1")
+        self.assertEqual([row["id"] for row in r2.data], [self.contractor.id])
+
+    def test_profile_reads_stats_with_constant_query_count(self):
+        self.finish_ad(5)
+        with self.assertNumQueries(3):  # auth user, contractor + stats join, review list
+            r = self.client.get(f"/api/contractors/{self.contractor.id}/profile/")
+        self.assertEqual(r.status_code, 200)
+
+    def test_rebuild_command_repairs_drift(self):
+        ad = self.finish_ad(2)
+        Review.objects.create(ad=ad, contractor=self.contractor, author=self.customer, text="x", rating=4)
+        ContractorStats.objects.filter(contractor=self.contractor).update(completed_ads_count=7)
+
+        out = StringIO()
+        call_command("rebuild_contractor_stats", stdout=out)
+        self.assertIn("1 row(s) were out of date", out.getvalue())
+
+        stats = ContractorStats.objects.get(contractor=self.contractor)
+        self.assertEqual(stats.review_count, 2)
+        self.assertEqual(stats.avg_rating, 3.0)
+        self.assertEqual(stats.completed_ads_count, 1)
+
+    def test_deletes_take_their_rows_back_out(self):
+        first = self.finish_ad(5)
+        self.finish_ad(2)
+
+        self.as_user(self.customer)
+        self.assertEqual(self.client.delete(f"/api/ads/{first.id}/").status_code, 204)
+        stats = ContractorStats.objects.get(contractor=self.contractor)
+        self.assertEqual((stats.review_count, stats.rating_sum, stats.avg_rating), (1, 2, 2.0))
+        self.assertEqual(stats.completed_ads_count, 1)
+        self.assertEqual(self.client.get(f"/api/contractors/{self.contractor.id}/profile/").data["review_count"], 1)
+
+        # the customer's account goes, and its DONE ad and review with it
+        self.customer.delete()
+        self.assertFalse(ContractorStats.objects.filter(contractor=self.contractor).exists())
+        self.assertEqual(rebuild_contractor_stats()[1], 0)
@@ -0,0 +1,47 @@
+# accounts/tests/test_login_identifiers.py
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from accounts.identifiers import classify_identifier, find_login_user
+
+User = get_user_model()
+
+
+class LoginIdentifierTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create(username="alice", email="Alice@Example.com", phone="0912 111-2233")
+        # a username that is shaped like an email address
+        cls.odd = User.objects.create(username="odd@name.io", email="odd@test.com", phone="09121112234")
+
+    def test_classify_by_shape(self):
+        self.assertEqual(classify_identifier("ALICE@example.com "), ("email", {"email_normalized": "alice@example.com"}))
+        self.assertEqual(classify_identifier("(0912) 111-2233"), ("phone", {"phone_normalized": "09121112233"}))
+        self.assertEqual(classify_identifier("+989121112233"), ("phone", {"phone_normalized": "+989121112233"}))
+        self.assertEqual(classify_identifier("alice"), ("username", {"username": "alice"}))
+        self.assertEqual(classify_identifier("12"), ("username", {"username": "12"}))
+
+    def test_single_probe_per_shape(self):
+        for identifier in ("alice", "alice@example.com", "09121112233", "0912-111-2233"):
+            with self.assertNumQueries(1):
+                self.assertEqual(find_login_user(identifier), self.alice)
+
+    def test_username_shaped_like_email_falls_back(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(find_login_user("odd@name.io"), self.odd)
+
+    def test_unknown_identifier(self):
+        self.assertIsNone(find_login_user("nobody"))
+        self.assertIsNone(find_login_user("nobody@test.com"))
+
+    def test_emails_and_phones_of_any_shape_still_log_in(self):
+        ops = User.objects.create(username="ops", email="ops@localhost", phone="4411")
+        self.assertEqual(find_login_user("ops@localhost"), ops)
+        self.assertEqual(find_login_user("OPS@localhost"), ops)
+        self.assertEqual(find_login_user("4411"), ops)
+
+    def test_case_variant_emails_are_ambiguous(self):
+        twin = User.objects.create(username="alice2", email="alice@example.com", phone="09121112299")
+        self.assertEqual(find_login_user("alice@example.com"), twin)  # the exact address picks one
+        self.assertEqual(find_login_user("Alice@Example.com"), self.alice)
+        self.assertIsNone(find_login_user("ALICE@EXAMPLE.COM"))
@@ -0,0 +1,132 @@
+# accounts/tests/test_profile_cache.py
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.cache import ProfileDocumentCache, check_profile_cache, profile_cache
+from ads.models import Ad
+
+User = get_user_model()
+
+
+class Builder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, contractor_id):
+        self.calls += 1
+        return {"id": contractor_id, "build": self.calls}
+
+
+class ProfileDocumentCacheUnitTests(SimpleTestCase):
+    def test_hit_invalidate_and_lru_bound(self):
+        cache = ProfileDocumentCache(max_entries=2)
+        build = Builder()
+
+        self.assertEqual(cache.get(1, build)["build"], 1)
+        self.assertEqual(cache.get(1, build)["build"], 1)
+
+        cache.invalidate(1)
+        self.assertEqual(cache.get(1, build)["build"], 2)
+
+        cache.get(2, build)
+        cache.get(3, build)  # evicts 1
+        self.assertEqual(cache.get(1, build)["build"], 5)
+
+    def test_stale_while_revalidate_serves_old_copy_then_new(self):
+        spawned = []
+        cache = ProfileDocumentCache(stale_while_revalidate=True, spawn=spawned.append)
+        build = Builder()
+
+        cache.get(7, build)
+        cache.invalidate(7)
+
+        # stale copy returned right away, exactly one rebuild scheduled
+        self.assertEqual(cache.get(7, build)["build"], 1)
+        self.assertEqual(cache.get(7, build)["build"], 1)
+        self.assertEqual(len(spawned), 1)
+
+        spawned[0]()
+        self.assertEqual(cache.get(7, build)["build"], 2)
+        self.assertEqual(build.calls, 2)
+
+    @override_settings(CACHES={"shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_shared_tier_propagates_invalidation_between_workers(self):
+        caches["shared"].clear()
+        worker_a = ProfileDocumentCache(shared_cache="shared")
+        worker_b = ProfileDocumentCache(shared_cache="shared")
+        build = Builder()
+
+        worker_a.get(1, build)
+        self.assertEqual(worker_b.get(1, build)["build"], 1)  # served from L2
+        self.assertEqual(build.calls, 1)
+
+        worker_a.invalidate(1)
+        self.assertEqual(worker_b.get(1, build)["build"], 2)
+
+    def test_disabled_cache_builds_every_time(self):
+        cache = ProfileDocumentCache(enabled=False)
+        build = Builder()
+
+        cache.get(1, build)
+        self.assertEqual(cache.get(1, build)["build"], 2)
+
+    def test_off_unless_the_shared_tier_is_shared(self):
+        def enabled(**conf):
+            with self.settings(CONTRACTOR_PROFILE_CACHE=conf):
+                return ProfileDocumentCache.from_settings().enabled
+
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://"}}
+        self.assertFalse(enabled())
+        self.assertFalse(enabled(SHARED_CACHE="default"))  # LocMemCache: per process
+        with self.settings(CACHES=redis):
+            self.assertTrue(enabled(SHARED_CACHE="default"))
+        self.assertFalse(enabled(ENABLED=False, SHARED_CACHE="default"))
+
+        with self.settings(CONTRACTOR_PROFILE_CACHE={"ENABLED": True}):
+            self.assertEqual([w.id for w in check_profile_cache(None)], ["accounts.W001"])
+        self.assertEqual(check_profile_cache(None), [])
+
+
+class ProfileCacheEndpointTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create(username="pc_customer", email="pc_c@test.com", phone="09127770001", role="CUSTOMER")
+        cls.contractor = User.objects.create(username="pc_contractor", email="pc_k@test.com", phone="09127770002", role="CONTRACTOR")
+
+    def setUp(self):
+        profile_cache.clear()
+        # off by default without a shared CACHES backend (accounts.W001); one test process is one worker
+        enabled = mock.patch.object(profile_cache, "enabled", True)
+        enabled.start()
+        self.addCleanup(enabled.stop)
+        token = RefreshToken.for_user(self.customer).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_review_invalidates_cached_profile(self):
+        url = f"/api/contractors/{self.contractor.id}/profile/"
+        self.assertEqual(self.client.get(url).data["review_count"], 0)
+
+        with self.assertNumQueries(1):  # auth only
+            self.client.get(url)
+
+        ad = Ad.objects.create(
+            title="job", description="d", category="c", creator=self.customer,
+            status=Ad.Status.DONE, assigned_contractor=self.contractor,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(f"/api/ads/{ad.id}/review/", {"rating": 4, "text": "ok"}, format="json")
+        self.assertEqual(r.status_code, 201)
+
+        r = self.client.get(url)
+        self.assertEqual(r.data["review_count"], 1)
+        self.assertEqual(len(r.data["reviews"]), 1)
+
+    def test_unknown_contractor_is_not_cached(self):
+        url = "/api/contractors/999999/profile/"
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 404)
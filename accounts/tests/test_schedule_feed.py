@@ -0,0 +1,133 @@
+# accounts/tests/test_schedule_feed.py
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from accounts.authentication import bump_token_version
+from accounts.ical import fold
+from accounts.tokens import RoleRefreshToken
+from ads.models import Ad
+
+User = get_user_model()
+
+DAY = datetime(2030, 3, 10, tzinfo=dt_timezone.utc)
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class ScheduleTestBase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("sf_customer", "CUSTOMER", "09126660001")
+        cls.contractor = create_user("sf_contractor", "CONTRACTOR", "09126660002")
+        cls.other = create_user("sf_other", "CONTRACTOR", "09126660003")
+
+        def job(contractor, start, status=Ad.Status.ASSIGNED, title="Fix sink"):
+            return Ad.objects.create(
+                title=title, description="d", category="c", creator=cls.customer, status=status,
+                assigned_contractor=contractor, scheduled_at=start, location="Tehran, Vanak; unit 3",
+            )
+
+        cls.jobs = [
+            job(cls.contractor, DAY + timedelta(hours=9)),
+            job(cls.contractor, DAY + timedelta(hours=13)),
+            job(cls.contractor, DAY + timedelta(days=2, hours=9)),
+            job(cls.contractor, DAY + timedelta(days=40)),
+        ]
+        job(cls.contractor, DAY + timedelta(hours=11), status=Ad.Status.DONE)
+        job(cls.other, DAY + timedelta(hours=9))
+
+    def setUp(self):
+        cache.clear()
+        self.as_user(self.contractor)
+
+    def as_user(self, user):
+        token = RoleRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+class ScheduleRangeTests(ScheduleTestBase):
+    def test_week_range_with_day_counts(self):
+        r = self.client.get("/api/me/schedule/?from=2030-03-09&to=2030-03-15")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["count"], 3)
+        self.assertEqual(r.data["days"], {"2030-03-10": 2, "2030-03-12": 1})
+        self.assertEqual([a["id"] for a in r.data["items"]], [j.id for j in self.jobs[:3]])
+
+    def test_single_date_still_supported(self):
+        r = self.client.get("/api/me/schedule/?date=2030-03-10")
+        self.assertEqual((r.data["date"], r.data["count"]), ("2030-03-10", 2))
+
+    def test_one_query_for_a_range(self):
+        self.client.get("/api/me/schedule/?date=2030-03-10")  # warm the token-version cache
+        with self.assertNumQueries(1):
+            self.client.get("/api/me/schedule/?from=2030-03-01&to=2030-04-30")
+
+    def test_bad_ranges(self):
+        for qs in ("", "from=2030-03-10", "from=2030-03-10&to=2030-03-01", "from=2030-01-01&to=2030-06-01", "date=nope"):
+            self.assertEqual(self.client.get(f"/api/me/schedule/?{qs}").status_code, 400, qs)
+
+
+class ScheduleICSTests(ScheduleTestBase):
+    def feed_url(self):
+        return self.client.get("/api/me/schedule/?date=2030-03-10").data["ics_url"]
+
+    def get_ics(self, url, **headers):
+        r = self.client.get(url, **headers)
+        body = b"".join(r.streaming_content).decode() if r.streaming else r.content.decode()
+        return r, body
+
+    def test_feed_streams_events(self):
+        r, body = self.get_ics("/api/me/schedule.ics?from=2030-03-01&to=2030-03-31", HTTP_ACCEPT="text/calendar")
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.streaming)
+        self.assertTrue(r["Content-Type"].startswith("text/calendar"))
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 3)
+        self.assertIn("DTSTART:20300310T090000Z\r\nDTEND:20300310T100000Z", body)
+        self.assertIn("LOCATION:Tehran\\, Vanak\; unit 3", body)
+
+    def test_etag_revalidation(self):
+        url = "/api/me/schedule.ics?from=2030-03-01&to=2030-03-31"
+        r, _ = self.get_ics(url)
+        etag = r["ETag"]
+
+        r, body = self.get_ics(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((r.status_code, body), (304, ""))
+
+        Ad.objects.filter(id=self.jobs[0].id).update(location="Elsewhere")
+        r, _ = self.get_ics(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertNotEqual(r["ETag"], etag)
+
+    def test_feed_token_auth_and_revocation(self):
+        url = self.feed_url() + "&from=2030-03-01&to=2030-03-31"
+        self.client.credentials()
+        r, body = self.get_ics(url)
+        self.assertEqual(r.status_code, 200)
+        self.assertIn("BEGIN:VEVENT", body)
+
+        self.assertEqual(self.client.get("/api/me/schedule.ics?feed=forged").status_code, 401)
+
+        # the feed user, then the schedule rows: no deferred-field loads while rendering
+        with self.assertNumQueries(2):
+            r, body = self.get_ics(url)
+        self.assertIn(f"{self.contractor.username} schedule", body)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_token_version(self.contractor.id)
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_only_contractors(self):
+        self.as_user(self.customer)
+        self.assertEqual(self.client.get("/api/me/schedule.ics").status_code, 403)
+
+    def test_long_lines_are_folded(self):
+        line = "SUMMARY:" + "é" * 60
+        folded = fold(line)
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded.rstrip("\r\n").split("\r\n")))
+        self.assertEqual(folded.replace("\r\n ", "").rstrip("\r\n"), line)
@@ -0,0 +1,48 @@
+from django.core import signing
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def user_roles(user):
+    """The single `role` field first, then any extra roles granted through groups."""
+    roles = [user.role]
+    for name in user.groups.values_list("name", flat=True):
+        if name not in roles:
+            roles.append(name)
+    return roles
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry everything most views need
+    (id, username, role, group roles, admin flags) so the request user
+    can be built without touching accounts_user.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["username"] = user.username
+        token["role"] = user.role
+        token["roles"] = user_roles(user)
+        token["is_superuser"] = user.is_superuser
+        token["is_staff"] = user.is_staff
+        token["ver"] = user.token_version
+        return token
+
+
+def token_pair(user):
+    refresh = RoleRefreshToken.for_user(user)
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+SCHEDULE_FEED_SALT = "accounts.schedule-feed"
+
+
+def schedule_feed_token(user_id, token_version):
+    """
+    URL-safe token for the contractor's .ics feed (calendar apps can't send
+    Authorization headers). Revoked along with the user's JWTs when
+    token_version is bumped.
+    """
+    return signing.dumps({"uid": user_id, "ver": token_version}, salt=SCHEDULE_FEED_SALT, compress=True)
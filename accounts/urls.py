@@ -1,17 +1,25 @@
 from django.urls import path
-from .views import MyScheduleAPIView, UserRolesAPIView
+from .views import MyScheduleAPIView, MyScheduleICSView, UserRolesAPIView
 from .views import RegisterView, LoginView, ContractorProfileAPIView
 from .views import MeProfileAPIView
 from .views import ContractorsListAPIView
+from .async_views import AsyncContractorProfileView, AsyncContractorsListView, AsyncLoginView, AsyncRegisterView
 
 urlpatterns = [
     path("auth/register/", RegisterView.as_view()),
     path("auth/login/", LoginView.as_view()),
+    # async variants for ASGI deployments (hashing on a bounded pool, 503 when saturated)
+    path("auth/register/async/", AsyncRegisterView.as_view()),
+    path("auth/login/async/", AsyncLoginView.as_view()),
     path("me/profile/", MeProfileAPIView.as_view()),
     path("me/schedule/", MyScheduleAPIView.as_view()),
+    path("me/schedule.ics", MyScheduleICSView.as_view()),
 
     path("contractors/", ContractorsListAPIView.as_view()),
     path("users/<int:user_id>/roles/", UserRolesAPIView.as_view()),
     path("contractors/<int:contractor_id>/profile/", ContractorProfileAPIView.as_view()),
+    # async read variants for ASGI deployments (async ORM, no worker thread per request)
+    path("contractors/async/", AsyncContractorsListView.as_view()),
+    path("contractors/<int:contractor_id>/profile/async/", AsyncContractorProfileView.as_view()),
 ]
 
@@ -6,5 +6,10 @@ def has_role(user, roles):
     if getattr(user, "role", None) in roles:
         return True
 
+    # request user built from token claims: group roles are in the token
+    token_roles = getattr(user, "token_roles", None)
+    if token_roles is not None:
+        return any(r in token_roles for r in roles)
+
     # dynamic roles via groups
     return user.groups.filter(name__in=roles).exists()
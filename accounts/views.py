@@ -1,9 +1,8 @@
 # accounts/views.py
+from datetime import datetime, time, timedelta
 
 from django.contrib.auth import get_user_model
-from django.contrib.auth.hashers import check_password
-from django.db.models import Q, Avg, Count
-from django.db.models import OuterRef, Subquery, IntegerField, FloatField, Count, Avg
+from django.db.models import F
 from django.db.models.functions import Coalesce
 
 from rest_framework import status, serializers
@@ -12,7 +11,6 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import NotFound
 
-from rest_framework_simplejwt.tokens import RefreshToken
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
 from ads.models import Ad
@@ -25,14 +23,25 @@ from .serializers import RegisterSerializer, PublicUserSerializer, AdSummarySeri
 from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
 from django.contrib.auth.models import Group
 
-from accounts.models import User
+from accounts.models import User, ContractorStats
 from accounts.utils import has_role
-
+from accounts.cache import profile_cache
+from accounts.authentication import ScheduleFeedAuthentication, bump_token_version, current_token_version
+from accounts.tokens import schedule_feed_token, token_pair
+from accounts.hashing import check_login_password
+from accounts.identifiers import find_login_user
+from accounts.ical import ICalendarRenderer, calendar_chunks
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django.utils.dateparse import parse_date
+from rest_framework.settings import api_settings
 
 
 
 from ads.serializers import AdSerializer  # or AdSummarySerializer
+from config.conditional import make_etag, not_modified, queryset_state, set_validators
+from config.lean import lean
 
 
 User = get_user_model()
@@ -84,55 +93,54 @@ class LoginView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user = User.objects.filter(
-            Q(username=identifier) | Q(email=identifier) | Q(phone=identifier)
-        ).first()
+        user = find_login_user(identifier)
 
-        if not user or not check_password(password, user.password):
+        # unknown identifiers still pay for one hash, so response time doesn't reveal them
+        if not check_login_password(password, user):
             return Response({"detail": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        refresh = RefreshToken.for_user(user)
-        return Response(
-            {"refresh": str(refresh), "access": str(refresh.access_token)},
-            status=status.HTTP_200_OK,
-        )
+        return Response(token_pair(user), status=status.HTTP_200_OK)
 
 
 class ContractorProfileAPIView(APIView):
     """
     Part 14.2:
-    Public contractor profile, includes live aggregates + reviews ordered by time.
+    Public contractor profile, includes aggregates (from ContractorStats) + reviews ordered by time.
+    Served through profile_cache; review / confirm-done / role changes invalidate it.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, contractor_id):
+        doc = profile_cache.get(contractor_id, self.build_document)
+        # the cached document is the representation, so its hash is the validator
+        etag = make_etag("contractor-profile", repr(doc))
+        return set_validators(not_modified(request, etag) or Response(doc), etag)
+
+    @staticmethod
+    def build_document(contractor_id):
         try:
-            contractor = User.objects.get(id=contractor_id, role=User.Role.CONTRACTOR)
+            contractor = User.objects.select_related("contractor_stats").get(
+                id=contractor_id, role=User.Role.CONTRACTOR
+            )
         except User.DoesNotExist:
             raise NotFound("Contractor not found")
 
-        completed_ads_count = Ad.objects.filter(
-            assigned_contractor=contractor, status=Ad.Status.DONE
-        ).count()
-
-        agg = Review.objects.filter(contractor=contractor).aggregate(
-            avg_rating=Avg("rating"),
-            review_count=Count("id"),
-        )
+        try:
+            stats = contractor.contractor_stats
+        except ContractorStats.DoesNotExist:
+            stats = ContractorStats(contractor=contractor)
 
         reviews = Review.objects.filter(contractor=contractor).order_by("-created_at")
 
-        return Response(
-            {
-                "id": contractor.id,
-                "username": contractor.username,
-                "role": contractor.role,
-                "completed_ads_count": completed_ads_count,
-                "avg_rating": float(agg["avg_rating"] or 0),
-                "review_count": agg["review_count"],
-                "reviews": ReviewSerializer(reviews, many=True).data,
-            }
-        )
+        return {
+            "id": contractor.id,
+            "username": contractor.username,
+            "role": contractor.role,
+            "completed_ads_count": stats.completed_ads_count,
+            "avg_rating": float(stats.avg_rating),
+            "review_count": stats.review_count,
+            "reviews": lean(ReviewSerializer).serialize(reviews),
+        }
 
 
 class MeProfileAPIView(APIView):
@@ -162,78 +170,65 @@ class MeProfileAPIView(APIView):
             # Safe default for SUPPORT/ADMIN (customize if you want)
             qs = Ad.objects.filter(creator=u).order_by("-created_at")
 
-        return Response(
-            {
-                "user": user_data,
-                "ads": AdSummarySerializer(qs, many=True).data,
-            }
+        count, last = queryset_state(qs)
+        etag = make_etag("me-profile", user_data, count, last)
+        response = not_modified(request, etag)
+        if response is None:
+            response = Response(
+                {
+                    "user": user_data,
+                    "ads": lean(AdSummarySerializer).serialize(qs),
+                }
+            )
+        return set_validators(response, etag)
+
+
+def contractor_directory(params):
+    """The contractor list query for `params` (?min_avg_rating, ?min_review_count, ?ordering), as value dicts."""
+    min_avg = params.get("min_avg_rating")
+    min_reviews = params.get("min_review_count")
+    ordering = params.get("ordering", "-avg_rating,-review_count")
+
+    # aggregates come from the ContractorStats read model: one PK join per contractor
+    qs = (
+        User.objects.filter(role=User.Role.CONTRACTOR)
+        .annotate(
+            avg_rating=Coalesce(F("contractor_stats__avg_rating"), 0.0),
+            review_count=Coalesce(F("contractor_stats__review_count"), 0),
+            completed_ads_count=Coalesce(F("contractor_stats__completed_ads_count"), 0),
         )
+    )
 
+    # filters
+    if min_avg is not None:
+        qs = qs.filter(avg_rating__gte=float(min_avg))
+    if min_reviews is not None:
+        qs = qs.filter(review_count__gte=int(min_reviews))
 
-class ContractorsListAPIView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        # query params
-        min_avg = request.query_params.get("min_avg_rating")
-        min_reviews = request.query_params.get("min_review_count")
-        ordering = request.query_params.get("ordering", "-avg_rating,-review_count")
-
-        # subqueries for aggregates (works even if no related_name)
-        avg_sub = (
-            Review.objects.filter(contractor_id=OuterRef("pk"))
-            .values("contractor_id")
-            .annotate(a=Avg("rating"))
-            .values("a")[:1]
-        )
+    # ordering (safe allow-list)
+    allowed = {"avg_rating", "review_count", "completed_ads_count", "id", "username"}
+    order_fields = []
+    for part in ordering.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key = part[1:] if part.startswith("-") else part
+        if key in allowed:
+            order_fields.append(part)
 
-        count_sub = (
-            Review.objects.filter(contractor_id=OuterRef("pk"))
-            .values("contractor_id")
-            .annotate(c=Count("id"))
-            .values("c")[:1]
-        )
+    if order_fields:
+        qs = qs.order_by(*order_fields)
+    else:
+        qs = qs.order_by("-avg_rating", "-review_count")
 
-        done_count_sub = (
-            Ad.objects.filter(assigned_contractor_id=OuterRef("pk"), status=Ad.Status.DONE)
-            .values("assigned_contractor_id")
-            .annotate(c=Count("id"))
-            .values("c")[:1]
-        )
+    return qs.values("id", "username", "avg_rating", "review_count", "completed_ads_count")
 
-        qs = (
-            User.objects.filter(role=User.Role.CONTRACTOR)
-            .annotate(
-                avg_rating=Coalesce(Subquery(avg_sub, output_field=FloatField()), 0.0),
-                review_count=Coalesce(Subquery(count_sub, output_field=IntegerField()), 0),
-                completed_ads_count=Coalesce(Subquery(done_count_sub, output_field=IntegerField()), 0),
-            )
-        )
 
-        # filters
-        if min_avg is not None:
-            qs = qs.filter(avg_rating__gte=float(min_avg))
-        if min_reviews is not None:
-            qs = qs.filter(review_count__gte=int(min_reviews))
-
-        # ordering (safe allow-list)
-        allowed = {"avg_rating", "review_count", "completed_ads_count", "id", "username"}
-        order_fields = []
-        for part in ordering.split(","):
-            part = part.strip()
-            if not part:
-                continue
-            key = part[1:] if part.startswith("-") else part
-            if key in allowed:
-                order_fields.append(part)
-
-        if order_fields:
-            qs = qs.order_by(*order_fields)
-        else:
-            qs = qs.order_by("-avg_rating", "-review_count")
+class ContractorsListAPIView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        data = qs.values("id", "username", "avg_rating", "review_count", "completed_ads_count")
-        return Response(list(data))
+    def get(self, request):
+        return Response(list(contractor_directory(request.query_params)))
 
 
 
@@ -264,35 +259,127 @@ class UserRolesAPIView(APIView):
         # (optional) keep your old single role field in sync
         u.role = roles[0]
         u.save(update_fields=["role"])
+        profile_cache.invalidate_on_commit(u.id)
+
+        # tokens issued before this call still claim the old roles
+        bump_token_version(u.id)
 
         return Response({"user_id": u.id, "roles": roles})
 
 
 
+def schedule_window(params, default_days, max_days):
+    """
+    (first_day, last_day, start, end) from ?date= or ?from=&to= (inclusive days).
+    start/end are aware datetimes, so the filter is a plain range on scheduled_at.
+    """
+    date_str = params.get("date")
+    if date_str:
+        first = last = parse_date(date_str)
+        if first is None:
+            raise ValidationError({"date": "invalid date format YYYY-MM-DD"})
+    elif params.get("from") or params.get("to"):
+        first, last = parse_date(params.get("from") or ""), parse_date(params.get("to") or "")
+        if first is None or last is None:
+            raise ValidationError({"from": "required, format YYYY-MM-DD", "to": "required, format YYYY-MM-DD"})
+    elif default_days is not None:
+        first = timezone.localdate()
+        last = first + timedelta(days=default_days - 1)
+    else:
+        raise ValidationError({"date": "required, format YYYY-MM-DD (or from/to)"})
+
+    if last < first:
+        raise ValidationError({"to": "must not be before from"})
+    if (last - first).days >= max_days:
+        raise ValidationError({"to": f"range is limited to {max_days} days"})
+
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(first, time.min, tzinfo=tz)
+    end = datetime.combine(last + timedelta(days=1), time.min, tzinfo=tz)
+    return first, last, start, end
+
+
+def contractor_schedule(contractor, start, end):
+    # one range probe on ad_contractor_interval_idx, already in scheduled_at order
+    return Ad.objects.filter(
+        assigned_contractor=contractor,
+        status=Ad.Status.ASSIGNED,
+        scheduled_at__gte=start,
+        scheduled_at__lt=end,
+    ).order_by("scheduled_at")
+
+
 class MyScheduleAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    MAX_DAYS = 62
+
     def get(self, request):
         u = request.user
         if u.role != User.Role.CONTRACTOR:
             raise PermissionDenied("Only contractors have a schedule.")
 
-        date_str = request.query_params.get("date")
-        if not date_str:
-            raise ValidationError({"date": "required, format YYYY-MM-DD"})
+        first, last, start, end = schedule_window(request.query_params, None, self.MAX_DAYS)
+        ads = list(contractor_schedule(u, start, end))
+
+        # per-day counts from the same rows (no COUNT query)
+        days = {}
+        for ad in ads:
+            day = timezone.localtime(ad.scheduled_at).date().isoformat()
+            days[day] = days.get(day, 0) + 1
+
+        data = {
+            "from": first.isoformat(),
+            "to": last.isoformat(),
+            "count": len(ads),
+            "days": days,
+            "items": AdSerializer(ads, many=True).data,
+            "ics_url": request.build_absolute_uri(
+                "/api/me/schedule.ics?feed=" + schedule_feed_token(u.pk, current_token_version(u.pk))
+            ),
+        }
+        if request.query_params.get("date"):
+            data["date"] = request.query_params["date"]
+        return Response(data)
+
+
+class MyScheduleICSView(APIView):
+    """
+    The contractor schedule as a streamed iCalendar feed. Calendar apps can
+    authenticate with ?feed=<token> (see `ics_url` in /api/me/schedule/) and
+    poll with If-None-Match; an unchanged schedule is a 304 with no body.
+    """
+    authentication_classes = [ScheduleFeedAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [ICalendarRenderer, *api_settings.DEFAULT_RENDERER_CLASSES]
+
+    PAST_DAYS = 30
+    DEFAULT_DAYS = 180
+    MAX_DAYS = 400
 
-        d = parse_date(date_str)
-        if d is None:
-            raise ValidationError({"date": "invalid date format YYYY-MM-DD"})
+    def get(self, request):
+        u = request.user
+        if u.role != User.Role.CONTRACTOR:
+            raise PermissionDenied("Only contractors have a schedule.")
 
-        qs = Ad.objects.filter(
-            assigned_contractor=u,
-            status=Ad.Status.ASSIGNED,
-            scheduled_at__date=d,
-        ).order_by("scheduled_at")
-
-        return Response({
-            "date": date_str,
-            "count": qs.count(),
-            "items": AdSerializer(qs, many=True).data,
-        })
+        params = request.query_params
+        if params.get("date") or params.get("from") or params.get("to"):
+            _, _, start, end = schedule_window(params, None, self.MAX_DAYS)
+        else:
+            _, _, start, end = schedule_window(params, self.PAST_DAYS + self.DEFAULT_DAYS, self.MAX_DAYS)
+            start -= timedelta(days=self.PAST_DAYS)
+
+        rows = list(
+            contractor_schedule(u, start, end).values_list(
+                "id", "title", "description", "location", "scheduled_at", "scheduled_end", "created_at",
+            )
+        )
+        etag = make_etag("schedule-ics", rows)
+        response = not_modified(request, etag)
+        if response is None:
+            response = StreamingHttpResponse(
+                calendar_chunks(rows, request.get_host().split(":")[0], name=f"{u.username} schedule"),
+                content_type="text/calendar; charset=utf-8",
+            )
+            response["Content-Disposition"] = 'inline; filename="schedule.ics"'
+        return set_validators(response, etag)
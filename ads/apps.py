@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class AdsConfig(AppConfig):
     name = 'ads'
+
+    def ready(self):
+        from .feed import ad_changed, check_feed_cache
+        from .search import ensure_fts
+
+        # keep the FTS5 index + triggers alive across table rebuilds (see ads/search.py)
+        post_migrate.connect(ensure_fts, sender=self)
+
+        # keep the cached /api/ads/ listing in step with ORM writes (see ads/feed.py)
+        post_save.connect(ad_changed, sender="ads.Ad")
+        post_delete.connect(ad_changed, sender="ads.Ad")
+        checks.register(check_feed_cache, checks.Tags.caches)
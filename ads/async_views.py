@@ -0,0 +1,21 @@
+# ads/async_views.py
+"""Native async ad list / detail for the ASGI stack (see config/async_api.py)."""
+from config.async_api import AsyncDetailView, AsyncListView
+
+from . import lifecycle
+from .serializers import AdSerializer
+
+
+class AsyncAdListView(AsyncListView):
+    serializer_class = AdSerializer
+    basename = "ads"
+
+    def get_queryset(self):
+        return lifecycle.visible_ads(self.request.user)
+
+
+class AsyncAdDetailView(AsyncDetailView):
+    serializer_class = AdSerializer
+
+    def get_queryset(self):
+        return lifecycle.visible_ads(self.request.user)
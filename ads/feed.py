@@ -0,0 +1,247 @@
+# ads/feed.py
+"""
+Cached /api/ads/ listing.
+
+Customers and contractors all see the same OPEN ads, plus a few of their
+own: the non-OPEN ads they created (customers) or are assigned to
+(contractors). The listing is kept as two segments, each serialized once
+(by the compiled AdSerializer, config/lean.py):
+
+- shared, keyed by role scope: "open" for customers and contractors, "all"
+  for support/admin. Built with one query and reused by every caller until
+  the feed generation moves. Callers that miss at the same time wait for a
+  single rebuild, so a thousand contractors refreshing after a change cost
+  one query per process, not a thousand.
+- own, per user: the user's non-OPEN ads, tagged with the user's own
+  generation.
+
+Every ad write (create, edit, delete via the model signals; status
+transitions via ads.lifecycle) bumps the feed generation and those of the
+ad's owner and assignee, once right away and once after commit, so a
+rebuild that raced the transaction is thrown away too. Pages are cut from
+both segments with KeysetCursorPagination.paginate_segments: same cursors,
+same pages as the database path.
+
+Generations live in ADS_FEED_CACHE["SHARED_CACHE"] when it is set, so a bump
+in one worker is seen by all; segments always live in-process. Without a
+shared tier every worker would keep its own generations and miss the
+others' writes, so ENABLED defaults to "only with a shared SHARED_CACHE"
+and forcing it on without one is a system check warning (ads.W001).
+"""
+import threading
+import time
+from collections import OrderedDict
+from operator import attrgetter
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+
+from accounts.models import User
+from config.caches import is_shared_cache
+from config.db_router import PRIMARY
+from config.lean import lean
+
+from .models import Ad
+from .serializers import AdSerializer
+
+
+DEFAULTS = {
+    "ENABLED": None,           # None: on only when SHARED_CACHE is shared between processes
+    "MAX_SHARED_ROWS": 5000,   # a bigger shared segment isn't cached; the listing reads the database
+    "MAX_USERS": 10000,        # own segments kept (LRU)
+    "TTL": 60,                 # seconds a segment is trusted without a bump (writes that bypass the ORM)
+    "SHARED_CACHE": None,      # Django cache alias for the generation counters, e.g. "default"
+}
+
+SHARED_SCOPES = {
+    "open": Q(status=Ad.Status.OPEN),
+    "all": Q(),
+}
+
+FEED_GENERATION_KEY = "ads-feed:g"
+
+
+def feed_settings():
+    return {**DEFAULTS, **getattr(settings, "ADS_FEED_CACHE", {})}
+
+
+def check_feed_cache(app_configs, **kwargs):
+    """System check: a cache switched on without a shared tier serves other workers' stale listings."""
+    conf = feed_settings()
+    if conf["ENABLED"] and not is_shared_cache(conf["SHARED_CACHE"]):
+        return [checks.Warning(
+            "ADS_FEED_CACHE is ENABLED without a SHARED_CACHE shared between processes: with several "
+            "workers, a write in one leaves the others serving the old /api/ads/ listing for up to TTL seconds.",
+            hint='Set ADS_FEED_CACHE["SHARED_CACHE"] to a Redis / Memcached / database CACHES alias, '
+                 'or leave ENABLED unset (None) to turn the cache on only when there is one.',
+            id="ads.W001",
+        )]
+    return []
+
+
+def _user_generation_key(user_id):
+    return f"ads-feed:g:{user_id}"
+
+
+class AdFeedCache:
+    def __init__(self, enabled=True, max_shared_rows=5000, max_users=10000, ttl=60, shared_cache=None):
+        self.enabled = enabled
+        self.max_shared_rows = max_shared_rows
+        self.max_users = max_users
+        self.ttl = ttl
+        self.shared_cache = shared_cache
+
+        self._lock = threading.Lock()
+        self._build_locks = {scope: threading.Lock() for scope in SHARED_SCOPES}
+        self._segments = {}             # scope -> (rows or None, generation, stored_at)
+        self._own = OrderedDict()       # user_id -> (rows, generation, stored_at)
+        self._generations = {}          # used when there is no shared tier
+        # generations start from the clock, so ETags never repeat across restarts
+        self._start = time.time_ns()
+
+    @classmethod
+    def from_settings(cls):
+        conf = feed_settings()
+        enabled = conf["ENABLED"]
+        return cls(
+            enabled=is_shared_cache(conf["SHARED_CACHE"]) if enabled is None else enabled,
+            max_shared_rows=conf["MAX_SHARED_ROWS"],
+            max_users=conf["MAX_USERS"],
+            ttl=conf["TTL"],
+            shared_cache=conf["SHARED_CACHE"],
+        )
+
+    # -------- scopes / generations --------
+
+    @staticmethod
+    def scope(user):
+        """(shared scope, filter for the user's own ads or None)."""
+        if user.role == User.Role.CUSTOMER:
+            return "open", Q(creator=user)
+        if user.role == User.Role.CONTRACTOR:
+            return "open", Q(assigned_contractor=user)
+        return "all", None
+
+    @property
+    def _shared(self):
+        return caches[self.shared_cache] if self.shared_cache else None
+
+    def _read_generations(self, keys):
+        if self._shared is None:
+            with self._lock:
+                return [self._generations.setdefault(key, self._start) for key in keys]
+        found = self._shared.get_many(keys)
+        for key in keys:
+            if key not in found:
+                self._shared.add(key, self._start, None)
+                found[key] = self._shared.get(key, self._start)
+        return [found[key] for key in keys]
+
+    def bump(self, *user_ids):
+        """Move the feed generation and those of `user_ids` (None entries are skipped)."""
+        keys = [FEED_GENERATION_KEY] + [_user_generation_key(uid) for uid in set(user_ids) if uid is not None]
+        if self._shared is None:
+            with self._lock:
+                for key in keys:
+                    self._generations[key] = self._generations.get(key, self._start) + 1
+            return
+        for key in keys:
+            self._shared.add(key, self._start, None)
+            try:
+                self._shared.incr(key)
+            except ValueError:
+                # evicted between add() and incr()
+                self._shared.set(key, time.time_ns(), None)
+
+    def invalidate(self, *user_ids):
+        """bump() now and again once the current transaction commits."""
+        self.bump(*user_ids)
+        transaction.on_commit(lambda: self.bump(*user_ids))
+
+    # -------- segments --------
+
+    def _is_fresh(self, entry, generation):
+        return entry is not None and entry[1] == generation and time.monotonic() - entry[2] < self.ttl
+
+    @staticmethod
+    def _load(condition, limit=None):
+        """LeanRows matching `condition`, oldest first; None when there are more than `limit`."""
+        # on the primary: stored under a generation the primary's writes move, a replica may lag behind it
+        queryset = Ad.objects.using(PRIMARY).filter(condition)
+        if limit is None:
+            # a handful of rows: sorting here keeps the query on its owner/assignee index
+            return sorted(lean(AdSerializer).rows(queryset), key=attrgetter("created_at", "pk"))
+        # the newest limit + 1: enough to tell whether the segment fits
+        rows = lean(AdSerializer).rows(queryset.order_by("-created_at", "-id")[: limit + 1])
+        if len(rows) > limit:
+            return None
+        rows.reverse()
+        return rows
+
+    def _shared_rows(self, scope, generation):
+        entry = self._segments.get(scope)
+        if self._is_fresh(entry, generation):
+            return entry[0]
+        with self._build_locks[scope]:
+            # whoever held the lock may have just built it
+            entry = self._segments.get(scope)
+            if self._is_fresh(entry, generation):
+                return entry[0]
+            rows = self._load(SHARED_SCOPES[scope], self.max_shared_rows)
+            self._segments[scope] = (rows, generation, time.monotonic())
+            return rows
+
+    def _own_rows(self, user_id, condition, generation):
+        with self._lock:
+            entry = self._own.get(user_id)
+            if entry is not None:
+                self._own.move_to_end(user_id)
+        if self._is_fresh(entry, generation):
+            return entry[0]
+
+        rows = self._load(condition & ~Q(status=Ad.Status.OPEN))
+        with self._lock:
+            self._own[user_id] = (rows, generation, time.monotonic())
+            self._own.move_to_end(user_id)
+            while len(self._own) > self.max_users:
+                self._own.popitem(last=False)
+        return rows
+
+    # -------- public API --------
+
+    def segments(self, user):
+        """
+        (segments, version) for `user`'s listing: disjoint lists of LeanRow,
+        each oldest first, and a value that changes whenever any of them
+        does. None when the cache is off or the shared segment is too big.
+        """
+        if not self.enabled:
+            return None
+        scope, own = self.scope(user)
+        if own is None:
+            (generation,) = self._read_generations([FEED_GENERATION_KEY])
+            shared = self._shared_rows(scope, generation)
+            return None if shared is None else ([shared], (scope, generation))
+
+        generation, user_generation = self._read_generations([FEED_GENERATION_KEY, _user_generation_key(user.pk)])
+        shared = self._shared_rows(scope, generation)
+        if shared is None:
+            return None
+        return [shared, self._own_rows(user.pk, own, user_generation)], (scope, generation, user_generation)
+
+    def clear(self):
+        with self._lock:
+            self._segments.clear()
+            self._own.clear()
+            self._generations.clear()
+
+
+ad_feed = AdFeedCache.from_settings()
+
+
+def ad_changed(sender, instance, **kwargs):
+    """post_save / post_delete receiver for Ad (connected in AdsConfig.ready)."""
+    ad_feed.invalidate(instance.creator_id, instance.assigned_contractor_id)
@@ -0,0 +1,110 @@
+# ads/geo.py
+"""
+Geohash encoding and "within R km" helpers for plain SQLite (no spatial extension).
+
+An ad's position is stored as lat/lng plus a 12-char geohash. Ads in the same
+geohash cell share its prefix, so a cell is a contiguous range of the geohash
+index. A radius query becomes a handful of index range probes (the cell around
+the point and its 8 neighbours, at a precision where one cell is at least the
+radius), followed by an exact haversine check on the candidates.
+"""
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_LENGTH = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+# sorts after every base32 character, so [prefix, prefix + RANGE_END) is "starts with prefix"
+RANGE_END = "~"
+
+
+def encode(lat, lng, length=GEOHASH_LENGTH):
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < length:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                value, lng_lo = value * 2 + 1, mid
+            else:
+                value, lng_hi = value * 2, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value, lat_lo = value * 2 + 1, mid
+            else:
+                value, lat_hi = value * 2, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(length):
+    """(height, width) of a geohash cell in degrees."""
+    lat_bits = 5 * length // 2
+    lng_bits = 5 * length - lat_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def covering_precision(lat, radius_km):
+    """Longest geohash length whose cells are at least `radius_km` tall and wide at `lat`."""
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    d_lng = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 360.0)
+
+    length = 1
+    for n in range(1, GEOHASH_LENGTH + 1):
+        height, width = cell_size(n)
+        if height < d_lat or width < d_lng:
+            break
+        length = n
+    return length
+
+
+def covering_cells(lat, lng, radius_km):
+    """
+    Geohash prefixes whose union covers the circle: the cell containing the
+    point and its neighbours, deduplicated (near the poles / antimeridian).
+    """
+    length = covering_precision(lat, radius_km)
+    height, width = cell_size(length)
+    cells = set()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            y = min(max(lat + dy * height, -90.0), 90.0 - 1e-9)
+            x = (lng + dx * width + 180.0) % 360.0 - 180.0
+            cells.add(encode(y, x, length))
+    return sorted(cells)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def within(lat, lng, radius_km, points):
+    """
+    [(distance_km, key)] for `points` = [(key, lat, lng)] inside the radius,
+    nearest first. Trig on the query point is hoisted out of the loop.
+    """
+    p1 = math.radians(lat)
+    cos_p1 = math.cos(p1)
+    l1 = math.radians(lng)
+    limit = math.sin(min(radius_km / (2 * EARTH_RADIUS_KM), math.pi / 2)) ** 2
+
+    hits = []
+    for key, lat2, lng2 in points:
+        p2 = math.radians(lat2)
+        a = math.sin((p2 - p1) / 2) ** 2 + cos_p1 * math.cos(p2) * math.sin((math.radians(lng2) - l1) / 2) ** 2
+        if a <= limit:
+            hits.append((2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a))), key))
+    hits.sort()
+    return hits
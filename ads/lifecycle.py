@@ -0,0 +1,371 @@
+# ads/lifecycle.py
+"""
+Ad state transitions as single conditional UPDATEs.
+
+Each transition is `UPDATE ads_ad SET ... WHERE id = ? AND status = ? AND <actor
+predicate>`. One affected row means it happened. Zero rows means one fallback
+read of the ad, through the actor's visibility, to work out why:
+
+    AdNotFound           the ad doesn't exist or the actor can't see it
+    TransitionForbidden  the actor may not perform this transition
+    IllegalTransition    the ad is not in a state that allows it
+
+No DRF here, so management commands and bulk endpoints can call these too.
+The views map the errors to 404 / 403 / 400.
+
+Successful transitions are announced on the event stream (config/events.py)
+after commit: one read of the committed ad fans out an `ad` event to its
+owner and assignee, plus `work_request` events to the contractors whose
+requests an assign decided. The same hook moves the listing cache's
+generations (ads/feed.py).
+"""
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Exists, ExpressionWrapper, F, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from accounts.models import User
+from accounts.stats import record_completed_ad
+from config.events import hub
+
+from .feed import ad_feed
+from .models import MAX_JOB_DURATION, Ad, WorkRequest
+
+STAFF_ROLES = (User.Role.SUPPORT, User.Role.ADMIN)
+
+
+class TransitionError(Exception):
+    def __init__(self, message, field=None):
+        super().__init__(message)
+        self.message = message
+        self.field = field
+
+
+class AdNotFound(TransitionError):
+    def __init__(self, message="Not found."):
+        super().__init__(message)
+
+
+class TransitionForbidden(TransitionError):
+    pass
+
+
+class IllegalTransition(TransitionError):
+    pass
+
+
+class ConcurrentUpdate(IllegalTransition):
+    def __init__(self):
+        super().__init__("The ad was changed by someone else; try again.")
+
+
+def visible_ads(user):
+    """Ads `user` can see (the AdViewSet queryset)."""
+    if user.role == User.Role.CUSTOMER:
+        # own ads + OPEN ads
+        # (both terms are columns of ads_ad itself, so no join -> no duplicates -> no DISTINCT)
+        return Ad.objects.filter(Q(creator=user) | Q(status=Ad.Status.OPEN))
+
+    if user.role == User.Role.CONTRACTOR:
+        # OPEN ads + ads assigned to them
+        return Ad.objects.filter(Q(status=Ad.Status.OPEN) | Q(assigned_contractor=user))
+
+    # support/admin: see all
+    return Ad.objects.all()
+
+
+def _is_staff(user):
+    return user.role in STAFF_ROLES
+
+
+def _owner_or_staff(actor):
+    """Actor predicate for owner/support/admin transitions (None: the role can never pass)."""
+    if _is_staff(actor):
+        return Q()
+    if actor.role == User.Role.CUSTOMER:
+        return Q(creator=actor)
+    return None
+
+
+def ends_at(start, duration=F("estimated_duration")):
+    """`start` + the ad's estimated_duration, computed in SQL."""
+    return ExpressionWrapper(Value(start, DateTimeField()) + duration, output_field=DateTimeField())
+
+
+def overlapping_jobs(contractor_id, start, end):
+    """
+    The contractor's ASSIGNED jobs overlapping [start, end).
+
+    `scheduled_at < end AND scheduled_end > start`, plus `scheduled_at > start -
+    MAX_JOB_DURATION` (no job is longer), so the probe is a bounded range on
+    ad_contractor_interval_idx however many jobs the contractor has.
+    `end` may be an expression (e.g. OuterRef) when used inside an UPDATE.
+    """
+    return Ad.objects.filter(
+        assigned_contractor_id=contractor_id,
+        status=Ad.Status.ASSIGNED,
+        scheduled_at__gt=start - MAX_JOB_DURATION,
+        scheduled_at__lt=end,
+        scheduled_end__gt=start,
+    )
+
+
+def check_no_overlap(ad):
+    """
+    For edits that move a saved ad's end (estimated_duration): an ASSIGNED job
+    must still not overlap the contractor's other jobs. Call in the transaction
+    that saved it, so raising rolls the edit back.
+    """
+    if ad.status != Ad.Status.ASSIGNED or ad.scheduled_at is None:
+        return
+    if overlapping_jobs(ad.assigned_contractor_id, ad.scheduled_at, ad.scheduled_end).exclude(id=ad.id).exists():
+        raise IllegalTransition(
+            "Time conflict: the contractor already has a job at this time.", field="estimated_duration",
+        )
+
+
+def _ad_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise AdNotFound()
+
+
+def _publish(ad_id, requests_decided_at=None):
+    ad = (
+        Ad.objects.filter(id=ad_id)
+        .values("id", "status", "creator_id", "assigned_contractor_id", "contractor_marked_done", "scheduled_at")
+        .first()
+    )
+    if ad is None:
+        ad_feed.bump()
+        return
+    ad_feed.bump(ad["creator_id"], ad["assigned_contractor_id"])
+    hub.publish(
+        [ad["creator_id"], ad["assigned_contractor_id"]],
+        "ad",
+        {
+            "ad_id": ad["id"],
+            "status": ad["status"],
+            "assigned_contractor_id": ad["assigned_contractor_id"],
+            "contractor_marked_done": ad["contractor_marked_done"],
+            "scheduled_at": ad["scheduled_at"],
+        },
+    )
+    if requests_decided_at is not None:
+        decided = WorkRequest.objects.filter(ad_id=ad_id, updated_at=requests_decided_at)
+        for wr_id, contractor_id, status in decided.values_list("id", "contractor_id", "status"):
+            hub.publish([contractor_id], "work_request", {"request_id": wr_id, "ad_id": ad_id, "status": status})
+
+
+def _announce(ad_id, requests_decided_at=None):
+    """Publish the ad's new state to the event stream once the transition commits."""
+    # UPDATEs send no model signals: the listing cache hears about it here
+    ad_feed.bump()
+    transaction.on_commit(lambda: _publish(ad_id, requests_decided_at))
+
+
+def _read(ad_id, actor, **annotations):
+    """The fallback read (extra checks ride along as annotations)."""
+    ad = (
+        visible_ads(actor)
+        .filter(id=ad_id)
+        .annotate(**annotations)
+        .only("id", "status", "creator_id", "assigned_contractor_id", "contractor_marked_done", "scheduled_at")
+        .first()
+    )
+    if ad is None:
+        raise AdNotFound()
+    return ad
+
+
+# -------------------------
+# transitions
+# -------------------------
+
+def assign(ad_id, actor, contractor_id, scheduled_at, location):
+    """
+    Owner/support/admin assigns an OPEN ad to a contractor who requested it.
+
+    Two statements in one transaction: a conditional UPDATE on the ad (the
+    `status = OPEN` predicate is the lock: of two concurrent assigns only one
+    matches a row), then one CASE UPDATE over the ad's work requests that
+    accepts the chosen one and rejects the other PENDING ones.
+    """
+    ad_id = _ad_id(ad_id)
+    # overlap with the contractor's other jobs; the new job's end uses this ad's own duration
+    conflicts = overlapping_jobs(
+        contractor_id, scheduled_at, ends_at(scheduled_at, OuterRef("estimated_duration")),
+    ).exclude(id=ad_id)
+    requested = WorkRequest.objects.filter(
+        ad_id=OuterRef("pk"), contractor_id=contractor_id, contractor__role=User.Role.CONTRACTOR,
+    )
+
+    allowed = _owner_or_staff(actor)
+    if allowed is not None:
+        now = timezone.now()
+        with transaction.atomic():
+            updated = Ad.objects.filter(
+                allowed, Exists(requested), ~Exists(conflicts), id=ad_id, status=Ad.Status.OPEN,
+            ).update(
+                assigned_contractor_id=contractor_id,
+                scheduled_at=scheduled_at,
+                scheduled_end=ends_at(scheduled_at),
+                location=location,
+                status=Ad.Status.ASSIGNED,
+                contractor_marked_done=False,
+                updated_at=now,
+            )
+            if updated:
+                WorkRequest.objects.filter(
+                    Q(contractor_id=contractor_id) | Q(status=WorkRequest.Status.PENDING), ad_id=ad_id,
+                ).update(
+                    status=Case(
+                        When(contractor_id=contractor_id, then=Value(WorkRequest.Status.ACCEPTED)),
+                        default=Value(WorkRequest.Status.REJECTED),
+                    ),
+                    updated_at=now,
+                )
+                _announce(ad_id, requests_decided_at=now)
+                return
+
+    ad = _read(
+        ad_id, actor,
+        contractor_exists=Exists(User.objects.filter(id=contractor_id, role=User.Role.CONTRACTOR)),
+        has_request=Exists(requested),
+        has_conflict=Exists(conflicts),
+    )
+    _check_assign(ad, actor)
+    if not ad.contractor_exists:
+        raise AdNotFound("Contractor not found.")
+    if not ad.has_request:
+        raise AdNotFound("This contractor has not requested this ad.")
+    if ad.has_conflict:
+        raise IllegalTransition("Time conflict: the contractor already has a job at this time.", field="scheduled_at")
+    raise ConcurrentUpdate()
+
+
+def _check_assign(ad, actor):
+    if not (_is_staff(actor) or (actor.role == User.Role.CUSTOMER and ad.creator_id == actor.id)):
+        raise TransitionForbidden("Only owner/support/admin can assign.")
+    if ad.status != Ad.Status.OPEN:
+        raise IllegalTransition("Only OPEN ads can be assigned.")
+
+
+def check_assign(ad_id, actor):
+    """
+    The assign errors that don't depend on the request body (not found,
+    forbidden, not OPEN). Views call it before reporting a bad body, so those
+    keep precedence over field errors.
+    """
+    _check_assign(_read(_ad_id(ad_id), actor), actor)
+
+
+def contractor_done(ad_id, actor):
+    """Assigned contractor marks the job done (ASSIGNED, flag only)."""
+    ad_id = _ad_id(ad_id)
+    if actor.role == User.Role.CONTRACTOR:
+        updated = Ad.objects.filter(
+            id=ad_id, status=Ad.Status.ASSIGNED, assigned_contractor=actor,
+        ).update(contractor_marked_done=True, updated_at=timezone.now())
+        if updated:
+            _announce(ad_id)
+            return
+
+    ad = _read(ad_id, actor)
+    if actor.role != User.Role.CONTRACTOR:
+        raise TransitionForbidden("Only contractors can do this.")
+    if ad.assigned_contractor_id != actor.id:
+        raise TransitionForbidden("You are not assigned to this ad.")
+    if ad.status != Ad.Status.ASSIGNED:
+        raise IllegalTransition("Only ASSIGNED ads can be marked done.")
+    raise ConcurrentUpdate()
+
+
+def confirm_done(ad_id, actor):
+    """Owner/support/admin confirms: ASSIGNED + contractor_marked_done -> DONE."""
+    ad_id = _ad_id(ad_id)
+    allowed = _owner_or_staff(actor)
+    if allowed is not None:
+        with transaction.atomic():
+            updated = Ad.objects.filter(
+                allowed, id=ad_id, status=Ad.Status.ASSIGNED, contractor_marked_done=True,
+            ).update(status=Ad.Status.DONE, updated_at=timezone.now())
+            if updated:
+                # DONE is terminal, so the assignee read here is the one that finished the job
+                contractor_id = Ad.objects.filter(id=ad_id).values_list("assigned_contractor_id", flat=True).get()
+                if contractor_id:
+                    record_completed_ad(contractor_id)
+                _announce(ad_id)
+                return
+
+    ad = _read(ad_id, actor)
+    if not (_is_staff(actor) or (actor.role == User.Role.CUSTOMER and ad.creator_id == actor.id)):
+        raise TransitionForbidden("Only owner/support/admin can confirm done.")
+    if ad.status != Ad.Status.ASSIGNED:
+        raise IllegalTransition("Only ASSIGNED ads can be confirmed done.")
+    if not ad.contractor_marked_done:
+        raise IllegalTransition("Contractor has not marked done yet.")
+    raise ConcurrentUpdate()
+
+
+def cancel(ad_id, actor):
+    """Owner/support/admin cancels any ad that is not DONE."""
+    ad_id = _ad_id(ad_id)
+    allowed = _owner_or_staff(actor)
+    if allowed is not None:
+        updated = Ad.objects.filter(allowed, id=ad_id).exclude(status=Ad.Status.DONE).update(
+            status=Ad.Status.CANCELED, updated_at=timezone.now()
+        )
+        if updated:
+            _announce(ad_id)
+            return
+
+    ad = _read(ad_id, actor)
+    if ad.status == Ad.Status.DONE:
+        raise IllegalTransition("Cannot cancel a DONE ad.")
+    if not (_is_staff(actor) or (actor.role == User.Role.CUSTOMER and ad.creator_id == actor.id)):
+        raise TransitionForbidden("You cannot cancel this ad.")
+    raise ConcurrentUpdate()
+
+
+def schedule(ad_id, actor, scheduled_at, location):
+    """
+    Assigned contractor moves an ASSIGNED job. The "no other job of mine
+    overlapping it" rule is a NOT EXISTS in the same UPDATE, so two concurrent
+    reschedules can't both take the slot.
+    """
+    ad_id = _ad_id(ad_id)
+    conflicts = overlapping_jobs(
+        actor.id, scheduled_at, ends_at(scheduled_at, OuterRef("estimated_duration")),
+    ).exclude(id=ad_id)
+
+    if actor.role == User.Role.CONTRACTOR:
+        updated = Ad.objects.filter(
+            ~Exists(conflicts), id=ad_id, status=Ad.Status.ASSIGNED, assigned_contractor=actor,
+        ).update(
+            scheduled_at=scheduled_at, scheduled_end=ends_at(scheduled_at), location=location,
+            updated_at=timezone.now(),
+        )
+        if updated:
+            _announce(ad_id)
+            return
+
+    ad = _read(ad_id, actor, has_conflict=Exists(conflicts))
+    _check_schedule(ad, actor)
+    if ad.has_conflict:
+        raise IllegalTransition("Time conflict: you already have a job at this time.", field="scheduled_at")
+    raise ConcurrentUpdate()
+
+
+def _check_schedule(ad, actor):
+    if actor.role != User.Role.CONTRACTOR:
+        raise TransitionForbidden("Only contractors can set schedule.")
+    if ad.assigned_contractor_id != actor.id:
+        raise TransitionForbidden("Only assigned contractor can schedule this ad.")
+    if ad.status != Ad.Status.ASSIGNED:
+        raise IllegalTransition("Only ASSIGNED ads can be scheduled.")
+
+
+def check_schedule(ad_id, actor):
+    """The schedule errors that don't depend on the request body (see check_assign)."""
+    _check_schedule(_read(_ad_id(ad_id), actor), actor)
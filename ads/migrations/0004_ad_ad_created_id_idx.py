@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-17 01:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0003_alter_ad_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['created_at', 'id'], name='ad_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-17 01:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0004_ad_ad_created_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['creator', 'created_at'], name='ad_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['assigned_contractor', 'status', 'scheduled_at'], name='ad_contractor_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workrequest',
+            index=models.Index(fields=['ad', 'status'], name='wr_ad_status_idx'),
+        ),
+    ]
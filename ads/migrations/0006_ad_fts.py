@@ -0,0 +1,67 @@
+# Generated by Django 6.0 on 2026-10-17 02:10
+
+from django.db import migrations
+
+# frozen copy of the SQL in ads/search.py as of this migration
+CREATE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ads_ad_fts USING fts5(
+        title, description, category,
+        content='ads_ad', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_ad_fts_ai AFTER INSERT ON ads_ad BEGIN
+        INSERT INTO ads_ad_fts(rowid, title, description, category)
+        VALUES (new.id, new.title, new.description, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_ad_fts_ad AFTER DELETE ON ads_ad BEGIN
+        INSERT INTO ads_ad_fts(ads_ad_fts, rowid, title, description, category)
+        VALUES ('delete', old.id, old.title, old.description, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_ad_fts_au AFTER UPDATE OF title, description, category ON ads_ad BEGIN
+        INSERT INTO ads_ad_fts(ads_ad_fts, rowid, title, description, category)
+        VALUES ('delete', old.id, old.title, old.description, old.category);
+        INSERT INTO ads_ad_fts(rowid, title, description, category)
+        VALUES (new.id, new.title, new.description, new.category);
+    END
+    """,
+    "INSERT INTO ads_ad_fts(ads_ad_fts) VALUES ('rebuild')",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS ads_ad_fts_ai",
+    "DROP TRIGGER IF EXISTS ads_ad_fts_ad",
+    "DROP TRIGGER IF EXISTS ads_ad_fts_au",
+    "DROP TABLE IF EXISTS ads_ad_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in CREATE:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in DROP:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0005_ad_ad_creator_created_idx_ad_ad_contractor_sched_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
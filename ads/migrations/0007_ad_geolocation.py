@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-17 01:50
+
+import django.core.validators
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0006_ad_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='ad',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='ad',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['geohash'], name='ad_geohash_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-17 01:55
+
+import datetime
+import django.core.validators
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_scheduled_end(apps, schema_editor):
+    Ad = apps.get_model("ads", "Ad")
+    batch = []
+    for ad in Ad.objects.filter(scheduled_at__isnull=False).only("id", "scheduled_at", "estimated_duration").iterator():
+        ad.scheduled_end = ad.scheduled_at + ad.estimated_duration
+        batch.append(ad)
+        if len(batch) >= 1000:
+            Ad.objects.bulk_update(batch, ["scheduled_end"])
+            batch = []
+    if batch:
+        Ad.objects.bulk_update(batch, ["scheduled_end"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0007_ad_geolocation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='ad',
+            name='ad_contractor_sched_idx',
+        ),
+        migrations.AddField(
+            model_name='ad',
+            name='estimated_duration',
+            field=models.DurationField(default=datetime.timedelta(seconds=3600), validators=[django.core.validators.MinValueValidator(datetime.timedelta(seconds=60)), django.core.validators.MaxValueValidator(datetime.timedelta(days=1))]),
+        ),
+        migrations.AddField(
+            model_name='ad',
+            name='scheduled_end',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['assigned_contractor', 'status', 'scheduled_at', 'scheduled_end'], name='ad_contractor_interval_idx'),
+        ),
+        migrations.RunPython(backfill_scheduled_end, migrations.RunPython.noop),
+    ]
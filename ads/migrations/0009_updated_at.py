@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-17 02:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0008_ad_schedule_interval'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='workrequest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['updated_at', 'status', 'creator', 'assigned_contractor'], name='ad_validator_idx'),
+        ),
+    ]
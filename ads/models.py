@@ -1,6 +1,16 @@
+from datetime import timedelta
+
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+from . import geo
+
+
+# upper bound on a job's length; keeps the overlap probe a bounded index range
+MAX_JOB_DURATION = timedelta(hours=24)
+DEFAULT_JOB_DURATION = timedelta(hours=1)
+
 
 class Ad(models.Model):
     class Status(models.TextChoices):
@@ -28,13 +38,69 @@ class Ad(models.Model):
     contractor_marked_done = models.BooleanField(default=False)
 
     scheduled_at = models.DateTimeField(null=True, blank=True)
+    estimated_duration = models.DurationField(
+        default=DEFAULT_JOB_DURATION,
+        validators=[MinValueValidator(timedelta(minutes=1)), MaxValueValidator(MAX_JOB_DURATION)],
+    )
+    # scheduled_at + estimated_duration, kept in step by save() and ads.lifecycle
+    scheduled_end = models.DateTimeField(null=True, blank=True, editable=False)
     location = models.CharField(max_length=255, null=True, blank=True)
 
+    # optional coordinates; `geohash` is derived from them in save() ("" when unset)
+    latitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    geohash = models.CharField(max_length=geo.GEOHASH_LENGTH, blank=True, default="", editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
+    # conditional GET validators; ads.lifecycle sets it on its UPDATEs
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # keyset pagination: ORDER BY created_at DESC, id DESC
+            models.Index(fields=["created_at", "id"], name="ad_created_id_idx"),
+            # me/profile (customer): creator=? ORDER BY created_at
+            models.Index(fields=["creator", "created_at"], name="ad_creator_created_idx"),
+            # me/schedule + overlap probe: assigned_contractor=? AND status=? AND scheduled_at range,
+            # scheduled_end checked from the index without touching the table
+            models.Index(
+                fields=["assigned_contractor", "status", "scheduled_at", "scheduled_end"],
+                name="ad_contractor_interval_idx",
+            ),
+            # unpaged (?legacy=1) list validators: COUNT/MAX(updated_at) over any role's visibility
+            # filter from this index alone (leading with updated_at so list plans keep created_at order)
+            models.Index(
+                fields=["updated_at", "status", "creator", "assigned_contractor"],
+                name="ad_validator_idx",
+            ),
+            # nearby: geohash prefix ranges
+            models.Index(fields=["geohash"], name="ad_geohash_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.status})"
 
+    def save(self, *args, **kwargs):
+        self.scheduled_end = self.scheduled_at + self.estimated_duration if self.scheduled_at else None
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {"latitude", "longitude"} & update_fields:
+                update_fields.add("geohash")
+            if {"scheduled_at", "estimated_duration"} & update_fields:
+                update_fields.add("scheduled_end")
+            update_fields.add("updated_at")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
 
 class WorkRequest(models.Model):
     class Status(models.TextChoices):
@@ -48,9 +114,14 @@ class WorkRequest(models.Model):
     message = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("ad", "contractor")
+        indexes = [
+            # assign: reject the other PENDING requests of one ad
+            models.Index(fields=["ad", "status"], name="wr_ad_status_idx"),
+        ]
 
     def __str__(self):
         return f"Request({self.ad_id}->{self.contractor_id}) [{self.status}]"
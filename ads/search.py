@@ -0,0 +1,138 @@
+# ads/search.py
+"""
+Full-text search over Ad.title / description / category with SQLite FTS5.
+
+`ads_ad_fts` is an external-content FTS5 table over ads_ad, kept in sync by
+triggers. Django rebuilds ads_ad from scratch for some schema changes on
+SQLite, which silently drops triggers, so `ensure_fts` runs after every
+migrate and reinstalls them (plus a full reindex) when they are missing
+and migration 0006 is applied.
+"""
+import re
+
+from django.core.exceptions import EmptyResultSet, FullResultSet
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+
+FTS_TABLE = "ads_ad_fts"
+
+# bm25() weights, in FTS column order: title, description, category
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    title, description, category,
+    content='ads_ad', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+TRIGGERS = {
+    "ads_ad_fts_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS ads_ad_fts_ai AFTER INSERT ON ads_ad BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, description, category)
+            VALUES (new.id, new.title, new.description, new.category);
+        END
+    """,
+    "ads_ad_fts_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS ads_ad_fts_ad AFTER DELETE ON ads_ad BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, category)
+            VALUES ('delete', old.id, old.title, old.description, old.category);
+        END
+    """,
+    "ads_ad_fts_au": f"""
+        CREATE TRIGGER IF NOT EXISTS ads_ad_fts_au AFTER UPDATE OF title, description, category ON ads_ad BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, category)
+            VALUES ('delete', old.id, old.title, old.description, old.category);
+            INSERT INTO {FTS_TABLE}(rowid, title, description, category)
+            VALUES (new.id, new.title, new.description, new.category);
+        END
+    """,
+}
+
+def install_fts(connection):
+    """Create the FTS table and triggers if missing; reindex when anything was missing."""
+    if connection.vendor != "sqlite":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE (type = 'table' AND name = %s) OR type = 'trigger'",
+            [FTS_TABLE],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE in existing and set(TRIGGERS) <= existing:
+            return False
+
+        cursor.execute(CREATE_TABLE)
+        for sql in TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+# the migration that creates the index; before it (or once it is unapplied) there is nothing to keep alive
+FTS_MIGRATION = ("ads", "0006_ad_fts")
+
+
+def ensure_fts(sender, using="default", **kwargs):
+    """post_migrate hook: reinstall only where ads_ad exists and FTS_MIGRATION is applied."""
+    connection = connections[using]
+    if connection.vendor != "sqlite" or "ads_ad" not in connection.introspection.table_names():
+        return
+    if FTS_MIGRATION not in MigrationRecorder(connection).applied_migrations():
+        return
+    install_fts(connection)
+
+
+def match_expression(text):
+    """
+    Turn free text into a safe FTS5 query: every word quoted (so user input
+    can't inject FTS syntax), all words required, last word prefix-matched.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    terms = ['"%s"' % w.replace('"', '""') for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(queryset, text, after=None, limit=50):
+    """
+    Ids and bm25 scores of ads in `queryset` matching `text`, best first,
+    ordered on (score, id). `after` is the (score, id) of the previous page's
+    last row. Returns a list of (id, score) tuples, at most `limit` long.
+    """
+    match = match_expression(text)
+    if match is None:
+        return []
+
+    connection = connections[queryset.db]
+    compiler = queryset.query.get_compiler(using=queryset.db)
+    try:
+        visible_sql, visible_params = compiler.compile(queryset.query.where)
+    except FullResultSet:
+        visible_sql, visible_params = "1 = 1", []
+    except EmptyResultSet:
+        return []
+
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    sql = f"""
+        SELECT * FROM (
+            SELECT "ads_ad"."id" AS id, bm25({FTS_TABLE}, {weights}) AS score
+            FROM {FTS_TABLE}
+            JOIN "ads_ad" ON "ads_ad"."id" = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s AND ({visible_sql})
+        )
+    """
+    params = [match, *visible_params]
+    if after is not None:
+        sql += " WHERE score > %s OR (score = %s AND id > %s)"
+        params += [after[0], after[0], after[1]]
+    sql += " ORDER BY score, id LIMIT %s"
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
@@ -11,15 +11,22 @@ class AdSerializer(serializers.ModelSerializer):
         fields = (
             "id", "title", "description", "category",
             "status", "creator_id", "assigned_contractor_id",
-            "scheduled_at", "location",
+            "scheduled_at", "estimated_duration", "scheduled_end", "location", "latitude", "longitude",
             "contractor_marked_done", "created_at",
         )
         read_only_fields = (
             "status", "creator_id", "assigned_contractor_id",
-            "scheduled_at", "location",
+            "scheduled_at", "scheduled_end", "location",
             "contractor_marked_done", "created_at",
         )
 
+    def validate(self, attrs):
+        lat = attrs.get("latitude", getattr(self.instance, "latitude", None))
+        lng = attrs.get("longitude", getattr(self.instance, "longitude", None))
+        if (lat is None) != (lng is None):
+            raise serializers.ValidationError("Provide both latitude and longitude, or neither.")
+        return attrs
+
 
 class WorkRequestSerializer(serializers.ModelSerializer):
     contractor_id = serializers.IntegerField(read_only=True)
@@ -28,3 +35,14 @@ class WorkRequestSerializer(serializers.ModelSerializer):
         model = WorkRequest
         fields = ("id", "ad", "contractor_id", "message", "status", "created_at")
         read_only_fields = ("contractor_id", "status", "created_at")
+
+
+class BulkWorkRequestItemSerializer(serializers.Serializer):
+    ad_id = serializers.IntegerField()
+    message = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class BulkWorkRequestSerializer(serializers.Serializer):
+    MAX_ITEMS = 100
+
+    items = BulkWorkRequestItemSerializer(many=True, allow_empty=False, max_length=MAX_ITEMS)
@@ -0,0 +1,177 @@
+# ads/tests/test_ads_feed_cache.py
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from accounts.tokens import RoleRefreshToken
+from ads import lifecycle
+from ads.feed import AdFeedCache, ad_feed, check_feed_cache
+from ads.models import Ad, WorkRequest
+
+User = get_user_model()
+
+SLOT = timezone.now().replace(microsecond=0) + timedelta(days=3)
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class AdFeedCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("fc_customer", "CUSTOMER", "09128880001")
+        cls.other_customer = create_user("fc_customer2", "CUSTOMER", "09128880002")
+        cls.contractors = [create_user(f"fc_contractor{i}", "CONTRACTOR", f"0912888001{i}") for i in range(5)]
+        cls.support = create_user("fc_support", "SUPPORT", "09128880003")
+
+        base = timezone.now() - timedelta(days=1)
+        cls.open_ads = []
+        for i in range(6):
+            ad = Ad.objects.create(title=f"open {i}", description="d", category="c", creator=cls.customer)
+            # pairs share a created_at, so the id tie-breaker matters
+            Ad.objects.filter(id=ad.id).update(created_at=base + timedelta(minutes=i // 2))
+            cls.open_ads.append(ad)
+        cls.assigned = Ad.objects.create(
+            title="assigned", description="d", category="c", creator=cls.other_customer,
+            status=Ad.Status.ASSIGNED, assigned_contractor=cls.contractors[0],
+        )
+        Ad.objects.filter(id=cls.assigned.id).update(created_at=base + timedelta(minutes=1))
+        cls.done = Ad.objects.create(
+            title="done", description="d", category="c", creator=cls.customer,
+            status=Ad.Status.DONE, assigned_contractor=cls.contractors[1],
+        )
+
+        cls.tokens = {
+            u.id: str(RoleRefreshToken.for_user(u).access_token)
+            for u in [cls.customer, cls.other_customer, cls.support, *cls.contractors]
+        }
+
+    def setUp(self):
+        ad_feed.clear()
+        # off by default without a shared CACHES backend (ads.W001); one test process is one worker
+        enabled = mock.patch.object(ad_feed, "enabled", True)
+        enabled.start()
+        self.addCleanup(enabled.stop)
+
+    def as_user(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens[user.id]}")
+
+    def ids(self, url="/api/ads/"):
+        r = self.client.get(url)
+        self.assertEqual(r.status_code, 200)
+        return [a["id"] for a in r.data["results"]]
+
+    def expected_ids(self, user):
+        return list(lifecycle.visible_ads(user).order_by("-created_at", "-id").values_list("id", flat=True))
+
+    def test_each_role_sees_what_visible_ads_allows(self):
+        for user in [self.customer, self.other_customer, self.support, *self.contractors[:2]]:
+            with self.subTest(user=user.username):
+                self.as_user(user)
+                self.assertEqual(self.ids(), self.expected_ids(user))
+
+    def test_cursor_pages_walk_both_segments_in_order(self):
+        contractor = self.contractors[0]
+        self.as_user(contractor)
+        seen, pages = [], []
+        url = "/api/ads/?page_size=2"
+        while url:
+            r = self.client.get(url)
+            pages.append(r.data)
+            seen.extend(a["id"] for a in r.data["results"])
+            url = r.data["next"]
+
+        self.assertEqual(seen, self.expected_ids(contractor))
+        self.assertIn(self.assigned.id, seen)
+
+        # previous links walk back through the same pages
+        r = self.client.get(pages[-1]["previous"])
+        self.assertEqual([a["id"] for a in r.data["results"]], [a["id"] for a in pages[-2]["results"]])
+
+    def test_contractors_share_one_query_after_a_change(self):
+        for contractor in self.contractors:
+            self.as_user(contractor)
+            self.ids()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            fresh = Ad.objects.create(title="fresh", description="d", category="c", creator=self.other_customer)
+
+        # the shared OPEN segment is rebuilt once; own segments are untouched
+        with self.assertNumQueries(1):
+            for contractor in self.contractors:
+                self.as_user(contractor)
+                self.assertEqual(self.ids()[0], fresh.id)
+
+    def test_created_ad_shows_up_for_everyone(self):
+        self.as_user(self.contractors[2])
+        before = self.ids()
+
+        self.as_user(self.customer)
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post("/api/ads/", {"title": "new", "description": "d", "category": "c"}, format="json")
+        self.assertEqual(r.status_code, 201)
+
+        self.as_user(self.contractors[2])
+        self.assertEqual(self.ids(), [r.data["id"]] + before)
+
+    def test_assign_moves_the_ad_between_segments(self):
+        ad = self.open_ads[-1]
+        contractor, bystander = self.contractors[3], self.contractors[4]
+        WorkRequest.objects.create(ad=ad, contractor=contractor)
+        for user in (contractor, bystander):
+            self.as_user(user)
+            self.assertIn(ad.id, self.ids())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lifecycle.assign(ad.id, self.customer, contractor.id, SLOT, "Tehran")
+
+        self.as_user(bystander)
+        self.assertNotIn(ad.id, self.ids())
+        self.as_user(contractor)
+        self.assertEqual(self.ids(), self.expected_ids(contractor))
+        self.assertIn(ad.id, self.ids())
+
+    def test_etag_revalidates_without_queries(self):
+        self.as_user(self.contractors[0])
+        etag = self.client.get("/api/ads/")["ETag"]
+
+        with self.assertNumQueries(0):
+            r = self.client.get("/api/ads/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lifecycle.contractor_done(self.assigned.id, self.contractors[0])
+        r = self.client.get("/api/ads/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        row = next(a for a in r.data["results"] if a["id"] == self.assigned.id)
+        self.assertTrue(row["contractor_marked_done"])
+
+    def test_oversized_shared_segment_reads_the_database(self):
+        self.as_user(self.contractors[0])
+        with mock.patch.object(ad_feed, "max_shared_rows", 3):
+            self.assertEqual(self.ids(), self.expected_ids(self.contractors[0]))
+            etag = self.client.get("/api/ads/")["ETag"]
+            with self.assertNumQueries(1):  # the page probe, as without the cache
+                r = self.client.get("/api/ads/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(r.status_code, 304)
+
+    def test_off_unless_the_shared_tier_is_shared(self):
+        def enabled(**conf):
+            with self.settings(ADS_FEED_CACHE=conf):
+                return AdFeedCache.from_settings().enabled
+
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://"}}
+        self.assertFalse(enabled())
+        self.assertFalse(enabled(SHARED_CACHE="default"))  # LocMemCache: per process
+        with self.settings(CACHES=redis):
+            self.assertTrue(enabled(SHARED_CACHE="default"))
+        self.assertFalse(enabled(ENABLED=False, SHARED_CACHE="default"))
+
+        with self.settings(ADS_FEED_CACHE={"ENABLED": True}):
+            self.assertEqual([w.id for w in check_feed_cache(None)], ["ads.W001"])
+        self.assertEqual(check_feed_cache(None), [])
+
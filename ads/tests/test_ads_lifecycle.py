@@ -0,0 +1,238 @@
+# ads/tests/test_ads_lifecycle.py
+import unittest
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from accounts.models import ContractorStats
+from ads import lifecycle
+from ads.models import Ad, WorkRequest
+
+User = get_user_model()
+
+SLOT = datetime(2030, 1, 1, 10, 0, tzinfo=dt_timezone.utc)
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class AdLifecycleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user("lc_owner", "CUSTOMER", "09121110001")
+        cls.stranger = create_user("lc_stranger", "CUSTOMER", "09121110002")
+        cls.contractor = create_user("lc_contractor", "CONTRACTOR", "09121110003")
+        cls.other = create_user("lc_other", "CONTRACTOR", "09121110004")
+        cls.support = create_user("lc_support", "SUPPORT", "09121110005")
+
+    def make_ad(self, status=Ad.Status.ASSIGNED, marked=False, scheduled_at=None):
+        return Ad.objects.create(
+            title="t", description="d", category="c", creator=self.owner, status=status,
+            assigned_contractor=None if status == Ad.Status.OPEN else self.contractor,
+            contractor_marked_done=marked, scheduled_at=scheduled_at,
+        )
+
+    def test_success_is_one_statement(self):
+        ad = self.make_ad()
+        with self.assertNumQueries(1):
+            lifecycle.contractor_done(ad.id, self.contractor)
+        with self.assertNumQueries(1):
+            lifecycle.schedule(ad.id, self.contractor, SLOT, "Tehran")
+        other = self.make_ad()
+        with self.assertNumQueries(1):
+            lifecycle.cancel(other.id, self.owner)
+
+        ad.refresh_from_db()
+        self.assertEqual((ad.contractor_marked_done, ad.scheduled_at, ad.location), (True, SLOT, "Tehran"))
+
+    def test_failure_costs_one_fallback_read(self):
+        ad = self.make_ad()
+        # UPDATE + fallback SELECT (plus the atomic block's savepoint pair)
+        with self.assertNumQueries(4), self.assertRaises(lifecycle.IllegalTransition):
+            lifecycle.confirm_done(ad.id, self.owner)
+        # roles that can never pass skip the UPDATE
+        with self.assertNumQueries(1), self.assertRaises(lifecycle.TransitionForbidden):
+            lifecycle.cancel(ad.id, self.contractor)
+
+    def test_errors_are_told_apart(self):
+        assigned = self.make_ad()
+        done = self.make_ad(Ad.Status.DONE)
+        cases = [
+            (lifecycle.contractor_done, (999999, self.contractor), lifecycle.AdNotFound),
+            (lifecycle.contractor_done, (assigned.id, self.other), lifecycle.AdNotFound),  # not visible
+            (lifecycle.contractor_done, (assigned.id, self.owner), lifecycle.TransitionForbidden),
+            (lifecycle.contractor_done, (done.id, self.contractor), lifecycle.IllegalTransition),
+            (lifecycle.confirm_done, (assigned.id, self.stranger), lifecycle.AdNotFound),
+            (lifecycle.confirm_done, (assigned.id, self.contractor), lifecycle.TransitionForbidden),
+            (lifecycle.cancel, (done.id, self.owner), lifecycle.IllegalTransition),
+            (lifecycle.cancel, ("not-a-number", self.owner), lifecycle.AdNotFound),
+        ]
+        for fn, args, exc in cases:
+            with self.subTest(fn=fn.__name__, args=args), self.assertRaises(exc) as ctx:
+                fn(*args)
+            self.assertNotIsInstance(ctx.exception, lifecycle.ConcurrentUpdate)
+
+    def test_schedule_conflict_is_part_of_the_update(self):
+        self.make_ad(scheduled_at=SLOT)
+        ad = self.make_ad()
+        with self.assertRaises(lifecycle.IllegalTransition) as ctx:
+            lifecycle.schedule(ad.id, self.contractor, SLOT, "Tehran")
+        self.assertEqual(ctx.exception.field, "scheduled_at")
+        ad.refresh_from_db()
+        self.assertIsNone(ad.scheduled_at)
+
+    def test_confirm_done_counts_completed_job(self):
+        ad = self.make_ad(marked=True)
+        lifecycle.confirm_done(ad.id, self.support)
+        ad.refresh_from_db()
+        self.assertEqual(ad.status, Ad.Status.DONE)
+        self.assertEqual(ContractorStats.objects.get(contractor=self.contractor).completed_ads_count, 1)
+
+        with self.assertRaises(lifecycle.IllegalTransition):
+            lifecycle.confirm_done(ad.id, self.support)
+        self.assertEqual(ContractorStats.objects.get(contractor=self.contractor).completed_ads_count, 1)
+
+    def test_assign_is_two_statements_in_one_transaction(self):
+        ad = self.make_ad(Ad.Status.OPEN)
+        chosen = WorkRequest.objects.create(ad=ad, contractor=self.contractor)
+        loser = WorkRequest.objects.create(ad=ad, contractor=self.other)
+
+        # ad UPDATE + work-request CASE UPDATE, inside the atomic block's savepoint pair
+        with self.assertNumQueries(4):
+            lifecycle.assign(ad.id, self.owner, self.contractor.id, SLOT, "Tehran")
+
+        ad.refresh_from_db()
+        self.assertEqual((ad.status, ad.assigned_contractor_id, ad.scheduled_at), (Ad.Status.ASSIGNED, self.contractor.id, SLOT))
+        chosen.refresh_from_db()
+        loser.refresh_from_db()
+        self.assertEqual((chosen.status, loser.status), (WorkRequest.Status.ACCEPTED, WorkRequest.Status.REJECTED))
+
+    def test_second_assign_loses(self):
+        ad = self.make_ad(Ad.Status.OPEN)
+        WorkRequest.objects.create(ad=ad, contractor=self.contractor)
+        WorkRequest.objects.create(ad=ad, contractor=self.other)
+
+        lifecycle.assign(ad.id, self.support, self.other.id, SLOT, "Tehran")
+        with self.assertRaises(lifecycle.IllegalTransition):
+            lifecycle.assign(ad.id, self.owner, self.contractor.id, SLOT, "Tehran")
+
+        ad.refresh_from_db()
+        self.assertEqual(ad.assigned_contractor_id, self.other.id)
+        self.assertEqual(
+            dict(WorkRequest.objects.filter(ad=ad).values_list("contractor_id", "status")),
+            {self.other.id: "ACCEPTED", self.contractor.id: "REJECTED"},
+        )
+
+    def test_assign_errors(self):
+        ad = self.make_ad(Ad.Status.OPEN)
+        WorkRequest.objects.create(ad=ad, contractor=self.contractor)
+        cases = [
+            ((ad.id, self.stranger, self.contractor.id), lifecycle.TransitionForbidden),
+            ((ad.id, self.owner, self.stranger.id), lifecycle.AdNotFound),  # not a contractor
+            ((ad.id, self.owner, self.other.id), lifecycle.AdNotFound),  # never requested
+        ]
+        for args, exc in cases:
+            with self.subTest(args=args), self.assertRaises(exc):
+                lifecycle.assign(*args, SLOT, "Tehran")
+        ad.refresh_from_db()
+        self.assertEqual(ad.status, Ad.Status.OPEN)
+
+    def test_overlapping_schedule_is_rejected(self):
+        self.make_ad(scheduled_at=SLOT)  # 10:00-11:00
+        ad = self.make_ad()
+        for start, ok in ((SLOT + timedelta(minutes=30), False), (SLOT - timedelta(minutes=30), False),
+                          (SLOT + timedelta(hours=1), True), (SLOT - timedelta(hours=1), True)):
+            with self.subTest(start=start):
+                if ok:
+                    lifecycle.schedule(ad.id, self.contractor, start, "Tehran")
+                else:
+                    with self.assertRaises(lifecycle.IllegalTransition):
+                        lifecycle.schedule(ad.id, self.contractor, start, "Tehran")
+
+        ad.refresh_from_db()
+        self.assertEqual((ad.scheduled_at, ad.scheduled_end), (SLOT - timedelta(hours=1), SLOT))
+
+    def test_assign_checks_overlap_with_the_new_ads_duration(self):
+        self.make_ad(scheduled_at=SLOT)  # 10:00-11:00
+        ad = self.make_ad(Ad.Status.OPEN)
+        Ad.objects.filter(id=ad.id).update(estimated_duration=timedelta(hours=2))
+        WorkRequest.objects.create(ad=ad, contractor=self.contractor)
+
+        with self.assertRaises(lifecycle.IllegalTransition) as ctx:
+            lifecycle.assign(ad.id, self.owner, self.contractor.id, SLOT - timedelta(hours=1, minutes=30), "Tehran")
+        self.assertEqual(ctx.exception.field, "scheduled_at")
+
+        lifecycle.assign(ad.id, self.owner, self.contractor.id, SLOT - timedelta(hours=2), "Tehran")
+        ad.refresh_from_db()
+        self.assertEqual(ad.scheduled_end, SLOT)
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite-specific")
+    def test_overlap_probe_is_a_bounded_range(self):
+        sql, params = lifecycle.overlapping_jobs(self.contractor.id, SLOT, SLOT + timedelta(hours=1)).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("ad_contractor_interval_idx", plan)
+        self.assertIn("scheduled_at>? AND scheduled_at<?", plan)
+
+
+class BodyErrorPrecedenceTests(APITestCase):
+    """A bad body is reported only once the ad is found and the actor may act on it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user("bp_owner", "CUSTOMER", "09121120001")
+        cls.stranger = create_user("bp_stranger", "CUSTOMER", "09121120002")
+        cls.contractor = create_user("bp_contractor", "CONTRACTOR", "09121120003")
+        cls.open_ad = Ad.objects.create(title="t", description="d", category="c", creator=cls.owner)
+        cls.assigned = Ad.objects.create(
+            title="t", description="d", category="c", creator=cls.owner,
+            status=Ad.Status.ASSIGNED, assigned_contractor=cls.contractor,
+        )
+
+    def post(self, user, url):
+        self.client.force_authenticate(user)
+        return self.client.post(url, {}, format="json").status_code
+
+    def test_assign(self):
+        self.assertEqual(self.post(self.owner, "/api/ads/999999/assign/"), 404)
+        self.assertEqual(self.post(self.contractor, f"/api/ads/{self.open_ad.id}/assign/"), 403)
+        self.assertEqual(self.post(self.stranger, f"/api/ads/{self.open_ad.id}/assign/"), 403)
+        self.assertEqual(self.post(self.owner, f"/api/ads/{self.open_ad.id}/assign/"), 400)
+
+    def test_schedule(self):
+        self.assertEqual(self.post(self.contractor, "/api/ads/999999/schedule/"), 404)
+        self.assertEqual(self.post(self.owner, f"/api/ads/{self.assigned.id}/schedule/"), 403)
+        self.assertEqual(self.post(self.contractor, f"/api/ads/{self.assigned.id}/schedule/"), 400)
+
+
+class DurationEditTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user("de_owner", "CUSTOMER", "09121130001")
+        cls.contractor = create_user("de_contractor", "CONTRACTOR", "09121130002")
+
+    def job(self, scheduled_at):
+        return Ad.objects.create(
+            title="t", description="d", category="c", creator=self.owner,
+            status=Ad.Status.ASSIGNED, assigned_contractor=self.contractor, scheduled_at=scheduled_at,
+        )
+
+    def test_longer_job_may_not_overlap_the_next(self):
+        first = self.job(SLOT)  # 10:00-11:00, then 11:00-12:00
+        self.job(SLOT + timedelta(hours=1))
+        self.client.force_authenticate(self.owner)
+
+        r = self.client.patch(f"/api/ads/{first.id}/", {"estimated_duration": "05:00:00"}, format="json")
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("estimated_duration", r.data)
+        first.refresh_from_db()
+        self.assertEqual(first.scheduled_end, SLOT + timedelta(hours=1))
+
+        r = self.client.patch(f"/api/ads/{first.id}/", {"estimated_duration": "00:30:00"}, format="json")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["scheduled_end"], "2030-01-01T10:30:00Z")
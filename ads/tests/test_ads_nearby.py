@@ -0,0 +1,100 @@
+# ads/tests/test_ads_nearby.py
+import math
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ads import geo
+from ads.models import Ad
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class GeohashTests(SimpleTestCase):
+    def test_encode_known_value(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+
+    def test_covering_cells_contain_every_point_in_radius(self):
+        # brute-force: points on a ring just inside the radius all fall under one of the cells
+        for lat, lng, radius in ((35.7, 51.4, 10), (0.0, 179.99, 25), (89.9, 0.0, 5), (-33.9, 18.4, 0.5)):
+            cells = geo.covering_cells(lat, lng, radius)
+            for step in range(36):
+                bearing = step * 10
+                d = radius * 0.999 / geo.EARTH_RADIUS_KM
+                p1, l1, b = math.radians(lat), math.radians(lng), math.radians(bearing)
+                p2 = math.asin(math.sin(p1) * math.cos(d) + math.cos(p1) * math.sin(d) * math.cos(b))
+                l2 = l1 + math.atan2(math.sin(b) * math.sin(d) * math.cos(p1), math.cos(d) - math.sin(p1) * math.sin(p2))
+                lat2 = math.degrees(p2)
+                lng2 = (math.degrees(l2) + 180) % 360 - 180
+                h = geo.encode(lat2, lng2)
+                self.assertTrue(any(h.startswith(c) for c in cells), (lat, lng, radius, bearing, h, cells))
+
+
+class AdNearbyTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("geo_customer", "CUSTOMER", "09123330001")
+        cls.other = create_user("geo_other", "CUSTOMER", "09123330002")
+        cls.contractor = create_user("geo_contractor", "CONTRACTOR", "09123330003")
+
+        def ad(title, lat=None, lng=None, creator=None, status=Ad.Status.OPEN):
+            return Ad.objects.create(
+                title=title, description="d", category="c", creator=creator or cls.customer,
+                status=status, latitude=lat, longitude=lng,
+            )
+
+        # around Tehran (35.6892, 51.3890)
+        cls.center = ad("center", 35.6892, 51.3890)
+        cls.five_km = ad("5km north", 35.7342, 51.3890)
+        cls.twenty_km = ad("20km north", 35.8691, 51.3890)
+        cls.no_coords = ad("no coords")
+        cls.hidden = ad("assigned elsewhere", 35.6900, 51.3900, creator=cls.other, status=Ad.Status.ASSIGNED)
+
+    def setUp(self):
+        token = RefreshToken.for_user(self.contractor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_geohash_follows_coordinates(self):
+        self.assertEqual(self.center.geohash, geo.encode(35.6892, 51.3890))
+        self.assertEqual(self.no_coords.geohash, "")
+
+        self.no_coords.latitude, self.no_coords.longitude = 35.0, 51.0
+        self.no_coords.save(update_fields=["latitude", "longitude"])
+        self.no_coords.refresh_from_db()
+        self.assertEqual(self.no_coords.geohash, geo.encode(35.0, 51.0))
+
+    def test_nearby_filters_by_exact_distance_and_sorts(self):
+        r = self.client.get("/api/ads/nearby/?lat=35.6892&lng=51.3890&radius_km=10")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual([a["id"] for a in r.data], [self.center.id, self.five_km.id])
+        self.assertEqual(r.data[0]["distance_km"], 0)
+        self.assertAlmostEqual(r.data[1]["distance_km"], 5.0, delta=0.05)
+
+        r = self.client.get("/api/ads/nearby/?lat=35.6892&lng=51.3890&radius_km=25&limit=2")
+        self.assertEqual([a["id"] for a in r.data], [self.center.id, self.five_km.id])
+        r = self.client.get("/api/ads/nearby/?lat=35.6892&lng=51.3890&radius_km=25")
+        self.assertEqual(len(r.data), 3)
+
+    def test_nearby_respects_visibility(self):
+        r = self.client.get("/api/ads/nearby/?lat=35.69&lng=51.39&radius_km=1")
+        self.assertNotIn(self.hidden.id, [a["id"] for a in r.data])
+
+    def test_bad_params(self):
+        for qs in ("", "lat=1", "lat=x&lng=1", "lat=91&lng=0", "lat=0&lng=0&radius_km=0", "lat=0&lng=0&radius_km=5000"):
+            self.assertEqual(self.client.get(f"/api/ads/nearby/?{qs}").status_code, 400, qs)
+
+    def test_create_requires_both_coordinates(self):
+        token = RefreshToken.for_user(self.customer).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        body = {"title": "t", "description": "d", "category": "c"}
+        self.assertEqual(self.client.post("/api/ads/", {**body, "latitude": 35.0}, format="json").status_code, 400)
+        self.assertEqual(self.client.post("/api/ads/", {**body, "latitude": 95, "longitude": 1}, format="json").status_code, 400)
+        r = self.client.post("/api/ads/", {**body, "latitude": 35.0, "longitude": 51.0}, format="json")
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(Ad.objects.get(id=r.data["id"]).geohash, geo.encode(35.0, 51.0))
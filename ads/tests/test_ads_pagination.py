@@ -0,0 +1,68 @@
+# ads/tests/test_ads_pagination.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ads.feed import ad_feed
+from ads.models import Ad
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class AdKeysetPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("pg_customer", "CUSTOMER", "09125550001")
+        cls.contractor = create_user("pg_contractor", "CONTRACTOR", "09125550002")
+
+        # 7 ads, several sharing the same created_at to exercise the id tie-breaker
+        base = timezone.now() - timedelta(days=1)
+        cls.ads = []
+        for i in range(7):
+            ad = Ad.objects.create(title=f"ad {i}", description="d", category="c", creator=cls.customer)
+            Ad.objects.filter(id=ad.id).update(created_at=base + timedelta(minutes=i // 3))
+            cls.ads.append(ad)
+
+    def setUp(self):
+        ad_feed.clear()
+        token = RefreshToken.for_user(self.contractor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def expected_ids(self):
+        return list(Ad.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+    def test_walk_forward_and_back_without_gaps_or_duplicates(self):
+        seen = []
+        pages = []
+        url = "/api/ads/?page_size=3"
+        while url:
+            r = self.client.get(url)
+            self.assertEqual(r.status_code, 200)
+            self.assertNotIn("count", r.data)
+            pages.append(r.data)
+            seen.extend(a["id"] for a in r.data["results"])
+            url = r.data["next"]
+
+        self.assertEqual(seen, self.expected_ids())
+        self.assertEqual(len(pages), 3)
+
+        # previous link of the last page gives back the middle page
+        r = self.client.get(pages[-1]["previous"])
+        self.assertEqual([a["id"] for a in r.data["results"]], [a["id"] for a in pages[1]["results"]])
+
+    def test_invalid_cursor_is_404(self):
+        r = self.client.get("/api/ads/?cursor=bm90LWEtY3Vyc29y")
+        self.assertEqual(r.status_code, 404)
+
+    def test_legacy_flag_keeps_flat_list(self):
+        r = self.client.get("/api/ads/?legacy=1")
+        self.assertEqual(r.status_code, 200)
+        self.assertIsInstance(r.data, list)
+        self.assertEqual(len(r.data), 7)
@@ -0,0 +1,104 @@
+# ads/tests/test_ads_search.py
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ads.models import Ad
+from ads.search import FTS_MIGRATION, TRIGGERS, ensure_fts
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "search uses SQLite FTS5")
+class AdSearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("fts_customer", "CUSTOMER", "09124440001")
+        cls.other = create_user("fts_other", "CUSTOMER", "09124440002")
+        cls.contractor = create_user("fts_contractor", "CONTRACTOR", "09124440003")
+
+        def ad(title, description="", category="general", creator=None, status=Ad.Status.OPEN):
+            return Ad.objects.create(
+                title=title, description=description, category=category,
+                creator=creator or cls.customer, status=status,
+            )
+
+        cls.title_hit = ad("Plumbing repair", "kitchen sink")
+        cls.desc_hit = ad("Kitchen work", "some plumbing and tiling")
+        cls.category_hit = ad("Fix bathroom", "leaking pipe", category="plumbing")
+        cls.unrelated = ad("Garden", "mow the lawn")
+        cls.private = ad("Plumbing for a friend", creator=cls.other, status=Ad.Status.ASSIGNED)
+
+    def as_user(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def ids(self, url):
+        r = self.client.get(url)
+        self.assertEqual(r.status_code, 200, getattr(r, "data", None))
+        return [a["id"] for a in r.data["results"]], r.data["next"]
+
+    def test_title_outranks_category_outranks_description(self):
+        self.as_user(self.customer)
+        ids, _ = self.ids("/api/ads/search/?q=plumbing")
+        self.assertEqual(ids, [self.title_hit.id, self.category_hit.id, self.desc_hit.id])
+
+    def test_prefix_and_diacritics(self):
+        self.as_user(self.customer)
+        self.assertIn(self.title_hit.id, self.ids("/api/ads/search/?q=plumb")[0])
+        self.assertEqual(self.ids("/api/ads/search/?q=gärden")[0], [self.unrelated.id])
+
+    def test_results_respect_visibility(self):
+        self.as_user(self.customer)
+        self.assertNotIn(self.private.id, self.ids("/api/ads/search/?q=friend")[0])
+        self.as_user(self.other)
+        self.assertEqual(self.ids("/api/ads/search/?q=friend")[0], [self.private.id])
+
+    def test_cursor_walk(self):
+        self.as_user(self.customer)
+        seen, url = [], "/api/ads/search/?q=plumbing&page_size=1"
+        while url:
+            ids, url = self.ids(url)
+            seen += ids
+        self.assertEqual(seen, [self.title_hit.id, self.category_hit.id, self.desc_hit.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.as_user(self.customer)
+        self.unrelated.title = "Plumbing emergency"
+        self.unrelated.save()
+        self.assertIn(self.unrelated.id, self.ids("/api/ads/search/?q=emergency")[0])
+
+        self.unrelated.delete()
+        self.assertEqual(self.ids("/api/ads/search/?q=emergency")[0], [])
+        self.assertEqual(self.ids("/api/ads/search/?q=garden")[0], [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.as_user(self.customer)
+        self.assertEqual(self.ids('/api/ads/search/?q=plumbing" OR "garden')[0], [])
+        self.assertEqual(self.client.get("/api/ads/search/?q=%20%22").status_code, 400)
+
+    def test_post_migrate_hook_leaves_an_unapplied_index_alone(self):
+        def triggers():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'ads_ad_fts_%'")
+                return {name for (name,) in cursor.fetchall()}
+
+        with connection.cursor() as cursor:
+            for name in TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {name}")
+        recorder = MigrationRecorder(connection)
+        recorder.record_unapplied(*FTS_MIGRATION)  # as after `migrate ads 0005`
+        ensure_fts(sender=None)
+        self.assertEqual(triggers(), set())
+
+        recorder.record_applied(*FTS_MIGRATION)
+        ensure_fts(sender=None)
+        self.assertEqual(triggers(), set(TRIGGERS))
@@ -0,0 +1,75 @@
+# ads/tests/test_async_reads.py
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from accounts.tokens import RoleRefreshToken
+from ads.models import Ad
+from tickets.models import Ticket
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class AsyncAdTicketReadTests(APITestCase):
+    """The async endpoints answer exactly what their sync twins do."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user("ar_owner", "CUSTOMER", "09127820001")
+        cls.contractor = create_user("ar_contractor", "CONTRACTOR", "09127820002")
+        for i in range(5):
+            Ad.objects.create(title=f"ad {i}", description="d", category="c", creator=cls.owner)
+        Ad.objects.create(title="mine", description="d", category="c", creator=cls.owner, status=Ad.Status.CANCELED)
+        for i in range(3):
+            Ticket.objects.create(creator=cls.owner, title=f"t{i}", message="m")
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(self.owner).access_token}")
+
+    def assertSameAnswer(self, sync_url, async_url):
+        sync, asynchronous = self.client.get(sync_url), self.client.get(async_url)
+        self.assertEqual(asynchronous.status_code, sync.status_code)
+        expected = sync.json()
+        if isinstance(expected, dict) and "next" in expected:
+            # links point at each endpoint's own URL; the cursors must match
+            for key in ("next", "previous"):
+                self.assertEqual(bool(asynchronous.json()[key]), bool(expected[key]))
+                expected[key] = asynchronous.json()[key]
+        self.assertEqual(asynchronous.json(), expected)
+        return asynchronous
+
+    def test_ad_list_pages_like_the_sync_list(self):
+        r = self.assertSameAnswer("/api/ads/?page_size=4", "/api/ads/async/?page_size=4")
+        self.assertEqual(len(r.json()["results"]), 4)
+        self.assertSameAnswer(r.json()["next"].replace("/async/", "/"), r.json()["next"])
+        self.assertSameAnswer("/api/ads/?legacy=1", "/api/ads/async/?legacy=1")
+
+    def test_ad_detail(self):
+        ad = Ad.objects.get(title="mine")
+        r = self.assertSameAnswer(f"/api/ads/{ad.id}/", f"/api/ads/{ad.id}/async/")
+        self.assertEqual(r["ETag"], self.client.get(f"/api/ads/{ad.id}/")["ETag"])
+        self.assertEqual(self.client.get(f"/api/ads/{ad.id}/async/", HTTP_IF_NONE_MATCH=r["ETag"]).status_code, 304)
+
+        # invisible to a contractor, as in the sync view
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(self.contractor).access_token}")
+        self.assertEqual(self.client.get(f"/api/ads/{ad.id}/async/").status_code, 404)
+
+    def test_ticket_list(self):
+        self.assertSameAnswer("/api/tickets/?page_size=2", "/api/tickets/async/?page_size=2")
+
+    def test_warm_list_is_two_queries(self):
+        self.client.get("/api/ads/async/")  # warms the token-version cache
+        with self.assertNumQueries(2):  # ETag page probe + the page
+            self.client.get("/api/ads/async/")
+
+    def test_needs_a_valid_token(self):
+        self.client.credentials()
+        r = self.client.get("/api/ads/async/")
+        self.assertEqual(r.status_code, 401)
+        self.assertEqual(r["WWW-Authenticate"], 'Bearer realm="api"')
+
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer nope")
+        self.assertEqual(self.client.get("/api/tickets/async/").status_code, 401)
@@ -0,0 +1,67 @@
+# ads/tests/test_bench.py
+import io
+import json
+import os
+import random
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework.test import APITestCase
+
+from accounts.cache import profile_cache
+from ads.feed import ad_feed
+from benchmarks.endpoints import CASES, coverage, seed
+from config.events import hub
+
+SMALL = {"users": 8, "ads": 30, "tickets": 5, "requests": 2, "slow_requests": 1, "warmup": 0, "memory_requests": 1}
+
+
+class BenchCommandTests(APITestCase):
+    def setUp(self):
+        ad_feed.clear()
+        profile_cache.clear()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def bench(self, **opts):
+        out = io.StringIO()
+        call_command("bench", **SMALL, **opts, stdout=out)
+        return out.getvalue()
+
+    def test_every_route_has_a_benchmark(self):
+        self.assertEqual(coverage(CASES, seed(4, 10, 2, random.Random(1))), {})
+
+    def test_every_endpoint_answers_and_results_are_written(self):
+        path = os.path.join(self.dir.name, "bench.json")
+        self.bench(output=path)
+        with open(path) as f:
+            report = json.load(f)
+        self.assertEqual(list(report["results"]), [case.name for case in CASES])
+        self.assertEqual(report["uncovered"], {})
+        tickets = report["results"]["tickets list"]
+        self.assertEqual(tickets["queries"], 2)  # ETag page probe + page
+        self.assertLessEqual(tickets["p50_ms"], tickets["p95_ms"])
+        self.assertLessEqual(tickets["p95_ms"], tickets["p99_ms"])
+        self.assertGreater(tickets["alloc_kib"], 0)
+
+    def test_write_hooks_run_as_at_commit(self):
+        with mock.patch.object(hub, "publish") as publish:
+            out = self.bench(only=["ticket reply"])
+        # every timed and traced reply published its event
+        self.assertEqual(publish.call_count, SMALL["requests"] + SMALL["memory_requests"])
+        self.assertIn("exclude COMMIT", out)
+
+    def test_compare_flags_regressions(self):
+        path = os.path.join(self.dir.name, "bench.json")
+        self.bench(only=["ticket detail"], output=path)
+        self.assertIn("no regressions", self.bench(only=["ticket detail"], compare=path, threshold=1e6, min_delta_ms=1e6))
+
+        with open(path) as f:
+            baseline = json.load(f)
+        baseline["results"]["ticket detail"]["queries"] -= 1
+        with open(path, "w") as f:
+            json.dump(baseline, f)
+        with self.assertRaisesMessage(CommandError, "1 regression(s)"):
+            self.bench(only=["ticket detail"], compare=path, threshold=1e6, min_delta_ms=1e6)
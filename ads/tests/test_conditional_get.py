@@ -0,0 +1,118 @@
+# ads/tests/test_conditional_get.py
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from rest_framework.test import APITestCase
+
+from accounts.tokens import RoleRefreshToken
+from ads import lifecycle
+from ads.feed import ad_feed
+from ads.models import Ad
+from config.conditional import make_etag, set_validators
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class AdConditionalGetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user("cg_owner", "CUSTOMER", "09127770001")
+        cls.contractor = create_user("cg_contractor", "CONTRACTOR", "09127770002")
+        cls.ad = Ad.objects.create(
+            title="t", description="d", category="c", creator=cls.owner,
+            status=Ad.Status.ASSIGNED, assigned_contractor=cls.contractor,
+        )
+        Ad.objects.create(title="open", description="d", category="c", creator=cls.owner)
+
+    def setUp(self):
+        ad_feed.clear()
+        enabled = mock.patch.object(ad_feed, "enabled", True)  # off without a shared cache
+        enabled.start()
+        self.addCleanup(enabled.stop)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(self.owner).access_token}")
+
+    def test_detail_revalidates_with_etag_and_last_modified(self):
+        url = f"/api/ads/{self.ad.id}/"
+        r = self.client.get(url)
+        self.assertEqual(r.status_code, 200)
+        etag, last_modified = r["ETag"], r["Last-Modified"]
+
+        with self.assertNumQueries(1):  # the ad row only, no serialization
+            r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(r["ETag"], etag)
+
+        r = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(r.status_code, 304)
+
+    def test_transition_changes_the_etag(self):
+        url = f"/api/ads/{self.ad.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        lifecycle.contractor_done(self.ad.id, self.contractor)
+
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.data["contractor_marked_done"])
+        self.assertNotEqual(r["ETag"], etag)
+
+    def test_list_revalidates_on_feed_generations(self):
+        r = self.client.get("/api/ads/")
+        self.assertEqual(r.status_code, 200)
+        self.assertNotIn("Last-Modified", r)
+        etag = r["ETag"]
+
+        with self.assertNumQueries(0):  # the ETag comes from the feed cache's generations
+            r = self.client.get("/api/ads/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+
+        # another page size is another representation
+        self.assertEqual(self.client.get("/api/ads/?page_size=1", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # a deletion bumps the feed generation
+        Ad.objects.filter(title="open").delete()
+        self.assertEqual(self.client.get("/api/ads/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_uncached_list_validator_reads_only_the_page(self):
+        ad_feed.enabled = False  # restored by the setUp patch
+        newest = Ad.objects.create(title="newest", description="d", category="c", creator=self.owner)
+        url = "/api/ads/?page_size=1"
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):  # the page probe: (pk, updated_at) of page_size + 1 rows
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # rows past the look-ahead row don't touch this page
+        self.ad.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # the look-ahead row decides the next link
+        Ad.objects.filter(title="open").delete()
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((r.status_code, r.data["next"]), (200, None))
+
+        etag = r["ETag"]
+        newest.title = "renamed"
+        newest.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_validators_differ_per_caller(self):
+        etag = self.client.get("/api/ads/")["ETag"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(self.contractor).access_token}")
+        r = self.client.get("/api/ads/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertIn("Authorization", r["Vary"])
+
+    def test_vary_covers_content_negotiation_and_keeps_existing_values(self):
+        vary = self.client.get(f"/api/ads/{self.ad.id}/")["Vary"]
+        self.assertIn("Accept", vary)
+
+        response = HttpResponse()
+        response["Vary"] = "Cookie"
+        set_validators(response, make_etag("x"))
+        self.assertEqual(response["Vary"], "Cookie, Authorization, Accept")
@@ -0,0 +1,118 @@
+# ads/tests/test_db_router.py
+import asyncio
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+
+from accounts.authentication import acurrent_token_version, current_token_version
+from accounts.cache import profile_cache
+from accounts.models import User
+from ads.feed import ad_feed
+from ads.models import Ad
+from config.db_router import ReplicaRouter, ReplicaRoutingMiddleware
+
+REPLICAS = {"ALIASES": ["replica"], "PIN_SECONDS": 5}
+
+
+@override_settings(READ_REPLICAS=REPLICAS)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def view(self, request):
+        self.seen.append(Ad.objects.all().db)
+        if request.GET.get("write"):
+            router.db_for_write(Ad)
+            self.seen.append(Ad.objects.all().db)
+        return HttpResponse()
+
+    def send(self, method, path="/api/ads/", token="a"):
+        request = getattr(self.factory, method)(path, HTTP_AUTHORIZATION=f"Bearer {token}")
+        ReplicaRoutingMiddleware(self.view)(request)
+        return self.seen.pop()
+
+    def test_reads_go_to_a_replica_and_writes_to_the_primary(self):
+        self.assertEqual(self.send("get"), "replica")
+        self.assertEqual(self.send("post"), "default")
+        self.assertEqual(Ad.objects.all().db, "default")  # outside a request
+
+    def test_a_write_pins_that_client_to_the_primary_for_a_while(self):
+        with mock.patch("config.db_router.time.time", return_value=1000.0):
+            self.send("post", token="writer")
+            self.assertEqual(self.send("get", token="writer"), "default")
+            self.assertEqual(self.send("get", token="someone-else"), "replica")
+        with mock.patch("config.db_router.time.time", return_value=1006.0):
+            self.assertEqual(self.send("get", token="writer"), "replica")
+
+    def test_a_safe_request_that_writes_reads_its_write(self):
+        self.view(self.factory.get("/"))  # no middleware: primary
+        self.assertEqual(self.seen.pop(), "default")
+        ReplicaRoutingMiddleware(self.view)(self.factory.get("/?write=1"))
+        self.assertEqual(self.seen, ["replica", "default"])
+
+    def test_async_stack(self):
+        async def view(request):
+            self.seen.append(Ad.objects.all().db)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        asyncio.run(middleware(self.factory.get("/")))
+        asyncio.run(middleware(self.factory.post("/")))
+        asyncio.run(middleware(self.factory.get("/")))
+        self.assertEqual(self.seen, ["replica", "default", "default"])
+
+    @override_settings(READ_REPLICAS={"ALIASES": []})
+    def test_no_replicas_means_primary(self):
+        self.assertEqual(self.send("get"), "default")
+
+    def test_only_the_primary_is_migrated(self):
+        self.assertTrue(ReplicaRouter().allow_migrate("default", "ads"))
+        self.assertFalse(ReplicaRouter().allow_migrate("replica", "ads"))
+
+
+@override_settings(READ_REPLICAS=REPLICAS)
+class PrimaryReadsTests(TransactionTestCase):
+    """
+    Reads that must not lag. "replica" isn't a configured database here, so any
+    of them sent there fails; no TestCase transaction, which would keep every
+    read on the primary anyway.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username="pr_customer", phone="09127790001", role=User.Role.CUSTOMER)
+        Ad.objects.create(title="t", description="d", category="c", creator=self.user)
+        cache.clear()
+        ad_feed.clear()
+        profile_cache.clear()
+
+    def get(self, view):
+        request = RequestFactory().get("/api/ads/", HTTP_AUTHORIZATION="Bearer a")
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def test_token_versions_and_cache_fills_read_the_primary(self):
+        seen = {}
+
+        def view(request):
+            seen["routed"] = Ad.objects.all().db
+            seen["version"] = current_token_version(self.user.pk, refresh=True)
+            with mock.patch.object(ad_feed, "enabled", True):
+                seen["feed"] = ad_feed.segments(self.user) is not None
+            with mock.patch.object(profile_cache, "enabled", True):
+                profile_cache.get(self.user.pk, lambda pk: seen.setdefault("profile", Ad.objects.all().db))
+            return HttpResponse()
+
+        self.get(view)
+        self.assertEqual(seen, {"routed": "replica", "version": 0, "feed": True, "profile": "default"})
+
+    def test_async_token_version(self):
+        async def view(request):
+            self.assertEqual(await acurrent_token_version(self.user.pk, refresh=True), 0)
+            return HttpResponse()
+
+        async_to_sync(ReplicaRoutingMiddleware(view))(RequestFactory().get("/"))
@@ -0,0 +1,156 @@
+# ads/tests/test_event_stream.py
+import asyncio
+import json
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from accounts.tokens import RoleRefreshToken
+from ads import lifecycle
+from ads.models import Ad, WorkRequest
+from config.events import EventHub, hub
+
+User = get_user_model()
+
+SLOT = datetime(2030, 1, 1, 10, 0, tzinfo=dt_timezone.utc)
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+def parse(chunk):
+    """(id, event, data) of one encoded event."""
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields.get("id"), fields.get("event"), json.loads(fields.get("data", "null"))
+
+
+class EventHubTests(SimpleTestCase):
+    def test_resume_replays_only_missed_events(self):
+        events = EventHub(backlog=10)
+
+        async def scenario():
+            sub, _, _ = events.subscribe(1)
+            events.publish([1, 2], "ad", {"n": 1})
+            events.publish([1], "ad", {"n": 2})
+            await asyncio.sleep(0)
+            first, second = await sub.next_batch(1)
+            events.unsubscribe(sub)
+
+            events.publish([1], "ad", {"n": 3})
+            _, replay, reset = events.subscribe(1, events.event_id(first.seq))
+            return [e.data["n"] for e in replay], reset
+
+        self.assertEqual(asyncio.run(scenario()), ([2, 3], None))
+
+    def test_unknown_or_evicted_ids_reset(self):
+        events = EventHub(backlog=2)
+
+        async def scenario():
+            for n in range(4):
+                events.publish([1], "ad", {"n": n})
+            stale = events.subscribe(1, events.event_id(1))[2]
+            foreign = events.subscribe(1, "deadbeef-3")[2]
+            covered = [e.data["n"] for e in events.subscribe(1, events.event_id(2))[1]]
+            return stale, foreign, covered
+
+        self.assertEqual(asyncio.run(scenario()), (4, 4, [2, 3]))
+
+    def test_slow_stream_is_marked_lagging(self):
+        events = EventHub(max_pending=2)
+
+        async def scenario():
+            sub, _, _ = events.subscribe(1)
+            for n in range(3):
+                events.publish([1], "ad", {"n": n})
+            await asyncio.sleep(0)
+            return sub.lagged, len(await sub.next_batch(1))
+
+        self.assertEqual(asyncio.run(scenario()), (True, 2))
+
+
+class LifecycleEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user("ev_owner", "CUSTOMER", "09127800001")
+        cls.contractor = create_user("ev_contractor", "CONTRACTOR", "09127800002")
+        cls.other = create_user("ev_other", "CONTRACTOR", "09127800003")
+
+    def backlog(self, user):
+        entry = hub._backlogs.get(user.id)
+        return [(e.kind, e.data) for e in entry[1]] if entry else []
+
+    def test_assign_and_done_reach_owner_and_contractors(self):
+        ad = Ad.objects.create(title="t", description="d", category="c", creator=self.owner)
+        chosen = WorkRequest.objects.create(ad=ad, contractor=self.contractor)
+        rejected = WorkRequest.objects.create(ad=ad, contractor=self.other)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lifecycle.assign(ad.id, self.owner, self.contractor.id, SLOT, "Tehran")
+        with self.captureOnCommitCallbacks(execute=True):
+            lifecycle.contractor_done(ad.id, self.contractor)
+        with self.captureOnCommitCallbacks(execute=True):
+            lifecycle.confirm_done(ad.id, self.owner)
+
+        statuses = [(kind, data["status"]) for kind, data in self.backlog(self.owner) if data.get("ad_id") == ad.id]
+        self.assertEqual(statuses, [("ad", "ASSIGNED"), ("ad", "ASSIGNED"), ("ad", "DONE")])
+        self.assertIn(
+            ("work_request", {"request_id": chosen.id, "ad_id": ad.id, "status": "ACCEPTED"}),
+            self.backlog(self.contractor),
+        )
+        self.assertIn(
+            ("work_request", {"request_id": rejected.id, "ad_id": ad.id, "status": "REJECTED"}),
+            self.backlog(self.other),
+        )
+
+    def test_failed_transition_publishes_nothing(self):
+        ad = Ad.objects.create(title="t", description="d", category="c", creator=self.owner)
+        before = len(self.backlog(self.owner))
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(lifecycle.IllegalTransition):
+            lifecycle.confirm_done(ad.id, self.owner)
+        self.assertEqual(len(self.backlog(self.owner)), before)
+
+
+class EventStreamViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user("sse_owner", "CUSTOMER", "09127810001")
+        cls.auth = f"Bearer {RoleRefreshToken.for_user(cls.owner).access_token}"
+
+    async def test_requires_a_token(self):
+        self.assertEqual((await self.async_client.get("/api/events/")).status_code, 401)
+
+    def test_wsgi_gets_501_not_an_endless_stream(self):
+        r = self.client.get("/api/events/", HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(r.status_code, 501)
+        self.assertIn("ASGI", r.json()["detail"])
+
+    async def test_stream_pushes_and_resumes(self):
+        auth = self.auth
+        r = await self.async_client.get("/api/events/", headers={"Authorization": auth})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["Content-Type"], "text/event-stream")
+
+        stream = aiter(r.streaming_content)
+        self.assertTrue((await anext(stream)).decode().startswith("retry:"))
+
+        hub.publish([self.owner.id], "ticket", {"ticket_id": 1})
+        event_id, kind, data = parse((await anext(stream)).decode())
+        self.assertEqual((kind, data), ("ticket", {"ticket_id": 1}))
+        await stream.aclose()
+
+        # missed while disconnected
+        hub.publish([self.owner.id], "ticket", {"ticket_id": 2})
+        r = await self.async_client.get("/api/events/", headers={"Authorization": auth, "Last-Event-ID": event_id})
+        stream = aiter(r.streaming_content)
+        await anext(stream)
+        self.assertEqual(parse((await anext(stream)).decode())[1:], ("ticket", {"ticket_id": 2}))
+        await stream.aclose()
+
+        # an id this process never issued
+        r = await self.async_client.get("/api/events/?last_event_id=nope-1", headers={"Authorization": auth})
+        stream = aiter(r.streaming_content)
+        await anext(stream)
+        self.assertEqual(parse((await anext(stream)).decode())[1], "reset")
+        await stream.aclose()
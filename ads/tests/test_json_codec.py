@@ -0,0 +1,91 @@
+# ads/tests/test_json_codec.py
+import io
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from accounts.tokens import RoleRefreshToken
+from ads.models import Ad
+from config import json_codec
+from config.json_codec import FastJSONParser, FastJSONRenderer
+
+User = get_user_model()
+
+PAYLOAD = {
+    "results": [
+        {
+            "id": 1,
+            "title": "Kitchen tap fix – ünïcode \u2028 \u2029",
+            "created_at": datetime(2030, 1, 1, 10, 0, 0, 123456, tzinfo=dt_timezone.utc),
+            "scheduled_at": datetime(2030, 1, 1, 10, 0, tzinfo=dt_timezone(timedelta(hours=3, minutes=30))),
+            "naive": datetime(2030, 1, 1, 10, 0),
+            "day": date(2030, 1, 1),
+            "duration": timedelta(hours=2),
+            "rating": Decimal("4.25"),
+            "token": uuid.UUID(int=7),
+            "label": gettext_lazy("Not found."),
+            "nested": {"ok": True, "none": None, "floats": [0.1, 2.5, -3.0]},
+        }
+    ],
+    7: "int key",
+    "next": None,
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_bytes_match_drf(self):
+        self.assertEqual(FastJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+
+    def test_indent_matches_drf(self):
+        for media_type in ("application/json; indent=2", "application/json; indent=4"):
+            with self.subTest(media_type=media_type):
+                self.assertEqual(
+                    FastJSONRenderer().render(PAYLOAD, media_type), JSONRenderer().render(PAYLOAD, media_type)
+                )
+
+    def test_stdlib_fallback_without_orjson(self):
+        with mock.patch.object(json_codec, "orjson", None):
+            self.assertEqual(FastJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"a": [1, 2]}')), {"a": [1, 2]})
+
+    def test_parser_matches_drf(self):
+        body = '{"ads": [1, 2], "message": "سلام", "score": 1.5, "ok": false}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_parser_rejects_malformed_and_non_finite(self):
+        for body in (b"{", b'{"a": NaN}', b"[Infinity]"):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+
+class FastJSONEndpointTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create(username="js_customer", phone="09126660001", role="CUSTOMER")
+        Ad.objects.create(title="تعمیر شیر", description="d", category="c", creator=cls.customer)
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(self.customer).access_token}")
+
+    def test_api_responses_are_rendered_by_the_fast_renderer(self):
+        r = self.client.get("/api/ads/")
+        self.assertIsInstance(r.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(r.content, JSONRenderer().render(r.data))
+
+    def test_json_bodies_are_parsed_by_the_fast_parser(self):
+        r = self.client.post("/api/ads/", {"title": "نو", "description": "d", "category": "c"}, format="json")
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(r.data["title"], "نو")
+
+        r = self.client.post("/api/ads/", b"{not json", content_type="application/json")
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("JSON parse error", r.data["detail"])
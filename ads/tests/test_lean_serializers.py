@@ -0,0 +1,113 @@
+# ads/tests/test_lean_serializers.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from accounts.serializers import AdSummarySerializer
+from accounts.tokens import RoleRefreshToken
+from ads.models import Ad, WorkRequest
+from ads.serializers import AdSerializer, WorkRequestSerializer
+from config.lean import LeanSerializer, lean
+from reviews.models import Review
+from reviews.serializers import ReviewSerializer
+from tickets.models import Ticket
+from tickets.serializers import TicketSerializer
+
+User = get_user_model()
+
+SLOT = timezone.now().replace(microsecond=0) + timedelta(days=3)
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class LeanSerializerTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("ln_customer", "CUSTOMER", "09124440001")
+        cls.contractor = create_user("ln_contractor", "CONTRACTOR", "09124440002")
+        Ad.objects.create(title="plain", description="d", category="c", creator=cls.customer)
+        cls.ad = Ad.objects.create(
+            title="تعمیر «شیر»", description="line\nbreak", category="plumbing", creator=cls.customer,
+            status=Ad.Status.DONE, assigned_contractor=cls.contractor, contractor_marked_done=True,
+            scheduled_at=SLOT, estimated_duration=timedelta(hours=1, minutes=30), location="Tehran",
+            latitude=35.7, longitude=51.4,
+        )
+        WorkRequest.objects.create(ad=cls.ad, contractor=cls.contractor, message="")
+        Review.objects.create(ad=cls.ad, contractor=cls.contractor, author=cls.customer, text="great", rating=5)
+        Ticket.objects.create(creator=cls.customer, title="help", message="m")
+        Ticket.objects.create(creator=cls.customer, ad=cls.ad, title="t", message="m", support_reply="ok", status="CLOSED")
+
+    CASES = (
+        (AdSerializer, Ad),
+        (AdSummarySerializer, Ad),
+        (WorkRequestSerializer, WorkRequest),
+        (ReviewSerializer, Review),
+        (TicketSerializer, Ticket),
+    )
+
+    def assertSameAsDRF(self):
+        for serializer_class, model in self.CASES:
+            with self.subTest(serializer=serializer_class.__name__):
+                qs = model.objects.order_by("id")
+                expected = serializer_class(qs, many=True).data
+                self.assertEqual(lean(serializer_class).serialize(qs), expected)
+                self.assertEqual(JSONRenderer().render(lean(serializer_class).serialize(qs)), JSONRenderer().render(expected))
+
+    def test_output_matches_the_serializers(self):
+        self.assertSameAsDRF()
+
+    def test_output_matches_in_another_timezone(self):
+        with timezone.override("Asia/Tehran"):
+            self.assertSameAsDRF()
+
+    def test_one_query_and_no_instances(self):
+        with self.assertNumQueries(1):
+            rows = lean(AdSerializer).serialize(Ad.objects.all())
+        self.assertEqual(len(rows), 2)
+        self.assertIs(type(rows[0]), dict)
+
+    def test_rows_carry_the_keyset_position(self):
+        row = lean(AdSerializer).rows(Ad.objects.filter(id=self.ad.id))[0]
+        self.assertEqual((row.created_at, row.pk), (self.ad.created_at, self.ad.pk))
+        self.assertEqual(row.data, AdSerializer(self.ad).data)
+
+    def test_fields_that_need_an_instance_are_rejected(self):
+        class Computed(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Ad
+                fields = ("id", "label")
+
+            def get_label(self, obj):
+                return obj.title
+
+        class Dotted(serializers.ModelSerializer):
+            creator_name = serializers.CharField(source="creator.username")
+
+            class Meta:
+                model = Ad
+                fields = ("id", "creator_name")
+
+        for serializer_class in (Computed, Dotted):
+            with self.subTest(serializer=serializer_class.__name__), self.assertRaises(ImproperlyConfigured):
+                LeanSerializer(serializer_class)
+
+    def test_list_endpoints_serve_the_same_json(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(self.customer).access_token}")
+        r = self.client.get("/api/tickets/")
+        expected = TicketSerializer(Ticket.objects.order_by("-created_at", "-id"), many=True).data
+        self.assertEqual(r.data["results"], expected)
+
+        r = self.client.get(f"/api/ads/{self.ad.id}/requests/")
+        self.assertEqual(r.data, WorkRequestSerializer(WorkRequest.objects.all(), many=True).data)
+
+        r = self.client.get("/api/ads/?legacy=1")
+        self.assertEqual(sorted(r.data, key=lambda a: a["id"]), AdSerializer(Ad.objects.order_by("id"), many=True).data)
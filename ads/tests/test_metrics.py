@@ -0,0 +1,92 @@
+# ads/tests/test_metrics.py
+import re
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from accounts.tokens import RoleRefreshToken
+from config.metrics import CONTENT_TYPE, registry
+from tickets.models import Ticket
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+def sample(text, name, **labels):
+    """Value of one sample in the exposition text (labels must match exactly, in any order)."""
+    for line in text.splitlines():
+        match = re.fullmatch(rf"{re.escape(name)}\{{(.*)\}} (\S+)", line)
+        if match and dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(1))) == labels:
+            return float(match.group(2))
+    return None
+
+
+class MetricsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user("mt_admin", "ADMIN", "09123330001")
+        cls.customer = create_user("mt_customer", "CUSTOMER", "09123330002")
+        for i in range(3):
+            Ticket.objects.create(creator=cls.customer, title=f"t{i}", message="m")
+
+    def setUp(self):
+        registry.clear()
+
+    def as_user(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(user).access_token}")
+
+    def scrape(self):
+        self.as_user(self.admin)
+        r = self.client.get("/api/metrics")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["Content-Type"], CONTENT_TYPE)
+        return r.content.decode()
+
+    def test_admins_only(self):
+        self.assertEqual(self.client.get("/api/metrics").status_code, 401)
+        self.as_user(self.customer)
+        self.assertEqual(self.client.get("/api/metrics").status_code, 403)
+
+    def test_records_latency_queries_and_render_time_per_route(self):
+        self.as_user(self.customer)
+        self.client.get("/api/tickets/")  # warms the token-version cache
+        registry.clear()
+        for _ in range(2):
+            self.assertEqual(self.client.get("/api/tickets/").status_code, 200)
+
+        text = self.scrape()
+        route = {"route": "api/tickets/$", "method": "GET"}
+        self.assertEqual(sample(text, "api_request_duration_seconds_count", **route), 2)
+        self.assertEqual(sample(text, "api_request_duration_seconds_bucket", le="+Inf", **route), 2)
+        self.assertEqual(sample(text, "api_requests_total", status="2xx", **route), 2)
+        self.assertEqual(sample(text, "api_db_queries_total", **route), 4)  # ETag page probe + page, twice
+        self.assertGreater(sample(text, "api_db_duration_seconds_total", **route), 0)
+        self.assertGreater(sample(text, "api_render_duration_seconds_total", **route), 0)
+        self.assertGreater(sample(text, "api_serialize_duration_seconds_total", **route), 0)
+
+    def test_histogram_buckets_are_cumulative(self):
+        self.as_user(self.customer)
+        for _ in range(3):
+            self.client.get("/api/tickets/")
+        text = self.scrape()
+        counts = [
+            float(v) for v in re.findall(r'api_request_duration_seconds_bucket\{route="api/tickets/\$",method="GET",le="[^"]+"\} (\S+)', text)
+        ]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[-1], 3)
+
+    def test_async_views_count_their_queries(self):
+        # the async ORM runs its queries in worker threads, on their own connections
+        self.as_user(self.customer)
+        self.assertEqual(self.client.get("/api/tickets/async/").status_code, 200)
+        text = self.scrape()
+        self.assertEqual(sample(text, "api_db_queries_total", route="api/tickets/async/", method="GET"), 2)
+
+    def test_unknown_urls_share_one_label(self):
+        for path in ("/nope/1/", "/nope/2/"):
+            self.assertEqual(self.client.get(path).status_code, 404)
+        text = self.scrape()
+        self.assertEqual(sample(text, "api_requests_total", route="<unmatched>", method="GET", status="4xx"), 2)
@@ -0,0 +1,168 @@
+# ads/tests/test_query_plans.py
+"""
+EXPLAIN QUERY PLAN regression suite.
+
+Every SELECT an endpoint issues is re-run through SQLite's EXPLAIN QUERY PLAN;
+a plain `SCAN <table>` (no index) fails the test. Endpoints that promise index
+order also fail on `USE TEMP B-TREE FOR ORDER BY`. Keyset-paged lists promise
+a cost per page, so they also fail on any SCAN (a covering index included)
+that is not an index-ordered walk cut short by the statement's LIMIT.
+"""
+import re
+import unittest
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.cache import profile_cache
+from ads.models import Ad, WorkRequest
+from reviews.models import Review
+from tickets.models import Ticket
+
+User = get_user_model()
+
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?\w+( AS \w+)?$")
+TEMP_SORT = "USE TEMP B-TREE FOR ORDER BY"
+LIMIT = re.compile(r"\bLIMIT \d+\s*$")
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite-specific")
+class QueryPlanTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("qp_customer", "CUSTOMER", "09128880001")
+        cls.customer.set_password("testpass123")
+        cls.customer.save()
+        cls.contractor = create_user("qp_contractor", "CONTRACTOR", "09128880002")
+        cls.other = create_user("qp_other", "CONTRACTOR", "09128880003")
+        cls.support = create_user("qp_support", "SUPPORT", "09128880004")
+
+        start = timezone.now() + timedelta(days=1)
+        cls.ads = []
+        for i in range(30):
+            status = [Ad.Status.OPEN, Ad.Status.ASSIGNED, Ad.Status.DONE][i % 3]
+            ad = Ad.objects.create(
+                title=f"ad {i}", description="d", category="c", creator=cls.customer, status=status,
+                assigned_contractor=None if status == Ad.Status.OPEN else cls.contractor,
+                scheduled_at=None if status == Ad.Status.OPEN else start + timedelta(hours=i),
+            )
+            cls.ads.append(ad)
+            WorkRequest.objects.create(ad=ad, contractor=cls.contractor)
+            WorkRequest.objects.create(ad=ad, contractor=cls.other)
+            if status == Ad.Status.DONE:
+                Review.objects.create(ad=ad, contractor=cls.contractor, author=cls.customer, text="t", rating=1 + i % 5)
+            Ticket.objects.create(creator=cls.customer, title=f"t{i}", message="m")
+
+        cls.open_ad = cls.ads[0]
+        cls.day = (start + timedelta(hours=1)).date().isoformat()
+
+    def setUp(self):
+        profile_cache.clear()
+
+    def as_user(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexedPlans(self, method, url, data=None, ordered=False, paged=False):
+        with CaptureQueriesContext(connection) as ctx:
+            r = getattr(self.client, method)(url, data, format="json")
+        self.assertLess(r.status_code, 400, (url, getattr(r, "data", None)))
+
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith("SELECT")]
+        self.assertTrue(selects, url)
+        for sql in selects:
+            plan = self.explain(sql)
+            scans = [line for line in plan if FULL_SCAN.match(line)]
+            self.assertFalse(scans, f"{url}: full scan\n{sql}\n" + "\n".join(plan))
+            if ordered:
+                self.assertNotIn(TEMP_SORT, plan, f"{url}: sort not served by an index\n{sql}\n" + "\n".join(plan))
+            if paged and any(line.startswith("SCAN ") for line in plan):
+                bounded = LIMIT.search(sql) and TEMP_SORT not in plan
+                self.assertTrue(bounded, f"{url}: scan not bounded by the page\n{sql}\n" + "\n".join(plan))
+        return r
+
+    # -------- accounts --------
+
+    def test_login_lookup(self):
+        for identifier in (self.customer.username, self.customer.email, self.customer.phone):
+            self.assertIndexedPlans("post", "/api/auth/login/", {"identifier": identifier, "password": "testpass123"})
+
+    def test_contractor_directory_and_profile(self):
+        self.as_user(self.customer)
+        self.assertIndexedPlans("get", "/api/contractors/")
+        self.assertIndexedPlans("get", f"/api/contractors/{self.contractor.id}/profile/", ordered=True)
+        self.assertIndexedPlans("get", f"/api/contractors/{self.contractor.id}/reviews/", ordered=True)
+        self.assertIndexedPlans("get", f"/api/contractors/{self.contractor.id}/reviews/?min_rating=3", ordered=True)
+
+    def test_me_endpoints(self):
+        self.as_user(self.customer)
+        self.assertIndexedPlans("get", "/api/me/profile/", ordered=True)
+        self.as_user(self.contractor)
+        self.assertIndexedPlans("get", "/api/me/profile/")
+        self.assertIndexedPlans("get", f"/api/me/schedule/?date={self.day}", ordered=True)
+        self.assertIndexedPlans("get", f"/api/me/schedule/?from={self.day}&to={self.day}", ordered=True)
+        self.assertIndexedPlans("get", "/api/me/schedule.ics", ordered=True)
+
+    # -------- ads --------
+
+    def test_ad_lists(self):
+        for user in (self.customer, self.contractor, self.support):
+            self.as_user(user)
+            r = self.assertIndexedPlans("get", "/api/ads/?page_size=5", ordered=True, paged=True)
+            self.assertIndexedPlans("get", r.data["next"], ordered=True, paged=True)
+            self.assertIndexedPlans("get", "/api/ads/async/?page_size=5", ordered=True, paged=True)
+
+    def test_ad_detail_and_requests(self):
+        self.as_user(self.customer)
+        self.assertIndexedPlans("get", f"/api/ads/{self.open_ad.id}/")
+        self.assertIndexedPlans("get", f"/api/ads/{self.open_ad.id}/requests/")
+        self.assertIndexedPlans("get", f"/api/ads/{self.ads[2].id}/reviews/")
+
+    def test_search(self):
+        for user in (self.customer, self.contractor):
+            self.as_user(user)
+            self.assertIndexedPlans("get", "/api/ads/search/?q=ad")
+
+    def test_nearby(self):
+        Ad.objects.filter(id=self.open_ad.id).update(latitude=35.69, longitude=51.39, geohash="tnkf0000000")
+        self.as_user(self.contractor)
+        self.assertIndexedPlans("get", "/api/ads/nearby/?lat=35.69&lng=51.39&radius_km=10")
+
+    def test_assign(self):
+        self.as_user(self.customer)
+        self.assertIndexedPlans(
+            "post",
+            f"/api/ads/{self.open_ad.id}/assign/",
+            {"contractor_id": self.contractor.id, "scheduled_at": "2030-01-01T10:00:00Z", "location": "Tehran"},
+        )
+
+    def test_schedule_conflict_probe(self):
+        self.as_user(self.contractor)
+        self.assertIndexedPlans(
+            "post",
+            f"/api/ads/{self.ads[1].id}/schedule/",
+            {"scheduled_at": "2031-01-01T10:00:00Z", "location": "Tehran"},
+        )
+
+    # -------- tickets --------
+
+    def test_ticket_lists(self):
+        self.as_user(self.customer)
+        self.assertIndexedPlans("get", "/api/tickets/?page_size=5", ordered=True, paged=True)
+        self.as_user(self.support)
+        self.assertIndexedPlans("get", "/api/tickets/?page_size=5", ordered=True, paged=True)
+        self.assertIndexedPlans("get", "/api/tickets/async/?page_size=5", ordered=True, paged=True)
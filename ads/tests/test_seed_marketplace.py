@@ -0,0 +1,109 @@
+# ads/tests/test_seed_marketplace.py
+import io
+import unittest
+from collections import defaultdict
+from datetime import date
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from accounts.cache import profile_cache
+from accounts.models import User
+from accounts.stats import rebuild_contractor_stats
+from ads.feed import ad_feed
+from ads.models import Ad, WorkRequest
+from ads.search import TRIGGERS
+from benchmarks.marketplace import PASSWORD, MarketplaceGenerator
+from reviews.models import Review
+from tickets.models import Ticket
+
+ANCHOR = date(2026, 1, 15)
+
+
+def indexes():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger') ORDER BY name")
+        return [name for (name,) in cursor.fetchall()]
+
+
+class SeedMarketplaceTests(APITestCase):
+    def setUp(self):
+        ad_feed.clear()
+        profile_cache.clear()
+
+    def seed(self, **opts):
+        out = io.StringIO()
+        call_command("seed_marketplace", users=60, ads=300, seed=7, anchor=ANCHOR, batch_size=100, **opts, stdout=out)
+        return out.getvalue()
+
+    def test_rows_follow_the_lifecycle_rules(self):
+        out = self.seed()
+        self.assertIn("300 Ad", out)
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Ad.objects.count(), 300)
+        self.assertTrue(User.objects.first().check_password(PASSWORD))
+
+        requests = defaultdict(list)
+        for r in WorkRequest.objects.all():
+            requests[r.ad_id].append(r)
+        statuses = set()
+        for ad in Ad.objects.all():
+            statuses.add(ad.status)
+            accepted = [r for r in requests[ad.id] if r.status == WorkRequest.Status.ACCEPTED]
+            if ad.status in (Ad.Status.ASSIGNED, Ad.Status.DONE):
+                self.assertEqual([r.contractor_id for r in accepted], [ad.assigned_contractor_id])
+                self.assertEqual(ad.scheduled_end, ad.scheduled_at + ad.estimated_duration)
+                others = {r.status for r in requests[ad.id]} - {WorkRequest.Status.ACCEPTED}
+                self.assertLessEqual(others, {WorkRequest.Status.REJECTED})
+            else:
+                self.assertIsNone(ad.assigned_contractor_id)
+                self.assertEqual(accepted, [])
+        self.assertLessEqual({Ad.Status.OPEN, Ad.Status.ASSIGNED, Ad.Status.DONE}, statuses)
+
+        for review in Review.objects.select_related("ad"):
+            self.assertEqual(review.ad.status, Ad.Status.DONE)
+            self.assertEqual(review.author_id, review.ad.creator_id)
+            self.assertEqual(review.contractor_id, review.ad.assigned_contractor_id)
+        self.assertTrue(Review.objects.exists())
+        self.assertTrue(Ticket.objects.exists())
+
+        jobs = defaultdict(list)
+        for ad in Ad.objects.filter(status=Ad.Status.ASSIGNED).order_by("scheduled_at"):
+            jobs[ad.assigned_contractor_id].append(ad)
+        for ads in jobs.values():
+            for before, after in zip(ads, ads[1:]):
+                self.assertLessEqual(before.scheduled_end, after.scheduled_at)
+
+        # the command already rebuilt the denormalized stats
+        self.assertEqual(rebuild_contractor_stats()[1], 0)
+
+    def test_same_seed_gives_the_same_rows(self):
+        self.seed()
+        first = list(Ad.objects.order_by("id").values_list("title", "status", "category", "created_at"))
+        self.seed()  # appended after the first run's rows
+        second = list(Ad.objects.order_by("id").values_list("title", "status", "category", "created_at"))[300:]
+        self.assertEqual(first, second)
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "indexes are only dropped on SQLite")
+    def test_indexes_and_search_are_rebuilt(self):
+        before = indexes()
+        self.seed()
+        self.assertEqual(indexes(), before)
+        self.assertLessEqual(set(TRIGGERS), set(before))
+
+        customer = User.objects.filter(role=User.Role.CUSTOMER).first()
+        self.client.force_authenticate(customer)
+        response = self.client.get("/api/ads/search/?q=plumbing")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["results"])
+
+    def test_too_few_users_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, "at least 4"):
+            call_command("seed_marketplace", users=3, ads=1, stdout=io.StringIO())
+
+    def test_generator_returns_counts(self):
+        counts = MarketplaceGenerator(10, 20, anchor=ANCHOR).run(drop_indexes=False)
+        self.assertEqual((counts["User"], counts["Ad"]), (10, 20))
+        self.assertEqual(counts["WorkRequest"], WorkRequest.objects.count())
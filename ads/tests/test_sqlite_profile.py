@@ -0,0 +1,31 @@
+# ads/tests/test_sqlite_profile.py
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from config.sqlite import LEGACY_PROFILE, sqlite_options
+
+
+class SqliteOptionsTests(SimpleTestCase):
+    def test_profile_becomes_connection_options(self):
+        options = sqlite_options({"BUSY_TIMEOUT_MS": 2500, "CACHE_SIZE_KIB": 1024})
+        self.assertEqual(options["timeout"], 2.5)
+        self.assertEqual(options["transaction_mode"], "IMMEDIATE")
+        self.assertIn("PRAGMA journal_mode=WAL", options["init_command"].split(";"))
+        self.assertIn("PRAGMA cache_size=-1024", options["init_command"].split(";"))
+
+    def test_legacy_profile_is_deferred(self):
+        self.assertIsNone(sqlite_options(LEGACY_PROFILE)["transaction_mode"])
+
+
+class SqliteConnectionTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied_on_connect(self):
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+        self.assertEqual(self.pragma("busy_timeout"), 5000)
+        self.assertEqual(self.pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma("temp_store"), 2)   # MEMORY
+        self.assertEqual(self.pragma("cache_size"), -64 * 1024)
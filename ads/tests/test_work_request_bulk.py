@@ -0,0 +1,84 @@
+# ads/tests/test_work_request_bulk.py
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from accounts.tokens import RoleRefreshToken
+from ads.models import Ad, WorkRequest
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class BulkWorkRequestTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("bulk_customer", "CUSTOMER", "09122220001")
+        cls.contractor = create_user("bulk_contractor", "CONTRACTOR", "09122220002")
+        cls.other = create_user("bulk_other", "CONTRACTOR", "09122220003")
+
+        def ad(status=Ad.Status.OPEN, contractor=None):
+            return Ad.objects.create(
+                title="t", description="d", category="c", creator=cls.customer,
+                status=status, assigned_contractor=contractor,
+            )
+
+        cls.open_ads = [ad() for _ in range(5)]
+        cls.mine_assigned = ad(Ad.Status.ASSIGNED, cls.contractor)
+        cls.hidden = ad(Ad.Status.ASSIGNED, cls.other)
+
+        WorkRequest.objects.create(ad=cls.open_ads[1], contractor=cls.contractor, status=WorkRequest.Status.REJECTED)
+        WorkRequest.objects.create(ad=cls.open_ads[2], contractor=cls.contractor, status=WorkRequest.Status.CANCELED)
+        WorkRequest.objects.create(ad=cls.open_ads[3], contractor=cls.contractor, message="old")
+
+    def as_user(self, user):
+        token = RoleRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def post(self, items):
+        return self.client.post("/api/requests/bulk/", {"items": items}, format="json")
+
+    def test_per_item_results(self):
+        self.as_user(self.contractor)
+        ids = [a.id for a in self.open_ads]
+        r = self.post(
+            [{"ad_id": i, "message": f"m{i}"} for i in ids]
+            + [{"ad_id": ids[0]}, {"ad_id": self.mine_assigned.id}, {"ad_id": self.hidden.id}, {"ad_id": 999999}]
+        )
+        self.assertEqual(r.status_code, 200)
+        results = [(x["ad_id"], x["result"]) for x in r.data["results"]]
+        self.assertEqual(results, [
+            (ids[0], "created"), (ids[1], "re_pending"), (ids[2], "re_pending"), (ids[3], "exists"),
+            (ids[4], "created"), (ids[0], "duplicate"), (self.mine_assigned.id, "not_open"),
+            (self.hidden.id, "not_found"), (999999, "not_found"),
+        ])
+
+        by_ad = {wr.ad_id: wr for wr in WorkRequest.objects.filter(contractor=self.contractor)}
+        for i in (ids[0], ids[1], ids[2], ids[4]):
+            self.assertEqual((by_ad[i].status, by_ad[i].message), ("PENDING", f"m{i}"))
+        self.assertEqual(by_ad[ids[3]].message, "old")
+
+        first = r.data["results"][0]["request"]
+        self.assertEqual((first["id"], first["status"]), (by_ad[ids[0]].id, "PENDING"))
+        self.assertIsNone(r.data["results"][-1]["request"])
+
+    def test_statement_count_does_not_grow_with_items(self):
+        self.as_user(self.contractor)
+        payload = [{"ad_id": a.id} for a in self.open_ads]
+        self.post(payload[:1])  # warms the token-version cache
+
+        # ads+existing SELECT, INSERT, UPDATE, result SELECT, plus the atomic block's savepoint pair
+        with self.assertNumQueries(6):
+            self.assertEqual(self.post(payload).status_code, 200)
+
+    def test_only_contractors(self):
+        self.as_user(self.customer)
+        self.assertEqual(self.post([{"ad_id": self.open_ads[0].id}]).status_code, 403)
+
+    def test_validation(self):
+        self.as_user(self.contractor)
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.post([{"message": "no id"}]).status_code, 400)
+        self.assertEqual(self.post([{"ad_id": 1}] * 101).status_code, 400)
@@ -1,4 +1,8 @@
-from django.db.models import Q
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, TextField, Value, When
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
 from rest_framework import viewsets
@@ -8,37 +12,134 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
 
 from accounts.models import User
+from accounts.stats import record_review
 from .models import Ad, WorkRequest
-from .serializers import AdSerializer, WorkRequestSerializer
+from .serializers import AdSerializer, BulkWorkRequestSerializer, WorkRequestSerializer
 from .permissions import IsAdOwnerOrSupportAdmin
+from . import geo, lifecycle
+from .feed import ad_feed
+from .search import match_expression, search as search_ads
 
 from reviews.models import Review
 from reviews.serializers import ReviewSerializer
 
+from config.conditional import ConditionalGetMixin, make_etag, not_modified, set_validators
+from config.lean import lean
+from config.pagination import KeysetCursorPagination, RankCursorPagination
 
-class AdViewSet(viewsets.ModelViewSet):
-    serializer_class = AdSerializer
-    permission_classes = [IsAuthenticated, IsAdOwnerOrSupportAdmin]
 
-    def get_queryset(self):
-        user = self.request.user
+@contextmanager
+def transition_errors():
+    """Map ads.lifecycle errors to API errors."""
+    try:
+        yield
+    except lifecycle.AdNotFound as e:
+        raise NotFound(e.message)
+    except lifecycle.TransitionForbidden as e:
+        raise PermissionDenied(e.message)
+    except lifecycle.IllegalTransition as e:
+        raise ValidationError({e.field: e.message} if e.field else e.message)
 
-        if user.role == User.Role.CUSTOMER:
-            # customer: see own ads + OPEN ads
-            return Ad.objects.filter(Q(creator=user) | Q(status=Ad.Status.OPEN)).distinct()
 
-        if user.role == User.Role.CONTRACTOR:
-            # contractor: see OPEN ads + ads assigned to them
-            return Ad.objects.filter(Q(status=Ad.Status.OPEN) | Q(assigned_contractor=user)).distinct()
+class AdViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    serializer_class = AdSerializer
+    permission_classes = [IsAuthenticated, IsAdOwnerOrSupportAdmin]
+    pagination_class = KeysetCursorPagination
+    lean_list = True
 
-        # support/admin: see all
-        return Ad.objects.all()
+    NEARBY_DEFAULT_RADIUS_KM = 10
+    NEARBY_MAX_RADIUS_KM = 200
+    NEARBY_DEFAULT_LIMIT = 50
+    NEARBY_MAX_LIMIT = 200
+
+    def get_queryset(self):
+        return lifecycle.visible_ads(self.request.user)
 
     def perform_create(self, serializer):
         if self.request.user.role != User.Role.CUSTOMER:
             raise PermissionDenied("Only customers can create ads.")
         serializer.save(creator=self.request.user)
 
+    def perform_update(self, serializer):
+        # a longer job moves scheduled_end (Ad.save): same overlap rule as assign / schedule
+        with transaction.atomic(), transition_errors():
+            ad = serializer.save()
+            if "estimated_duration" in serializer.validated_data:
+                lifecycle.check_no_overlap(ad)
+
+    # -------------------------
+    # /api/ads/
+    # Served from the feed cache (ads/feed.py): the shared OPEN segment plus
+    # the caller's own; ?legacy=1 and an oversized shared segment read the DB
+    # -------------------------
+    def list(self, request, *args, **kwargs):
+        feed = None if self.paginator.is_legacy(request) else ad_feed.segments(request.user)
+        if feed is None:
+            return super().list(request, *args, **kwargs)
+
+        segments, version = feed
+        etag = make_etag("feed", request.user.pk, request.get_full_path(), version)
+        response = not_modified(request, etag)
+        if response is None:
+            page = self.paginator.paginate_segments(segments, request)
+            response = self.get_paginated_response([row.data for row in page])
+        return set_validators(response, etag)
+
+    # -------------------------
+    # /api/ads/search/?q=...
+    # Full-text search (FTS5, bm25-ranked) within what the user can see
+    # -------------------------
+    @action(detail=False, methods=["get"], url_path="search", permission_classes=[IsAuthenticated])
+    def search(self, request):
+        q = request.query_params.get("q", "")
+        if match_expression(q) is None:
+            raise ValidationError({"q": "Provide at least one word to search for."})
+
+        visible = self.get_queryset()
+        paginator = RankCursorPagination()
+        hits = paginator.paginate_ranked(request, lambda after, limit: search_ads(visible, q, after, limit))
+
+        ads = Ad.objects.in_bulk([pk for pk, _ in hits])
+        ranked = [ads[pk] for pk, _ in hits if pk in ads]
+        return paginator.get_paginated_response(AdSerializer(ranked, many=True).data)
+
+    # -------------------------
+    # /api/ads/nearby/?lat=..&lng=..&radius_km=10
+    # Ads with coordinates within radius_km of a point, nearest first
+    # -------------------------
+    @action(detail=False, methods=["get"], url_path="nearby", permission_classes=[IsAuthenticated])
+    def nearby(self, request):
+        params = request.query_params
+        try:
+            lat = float(params["lat"])
+            lng = float(params["lng"])
+            radius_km = float(params.get("radius_km", self.NEARBY_DEFAULT_RADIUS_KM))
+            limit = int(params.get("limit", self.NEARBY_DEFAULT_LIMIT))
+        except (KeyError, ValueError):
+            raise ValidationError("lat and lng are required; radius_km and limit must be numbers.")
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValidationError("lat must be within [-90, 90] and lng within [-180, 180].")
+        if not (0 < radius_km <= self.NEARBY_MAX_RADIUS_KM):
+            raise ValidationError(f"radius_km must be in (0, {self.NEARBY_MAX_RADIUS_KM}].")
+        limit = min(max(limit, 1), self.NEARBY_MAX_LIMIT)
+
+        # 1) geohash prefix ranges (index probes) -> candidates
+        cells = Q()
+        for prefix in geo.covering_cells(lat, lng, radius_km):
+            cells |= Q(geohash__gte=prefix, geohash__lt=prefix + geo.RANGE_END)
+        candidates = self.get_queryset().filter(cells).values_list("id", "latitude", "longitude")
+
+        # 2) exact haversine on the candidates
+        hits = geo.within(lat, lng, radius_km, candidates)[:limit]
+
+        ads = Ad.objects.in_bulk([pk for _, pk in hits])
+        data = []
+        for distance, pk in hits:
+            row = AdSerializer(ads[pk]).data
+            row["distance_km"] = round(distance, 3)
+            data.append(row)
+        return Response(data)
+
     # -------------------------
     # /api/ads/{id}/requests/
     # -------------------------
@@ -50,15 +151,15 @@ class AdViewSet(viewsets.ModelViewSet):
         if request.method == "GET":
             if user.role in (User.Role.SUPPORT, User.Role.ADMIN):
                 qs = ad.requests.all().order_by("-created_at")
-                return Response(WorkRequestSerializer(qs, many=True).data)
+                return Response(lean(WorkRequestSerializer).serialize(qs))
 
             if user.role == User.Role.CUSTOMER and ad.creator_id == user.id:
                 qs = ad.requests.all().order_by("-created_at")
-                return Response(WorkRequestSerializer(qs, many=True).data)
+                return Response(lean(WorkRequestSerializer).serialize(qs))
 
             if user.role == User.Role.CONTRACTOR:
                 qs = ad.requests.filter(contractor=user).order_by("-created_at")
-                return Response(WorkRequestSerializer(qs, many=True).data)
+                return Response(lean(WorkRequestSerializer).serialize(qs))
 
             raise PermissionDenied("You cannot view requests for this ad.")
 
@@ -80,7 +181,7 @@ class AdViewSet(viewsets.ModelViewSet):
         if not created and wr.status in (WorkRequest.Status.REJECTED, WorkRequest.Status.CANCELED):
             wr.status = WorkRequest.Status.PENDING
             wr.message = message
-            wr.save(update_fields=["status", "message"])
+            wr.save(update_fields=["status", "message", "updated_at"])
 
         return Response(WorkRequestSerializer(wr).data, status=201)
 
@@ -91,23 +192,23 @@ class AdViewSet(viewsets.ModelViewSet):
     # -------------------------
     @action(detail=True, methods=["post"], url_path="assign", permission_classes=[IsAuthenticated])
     def assign(self, request, pk=None):
-        ad = self.get_object()
-        user = request.user
-
-        # who can assign?
-        if user.role in (User.Role.SUPPORT, User.Role.ADMIN):
-            pass
-        elif user.role == User.Role.CUSTOMER and ad.creator_id == user.id:
-            pass
-        else:
-            raise PermissionDenied("Only owner/support/admin can assign.")
-
-        if ad.status != Ad.Status.OPEN:
-            raise ValidationError("Only OPEN ads can be assigned.")
-
-        contractor_id = request.data.get("contractor_id")
-        scheduled_at_raw = request.data.get("scheduled_at")
-        location = request.data.get("location")
+        try:
+            contractor_id, scheduled_at, location = self._assign_body(request.data)
+        except ValidationError:
+            # not found / forbidden / wrong state outrank a bad body
+            with transition_errors():
+                lifecycle.check_assign(pk, request.user)
+            raise
+
+        with transition_errors():
+            lifecycle.assign(pk, request.user, contractor_id, scheduled_at, location)
+        return Response(AdSerializer(Ad.objects.get(pk=pk)).data, status=200)
+
+    @staticmethod
+    def _assign_body(data):
+        contractor_id = data.get("contractor_id")
+        scheduled_at_raw = data.get("scheduled_at")
+        location = data.get("location")
 
         if not contractor_id:
             raise ValidationError({"contractor_id": "This field is required."})
@@ -116,45 +217,15 @@ class AdViewSet(viewsets.ModelViewSet):
         if not location:
             raise ValidationError({"location": "This field is required."})
 
+        try:
+            contractor_id = int(contractor_id)
+        except (TypeError, ValueError):
+            raise ValidationError({"contractor_id": "A valid integer is required."})
+
         scheduled_at = parse_datetime(scheduled_at_raw)
         if scheduled_at is None:
             raise ValidationError({"scheduled_at": "Invalid datetime. Use ISO 8601."})
-
-        try:
-            contractor = User.objects.get(id=contractor_id, role=User.Role.CONTRACTOR)
-        except User.DoesNotExist:
-            raise NotFound("Contractor not found.")
-
-        # contractor must have requested this ad
-        try:
-            chosen_wr = WorkRequest.objects.get(ad=ad, contractor=contractor)
-        except WorkRequest.DoesNotExist:
-            raise NotFound("This contractor has not requested this ad.")
-
-        # accept chosen request, reject other pending requests
-        WorkRequest.objects.filter(ad=ad).exclude(id=chosen_wr.id).filter(
-            status=WorkRequest.Status.PENDING
-        ).update(status=WorkRequest.Status.REJECTED)
-
-        chosen_wr.status = WorkRequest.Status.ACCEPTED
-        chosen_wr.save(update_fields=["status"])
-
-        ad.assigned_contractor = contractor
-        ad.scheduled_at = scheduled_at
-        ad.location = location
-        ad.status = Ad.Status.ASSIGNED
-        ad.contractor_marked_done = False
-        ad.save(
-            update_fields=[
-                "assigned_contractor",
-                "scheduled_at",
-                "location",
-                "status",
-                "contractor_marked_done",
-            ]
-        )
-
-        return Response(AdSerializer(ad).data, status=200)
+        return contractor_id, scheduled_at, location
 
     # -------------------------
     # /api/ads/{id}/schedule/
@@ -164,20 +235,21 @@ class AdViewSet(viewsets.ModelViewSet):
     # -------------------------
     @action(detail=True, methods=["post"], url_path="schedule", permission_classes=[IsAuthenticated])
     def schedule(self, request, pk=None):
-        ad = self.get_object()
-        u = request.user
-
-        if u.role != User.Role.CONTRACTOR:
-            raise PermissionDenied("Only contractors can set schedule.")
-
-        if ad.assigned_contractor_id != u.id:
-            raise PermissionDenied("Only assigned contractor can schedule this ad.")
+        try:
+            dt, location = self._schedule_body(request.data)
+        except ValidationError:
+            with transition_errors():
+                lifecycle.check_schedule(pk, request.user)
+            raise
 
-        if ad.status != Ad.Status.ASSIGNED:
-            raise ValidationError("Only ASSIGNED ads can be scheduled.")
+        with transition_errors():
+            lifecycle.schedule(pk, request.user, dt, location)
+        return Response(AdSerializer(Ad.objects.get(pk=pk)).data, status=200)
 
-        scheduled_at_raw = request.data.get("scheduled_at")
-        location = request.data.get("location")
+    @staticmethod
+    def _schedule_body(data):
+        scheduled_at_raw = data.get("scheduled_at")
+        location = data.get("location")
 
         if not scheduled_at_raw or not location:
             raise ValidationError({"scheduled_at": "required", "location": "required"})
@@ -185,21 +257,7 @@ class AdViewSet(viewsets.ModelViewSet):
         dt = parse_datetime(scheduled_at_raw)
         if dt is None:
             raise ValidationError({"scheduled_at": "Use ISO format like 2025-12-30T10:00:00Z"})
-
-        conflict = Ad.objects.filter(
-            assigned_contractor=u,
-            status=Ad.Status.ASSIGNED,
-            scheduled_at=dt,
-        ).exclude(id=ad.id).exists()
-
-        if conflict:
-            raise ValidationError({"scheduled_at": "Time conflict: you already have a job at this time."})
-
-        ad.scheduled_at = dt
-        ad.location = location
-        ad.save(update_fields=["scheduled_at", "location"])
-
-        return Response(AdSerializer(ad).data, status=200)
+        return dt, location
 
     # -------------------------
     # /api/ads/{id}/contractor-done/
@@ -207,20 +265,8 @@ class AdViewSet(viewsets.ModelViewSet):
     # -------------------------
     @action(detail=True, methods=["post"], url_path="contractor-done", permission_classes=[IsAuthenticated])
     def contractor_done(self, request, pk=None):
-        ad = self.get_object()
-        user = request.user
-
-        if user.role != User.Role.CONTRACTOR:
-            raise PermissionDenied("Only contractors can do this.")
-
-        if ad.assigned_contractor_id != user.id:
-            raise PermissionDenied("You are not assigned to this ad.")
-
-        if ad.status != Ad.Status.ASSIGNED:
-            raise ValidationError("Only ASSIGNED ads can be marked done.")
-
-        ad.contractor_marked_done = True
-        ad.save(update_fields=["contractor_marked_done"])
+        with transition_errors():
+            lifecycle.contractor_done(pk, request.user)
         return Response({"detail": "Marked done by contractor."}, status=200)
 
     # -------------------------
@@ -229,24 +275,8 @@ class AdViewSet(viewsets.ModelViewSet):
     # -------------------------
     @action(detail=True, methods=["post"], url_path="confirm-done", permission_classes=[IsAuthenticated])
     def confirm_done(self, request, pk=None):
-        ad = self.get_object()
-        user = request.user
-
-        if user.role in (User.Role.SUPPORT, User.Role.ADMIN):
-            pass
-        elif user.role == User.Role.CUSTOMER and ad.creator_id == user.id:
-            pass
-        else:
-            raise PermissionDenied("Only owner/support/admin can confirm done.")
-
-        if ad.status != Ad.Status.ASSIGNED:
-            raise ValidationError("Only ASSIGNED ads can be confirmed done.")
-
-        if not ad.contractor_marked_done:
-            raise ValidationError("Contractor has not marked done yet.")
-
-        ad.status = Ad.Status.DONE
-        ad.save(update_fields=["status"])
+        with transition_errors():
+            lifecycle.confirm_done(pk, request.user)
         return Response({"detail": "Ad confirmed done."}, status=200)
 
     # -------------------------
@@ -255,23 +285,9 @@ class AdViewSet(viewsets.ModelViewSet):
     # -------------------------
     @action(detail=True, methods=["post"], url_path="cancel", permission_classes=[IsAuthenticated])
     def cancel(self, request, pk=None):
-        ad = self.get_object()
-        user = request.user
-
-        if ad.status == Ad.Status.DONE:
-            raise ValidationError("Cannot cancel a DONE ad.")
-
-        if user.role in (User.Role.SUPPORT, User.Role.ADMIN):
-            ad.status = Ad.Status.CANCELED
-            ad.save(update_fields=["status"])
-            return Response({"detail": "Ad canceled."}, status=200)
-
-        if user.role == User.Role.CUSTOMER and ad.creator_id == user.id:
-            ad.status = Ad.Status.CANCELED
-            ad.save(update_fields=["status"])
-            return Response({"detail": "Ad canceled."}, status=200)
-
-        raise PermissionDenied("You cannot cancel this ad.")
+        with transition_errors():
+            lifecycle.cancel(pk, request.user)
+        return Response({"detail": "Ad canceled."}, status=200)
 
     # -------------------------
     # /api/ads/{id}/review/
@@ -302,13 +318,15 @@ class AdViewSet(viewsets.ModelViewSet):
         serializer = ReviewSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        review = Review.objects.create(
-            ad=ad,
-            contractor_id=ad.assigned_contractor_id,
-            author=user,
-            text=serializer.validated_data.get("text", ""),
-            rating=serializer.validated_data["rating"],
-        )
+        with transaction.atomic():
+            review = Review.objects.create(
+                ad=ad,
+                contractor_id=ad.assigned_contractor_id,
+                author=user,
+                text=serializer.validated_data.get("text", ""),
+                rating=serializer.validated_data["rating"],
+            )
+            record_review(review.contractor_id, review.rating)
         return Response(ReviewSerializer(review).data, status=201)
 
     # -------------------------
@@ -324,15 +342,15 @@ class AdViewSet(viewsets.ModelViewSet):
 
         if user.role in (User.Role.SUPPORT, User.Role.ADMIN):
             qs = Review.objects.filter(ad=ad).order_by("-created_at")
-            return Response(ReviewSerializer(qs, many=True).data)
+            return Response(lean(ReviewSerializer).serialize(qs))
 
         if user.role == User.Role.CUSTOMER and ad.creator_id == user.id:
             qs = Review.objects.filter(ad=ad).order_by("-created_at")
-            return Response(ReviewSerializer(qs, many=True).data)
+            return Response(lean(ReviewSerializer).serialize(qs))
 
         if user.role == User.Role.CONTRACTOR and ad.assigned_contractor_id == user.id:
             qs = Review.objects.filter(ad=ad).order_by("-created_at")
-            return Response(ReviewSerializer(qs, many=True).data)
+            return Response(lean(ReviewSerializer).serialize(qs))
 
         raise PermissionDenied("You cannot view reviews for this ad.")
 
@@ -356,5 +374,92 @@ class WorkRequestViewSet(viewsets.ViewSet):
             raise ValidationError("This request cannot be canceled now.")
 
         wr.status = WorkRequest.Status.CANCELED
-        wr.save(update_fields=["status"])
+        wr.save(update_fields=["status", "updated_at"])
         return Response({"detail": "Cancelled"}, status=200)
+
+    # POST /api/requests/bulk/
+    # {"items": [{"ad_id": 1, "message": "..."}, ...]} -> per-item results.
+    # Same rules as POST /api/ads/{id}/requests/, in a fixed number of statements:
+    # one SELECT (visibility + OPEN + existing request), one INSERT, one UPDATE, one SELECT.
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        user = request.user
+        if user.role != User.Role.CONTRACTOR:
+            raise PermissionDenied("Only contractors can request an ad.")
+
+        s = BulkWorkRequestSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        items = s.validated_data["items"]
+
+        messages = {}
+        results = []
+        for item in items:
+            ad_id = item["ad_id"]
+            if ad_id in messages:
+                results.append({"ad_id": ad_id, "result": "duplicate"})
+                continue
+            messages[ad_id] = item["message"]
+            results.append({"ad_id": ad_id, "result": None})
+
+        existing = WorkRequest.objects.filter(ad=OuterRef("pk"), contractor=user).values("status")[:1]
+        ads = {
+            ad_id: (status, request_status)
+            for ad_id, status, request_status in lifecycle.visible_ads(user).filter(
+                id__in=messages,
+            ).annotate(request_status=Subquery(existing)).values_list("id", "status", "request_status")
+        }
+
+        to_create, to_repend = [], []
+        for r in results:
+            if r["result"] is not None:
+                continue
+            ad_id = r["ad_id"]
+            if ad_id not in ads:
+                r["result"] = "not_found"
+                continue
+            status, request_status = ads[ad_id]
+            if status != Ad.Status.OPEN:
+                r["result"] = "not_open"
+            elif request_status is None:
+                r["result"] = "created"
+                to_create.append(ad_id)
+            elif request_status in (WorkRequest.Status.REJECTED, WorkRequest.Status.CANCELED):
+                r["result"] = "re_pending"
+                to_repend.append(ad_id)
+            else:
+                r["result"] = "exists"
+
+        with transaction.atomic():
+            if to_create:
+                WorkRequest.objects.bulk_create(
+                    [
+                        WorkRequest(ad_id=ad_id, contractor=user, message=messages[ad_id],
+                                    status=WorkRequest.Status.PENDING)
+                        for ad_id in to_create
+                    ],
+                    ignore_conflicts=True,
+                )
+            if to_repend:
+                WorkRequest.objects.filter(
+                    contractor=user,
+                    ad_id__in=to_repend,
+                    status__in=(WorkRequest.Status.REJECTED, WorkRequest.Status.CANCELED),
+                ).update(
+                    status=WorkRequest.Status.PENDING,
+                    message=Case(
+                        *[When(ad_id=ad_id, then=Value(messages[ad_id])) for ad_id in to_repend],
+                        default=F("message"),
+                        output_field=TextField(),
+                    ),
+                    updated_at=timezone.now(),
+                )
+
+        ok = [r["ad_id"] for r in results if r["result"] in ("created", "re_pending", "exists")]
+        saved = {}
+        if ok:
+            saved = {wr.ad_id: wr for wr in WorkRequest.objects.filter(contractor=user, ad_id__in=ok)}
+        for r in results:
+            wr = saved.get(r["ad_id"]) if r["result"] in ("created", "re_pending", "exists") else None
+            r["request"] = WorkRequestSerializer(wr).data if wr else None
+
+        return Response({"results": results}, status=200)
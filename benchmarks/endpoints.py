@@ -0,0 +1,330 @@
+# benchmarks/endpoints.py
+"""
+The request `manage.py bench` sends to each (route, method) of config/urls.py.
+
+A Case is one request: who sends it, to which path, with which body, and
+the status it must answer with. Paths and bodies are filled in from the
+seeded world (see seed()) and, for requests that change state, from a
+`fresh` hook that builds a new target before every request (an OPEN ad
+to assign, a ticket to delete, ...). Fresh targets are made outside the
+timed section.
+
+coverage() lists the routes that have no case, so a new endpoint without a
+benchmark shows up in the report instead of being skipped silently.
+"""
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.urls import URLResolver, get_resolver, resolve
+from django.utils import timezone
+
+from accounts.models import ContractorStats, User
+from ads import geo
+from ads.models import Ad, WorkRequest
+from reviews.models import Review
+from tickets.models import Ticket
+
+PASSWORD = "bench-password"
+
+# routes that can't be timed request by request
+SKIPPED = {
+    "admin/": "Django admin, not part of the API",
+    "api/events/": "server-sent events stream until the client disconnects (ASGI only)",
+}
+
+
+class Case:
+    def __init__(self, name, method, path, role="customer", body=None, fresh=None, status=200, slow=False):
+        self.name = name
+        self.method = method
+        self.path = path          # format string over the world and fresh() params
+        self.role = role          # None: anonymous
+        self.body = body          # params -> dict
+        self.fresh = fresh        # (world, i) -> params, untimed
+        self.status = status
+        self.slow = slow          # password hashing: run --slow-requests times
+
+    def request(self, world, i):
+        """(path, body) for the i-th request."""
+        params = dict(world.params)
+        if self.fresh is not None:
+            params.update(self.fresh(world, i))
+        return self.path.format(**params), (self.body(params) if self.body else None)
+
+
+class World:
+    """The seeded users and rows the cases point at."""
+
+    def __init__(self, users, params):
+        self.users = users        # role -> User
+        self.params = params      # path/body placeholders
+        self.slot = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=365)
+
+    def slot_at(self, i):
+        # one job a day from a year out, so fresh assignments never overlap
+        return self.slot + timedelta(days=i)
+
+    def ad(self, i, **fields):
+        customer, contractor = self.users["customer"], self.users["contractor"]
+        defaults = dict(title=f"bench fresh #{i}", description="d", category="plumbing", creator=customer)
+        if fields.get("status", Ad.Status.OPEN) != Ad.Status.OPEN:
+            defaults.update(assigned_contractor=contractor, scheduled_at=self.slot_at(10_000 + i), location="Tehran")
+        return Ad.objects.create(**{**defaults, **fields})
+
+
+# -------------------------
+# fresh targets
+# -------------------------
+def open_ad(world, i):
+    return {"target": world.ad(i).id}
+
+
+def requested_ad(world, i):
+    ad = world.ad(i)
+    WorkRequest.objects.create(ad=ad, contractor=world.users["contractor"], message="Available.")
+    return {"target": ad.id, "when": world.slot_at(i).isoformat()}
+
+
+def assigned_ad(world, i):
+    return {"target": world.ad(i, status=Ad.Status.ASSIGNED).id}
+
+
+def marked_done_ad(world, i):
+    return {"target": world.ad(i, status=Ad.Status.ASSIGNED, contractor_marked_done=True).id}
+
+
+def done_ad(world, i):
+    return {"target": world.ad(i, status=Ad.Status.DONE, contractor_marked_done=True).id}
+
+
+def open_ads(world, i):
+    return {"targets": [world.ad(i * 10 + k).id for k in range(10)]}
+
+
+def pending_request(world, i):
+    request = WorkRequest.objects.create(ad=world.ad(i), contractor=world.users["contractor"], message="Available.")
+    return {"target": request.id}
+
+
+def ticket(world, i):
+    return {"target": Ticket.objects.create(creator=world.users["customer"], title=f"t{i}", message="m").id}
+
+
+def user(world, i):
+    target = User.objects.create(username=f"bench_roles_{i}", phone=f"br-{i}", role=User.Role.CUSTOMER)
+    return {"target": target.id}
+
+
+def next_slot(world, i):
+    return {"when": world.slot_at(5_000 + i).isoformat()}
+
+
+def new_account(world, i):
+    return {"n": i}
+
+
+AD_BODY = {"title": "Fix the kitchen tap", "description": "Leaking since last week.", "category": "plumbing"}
+
+CASES = [
+    # ads
+    Case("ads list", "GET", "/api/ads/"),
+    Case("ads list contractor", "GET", "/api/ads/", role="contractor"),
+    Case("ads list legacy", "GET", "/api/ads/?legacy=1"),
+    Case("ads create", "POST", "/api/ads/", body=lambda p: AD_BODY, status=201),
+    Case("ads search", "GET", "/api/ads/search/?q=kitchen"),
+    Case("ads nearby", "GET", "/api/ads/nearby/?lat=35.7&lng=51.4&radius_km=20"),
+    Case("ad detail", "GET", "/api/ads/{ad}/"),
+    Case("ad put", "PUT", "/api/ads/{ad}/", body=lambda p: AD_BODY),
+    Case("ad patch", "PATCH", "/api/ads/{ad}/", body=lambda p: {"title": "Fix the bathroom tap"}),
+    Case("ad delete", "DELETE", "/api/ads/{target}/", fresh=open_ad, status=204),
+    Case("ad requests", "GET", "/api/ads/{ad}/requests/"),
+    Case("ad request", "POST", "/api/ads/{target}/requests/", role="contractor", fresh=open_ad,
+         body=lambda p: {"message": "Available tomorrow."}, status=201),
+    Case("ad assign", "POST", "/api/ads/{target}/assign/", fresh=requested_ad,
+         body=lambda p: {"contractor_id": p["contractor"], "scheduled_at": p["when"], "location": "Tehran"}),
+    Case("ad schedule", "POST", "/api/ads/{assigned}/schedule/", role="contractor", fresh=next_slot,
+         body=lambda p: {"scheduled_at": p["when"], "location": "Tehran"}),
+    Case("ad contractor-done", "POST", "/api/ads/{target}/contractor-done/", role="contractor", fresh=assigned_ad),
+    Case("ad confirm-done", "POST", "/api/ads/{target}/confirm-done/", fresh=marked_done_ad),
+    Case("ad cancel", "POST", "/api/ads/{target}/cancel/", fresh=open_ad),
+    Case("ad review", "POST", "/api/ads/{target}/review/", fresh=done_ad,
+         body=lambda p: {"rating": 5, "text": "Quick and tidy."}, status=201),
+    Case("ad reviews", "GET", "/api/ads/{done}/reviews/"),
+    Case("ads async list", "GET", "/api/ads/async/"),
+    Case("ad async detail", "GET", "/api/ads/{ad}/async/"),
+    # work requests
+    Case("requests bulk", "POST", "/api/requests/bulk/", role="contractor", fresh=open_ads,
+         body=lambda p: {"items": [{"ad_id": ad_id, "message": "Available."} for ad_id in p["targets"]]}),
+    Case("request cancel", "POST", "/api/requests/{target}/cancel/", role="contractor", fresh=pending_request),
+    # tickets
+    Case("tickets list", "GET", "/api/tickets/"),
+    Case("tickets list support", "GET", "/api/tickets/", role="support"),
+    Case("tickets create", "POST", "/api/tickets/", body=lambda p: {"title": "Help", "message": "Where is my contractor?"},
+         status=201),
+    Case("ticket detail", "GET", "/api/tickets/{ticket}/"),
+    Case("ticket put", "PUT", "/api/tickets/{ticket}/", body=lambda p: {"title": "Help", "message": "Still waiting."}),
+    Case("ticket patch", "PATCH", "/api/tickets/{ticket}/", body=lambda p: {"message": "Still waiting."}),
+    Case("ticket delete", "DELETE", "/api/tickets/{target}/", role="support", fresh=ticket, status=204),
+    Case("ticket reply", "POST", "/api/tickets/{target}/reply/", role="support", fresh=ticket,
+         body=lambda p: {"support_reply": "On it."}),
+    Case("tickets async list", "GET", "/api/tickets/async/"),
+    # accounts
+    Case("register", "POST", "/api/auth/register/", role=None, fresh=new_account, slow=True, status=201,
+         body=lambda p: {"username": f"bench_new_{p['n']}", "phone": f"bn-{p['n']}", "password": PASSWORD}),
+    Case("login", "POST", "/api/auth/login/", role=None, slow=True,
+         body=lambda p: {"identifier": p["username"], "password": PASSWORD}),
+    Case("register async", "POST", "/api/auth/register/async/", role=None, fresh=new_account, slow=True, status=201,
+         body=lambda p: {"username": f"bench_new_async_{p['n']}", "phone": f"bna-{p['n']}", "password": PASSWORD}),
+    Case("login async", "POST", "/api/auth/login/async/", role=None, slow=True,
+         body=lambda p: {"identifier": p["username"], "password": PASSWORD}),
+    Case("me profile", "GET", "/api/me/profile/"),
+    Case("me schedule", "GET", "/api/me/schedule/?from={today}&to={month}", role="contractor"),
+    Case("me schedule.ics", "GET", "/api/me/schedule.ics", role="contractor"),
+    Case("contractors", "GET", "/api/contractors/"),
+    Case("contractors async", "GET", "/api/contractors/async/"),
+    Case("contractor profile", "GET", "/api/contractors/{contractor}/profile/"),
+    Case("contractor profile async", "GET", "/api/contractors/{contractor}/profile/async/"),
+    Case("contractor reviews", "GET", "/api/contractors/{contractor}/reviews/"),
+    Case("contractor reviews async", "GET", "/api/contractors/{contractor}/reviews/async/"),
+    Case("user roles", "POST", "/api/users/{target}/roles/", role="admin", fresh=user,
+         body=lambda p: {"roles": ["SUPPORT"]}),
+    # misc
+    Case("api root", "GET", "/api/"),
+    Case("metrics", "GET", "/api/metrics", role="admin"),
+    Case("schema", "GET", "/api/schema/"),
+    Case("docs", "GET", "/api/docs/"),
+]
+
+
+# -------------------------
+# seeding
+# -------------------------
+def seed(n_users, n_ads, n_tickets, rng):
+    """
+    A small marketplace: customers and contractors, ads in every state
+    (most OPEN), reviews on the DONE ones, and tickets. Returns the World.
+    """
+    password = make_password(PASSWORD)  # hashed once, shared by every seeded user
+    roles = {"customer": User.Role.CUSTOMER, "contractor": User.Role.CONTRACTOR,
+             "support": User.Role.SUPPORT, "admin": User.Role.ADMIN}
+    users = {
+        name: User.objects.create(username=f"bench_{name}", phone=f"bench-{name}", role=role, password=password)
+        for name, role in roles.items()
+    }
+    User.objects.bulk_create(
+        [
+            User(username=f"bench_user{i}", phone=f"bench-u{i}", password=password,
+                 role=User.Role.CONTRACTOR if i % 4 == 0 else User.Role.CUSTOMER)
+            for i in range(n_users)
+        ]
+    )
+    customers = [users["customer"], *User.objects.filter(username__startswith="bench_user", role=User.Role.CUSTOMER)]
+    contractors = [users["contractor"], *User.objects.filter(username__startswith="bench_user", role=User.Role.CONTRACTOR)]
+    ContractorStats.objects.bulk_create([ContractorStats(contractor=c) for c in contractors], ignore_conflicts=True)
+
+    world = World(users, {})
+    ads = []
+    for i in range(n_ads):
+        status = rng.choices([Ad.Status.OPEN, Ad.Status.ASSIGNED, Ad.Status.DONE], weights=(7, 1, 2))[0]
+        lat, lng = 35.6 + rng.random() / 5, 51.3 + rng.random() / 5
+        ad = Ad(
+            title=f"Fix the kitchen tap #{i}", description="Leaking since last week. " * 4,
+            category=rng.choice(["plumbing", "electrical", "painting", "cleaning"]),
+            creator=rng.choice(customers), status=status, latitude=lat, longitude=lng, geohash=geo.encode(lat, lng),
+        )
+        if status != Ad.Status.OPEN:
+            ad.assigned_contractor = rng.choice(contractors)
+            ad.scheduled_at = world.slot_at(-200_000 + i)  # in the past, clear of the fresh slots
+            ad.scheduled_end = ad.scheduled_at + ad.estimated_duration
+            ad.location = "Tehran"
+            ad.contractor_marked_done = status == Ad.Status.DONE
+        ads.append(ad)
+    Ad.objects.bulk_create(ads, batch_size=1000)
+
+    done = Ad.objects.filter(title__startswith="Fix the kitchen tap #", status=Ad.Status.DONE)
+    Review.objects.bulk_create(
+        [Review(ad=ad, contractor_id=ad.assigned_contractor_id, author_id=ad.creator_id,
+                text="Quick and tidy work.", rating=rng.randint(1, 5)) for ad in done],
+        batch_size=1000,
+    )
+    for stats in ContractorStats.objects.filter(contractor__in=contractors):
+        ratings = list(Review.objects.filter(contractor=stats.contractor_id).values_list("rating", flat=True))
+        stats.review_count, stats.rating_sum = len(ratings), sum(ratings)
+        stats.avg_rating = stats.rating_sum / stats.review_count if ratings else 0.0
+        stats.completed_ads_count = stats.review_count
+        stats.save()
+
+    Ticket.objects.bulk_create(
+        [Ticket(creator=rng.choice(customers), title=f"t{i}", message="m" * 200) for i in range(n_tickets)],
+        batch_size=1000,
+    )
+
+    # the named users' own rows, which the cases point at
+    customer, contractor = users["customer"], users["contractor"]
+    ad = world.ad(0, title="Fix the kitchen tap (bench)")
+    for c in contractors[:20]:
+        WorkRequest.objects.create(ad=ad, contractor=c, message="Available tomorrow.")
+    assigned = world.ad(1, status=Ad.Status.ASSIGNED)
+    done = world.ad(2, status=Ad.Status.DONE, contractor_marked_done=True)
+    Review.objects.create(ad=done, contractor=contractor, author=customer, text="Great.", rating=5)
+    Ad.objects.filter(id__in=[ad.id, assigned.id, done.id]).update(title="Fix the kitchen tap (bench)")
+    today = timezone.localdate()
+    world.params.update(
+        ad=ad.id, assigned=assigned.id, done=done.id, contractor=contractor.id, username=customer.username,
+        ticket=Ticket.objects.create(creator=customer, title="bench", message="m").id,
+        today=today.isoformat(), month=(today + timedelta(days=30)).isoformat(),
+    )
+    return world
+
+
+# -------------------------
+# route coverage
+# -------------------------
+class _AnyId(dict):
+    def __missing__(self, key):
+        return 1
+
+
+def _join(prefix, pattern):
+    # the same join ResolverMatch.route uses
+    pattern = str(pattern)
+    return prefix + (pattern[1:] if pattern.startswith("^") else pattern)
+
+
+def routes(patterns=None, prefix=""):
+    """(route, methods) for every URL pattern, format-suffix variants left out."""
+    for entry in get_resolver().url_patterns if patterns is None else patterns:
+        route = _join(prefix, entry.pattern)
+        if isinstance(entry, URLResolver):
+            if route in SKIPPED:
+                continue
+            yield from routes(entry.url_patterns, route)
+            continue
+        if "format" in entry.pattern.regex.groupindex or route in SKIPPED:
+            continue
+        actions = getattr(entry.callback, "actions", None)
+        if actions is None:
+            view = getattr(entry.callback, "view_class", None) or getattr(entry.callback, "cls", None)
+            actions = [m for m in view.http_method_names if hasattr(view, m)]
+        # HEAD and OPTIONS are the framework's, not the endpoint's
+        yield route, {m.upper() for m in actions if m not in ("head", "options")}
+
+
+def coverage(cases, world):
+    """Routes and methods of config/urls.py that no case requests: {route: [methods]}."""
+    covered = set()
+    for case in cases:
+        # fresh targets don't exist yet; any id resolves to the same route
+        path = case.path.format_map(_AnyId(world.params))
+        covered.add((resolve(path.split("?")[0]).route, case.method))
+    missing = {}
+    for route, methods in routes():
+        for method in sorted(methods):
+            if (route, method) not in covered:
+                missing.setdefault(route, []).append(method)
+    return missing
+
+
+def sample(cases, only=None):
+    """Cases whose name contains any of `only` (all of them when empty)."""
+    return [case for case in cases if not only or any(word in case.name for word in only)]
@@ -0,0 +1,219 @@
+import itertools
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+from drf_spectacular.drainage import GENERATOR_STATS
+
+from accounts.cache import profile_cache
+from accounts.tokens import RoleRefreshToken
+from ads.feed import ad_feed
+from benchmarks.endpoints import CASES, SKIPPED, coverage, sample, seed
+from benchmarks.utils import Rollback, percentile
+from config.metrics import metrics_settings, registry
+
+
+# compare mode ignores allocation growth below this, whatever the threshold
+MIN_ALLOC_DELTA_KIB = 8
+
+WRITE_NOTE = "write timings exclude COMMIT (everything is rolled back); on_commit hooks are included"
+
+
+def committed():
+    """
+    Run the on_commit hooks registered inside the block when it exits, as a
+    COMMIT would (SSE publishes, feed bumps, profile invalidations): under the
+    outer rolled-back transaction they would never fire.
+    """
+    return TestCase.captureOnCommitCallbacks(execute=True)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a dataset, send every route of config/urls.py its benchmark request "
+        "(benchmarks/endpoints.py) through the test client, and report p50/p95/p99 "
+        "latency, SQL queries per request and peak Python allocation per request. "
+        "--output writes the results as JSON; --compare checks them against such a "
+        "file and fails on regressions. Everything runs in one transaction that is "
+        "rolled back, each request in its own savepoint with its on_commit hooks run; "
+        "write timings therefore exclude COMMIT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--ads", type=int, default=2000)
+        parser.add_argument("--tickets", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--requests", type=int, default=50, help="timed requests per endpoint")
+        parser.add_argument("--slow-requests", type=int, default=5, help="timed requests for password-hashing endpoints")
+        parser.add_argument("--warmup", type=int, default=3, help="untimed requests per endpoint first")
+        parser.add_argument("--memory-requests", type=int, default=3, help="requests traced with tracemalloc")
+        parser.add_argument("--only", nargs="*", default=[], help="endpoints whose name contains one of these words")
+        parser.add_argument("--output", help="write the results to this JSON file")
+        parser.add_argument("--compare", help="a previous --output file to check against")
+        parser.add_argument("--threshold", type=float, default=20.0, help="allowed slowdown / growth, in percent")
+        parser.add_argument("--min-delta-ms", type=float, default=0.5, help="latency changes below this never count")
+
+    def handle(self, *args, **opts):
+        baseline = self.load(opts["compare"]) if opts["compare"] else None
+        cases = sample(CASES, opts["only"])
+        if not cases:
+            raise CommandError("--only matched no endpoint.")
+        try:
+            # GENERATOR_STATS: /api/schema/'s warnings belong to `manage.py spectacular --validate`
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=["testserver"]), GENERATOR_STATS.silence():
+                with committed():
+                    world = seed(opts["users"], opts["ads"], opts["tickets"], random.Random(opts["seed"]))
+                uncovered = coverage(CASES, world)
+                results = {case.name: self.run(case, world, opts) for case in cases}
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            ad_feed.clear()
+            profile_cache.clear()
+            registry.clear()
+
+        report = {"meta": self.meta(opts), "results": results, "uncovered": uncovered, "skipped": SKIPPED}
+        self.print_results(results, uncovered)
+        if opts["output"]:
+            with open(opts["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"wrote {opts['output']}")
+        if baseline is not None:
+            regressions = self.compare(baseline, report, opts)
+            if regressions:
+                raise CommandError(f"{regressions} regression(s) against {opts['compare']}.")
+            self.stdout.write(self.style.SUCCESS(f"no regressions against {opts['compare']}"))
+
+    @staticmethod
+    def load(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"can't read baseline {path}: {e}")
+
+    @staticmethod
+    def meta(opts):
+        return {
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.display_name,
+            "dataset": {key: opts[key] for key in ("users", "ads", "tickets", "seed")},
+            "requests": opts["requests"],
+            "slow_requests": opts["slow_requests"],
+            "writes": WRITE_NOTE,
+        }
+
+    # -------------------------
+    # running one endpoint
+    # -------------------------
+    def run(self, case, world, opts):
+        client = Client()
+        if case.role is not None:
+            token = RoleRefreshToken.for_user(world.users[case.role]).access_token
+            client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        counter = itertools.count()
+
+        def send():
+            path, body = case.request(world, next(counter))  # fresh targets: untimed
+            started = time.perf_counter()
+            # one savepoint per request: its own transaction, short of the COMMIT itself
+            with committed(), transaction.atomic():
+                response = client.generic(
+                    case.method, path, "" if body is None else json.dumps(body), content_type="application/json",
+                )
+            elapsed = time.perf_counter() - started
+            if response.status_code != case.status:
+                raise CommandError(
+                    f"{case.name}: {case.method} {path} answered {response.status_code}, expected {case.status}: "
+                    f"{response.content[:300]!r}"
+                )
+            return elapsed
+
+        for _ in range(opts["warmup"]):
+            send()
+
+        n = opts["slow_requests"] if case.slow else opts["requests"]
+        registry.clear()
+        timings = sorted(send() * 1000 for _ in range(n))
+        counted = metrics_settings()["ENABLED"]
+        queries = sum(entry.queries for entry in registry.snapshot().values()) / n if counted else None
+
+        tracemalloc.start()
+        try:
+            peaks = []
+            for _ in range(opts["memory_requests"]):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                send()
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "method": case.method,
+            "path": case.path,
+            "requests": n,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "queries": None if queries is None else round(queries, 2),
+            "alloc_kib": round(statistics.median(peaks) / 1024, 1) if peaks else None,
+        }
+
+    # -------------------------
+    # reporting
+    # -------------------------
+    def print_results(self, results, uncovered):
+        self.stdout.write(
+            f"{'endpoint':>26} {'method':>6} {'p50 ms':>8} {'p95':>8} {'p99':>8} {'queries':>7} {'alloc KiB':>9}"
+        )
+        for name, r in results.items():
+            queries = "-" if r["queries"] is None else f"{r['queries']:g}"
+            alloc = "-" if r["alloc_kib"] is None else f"{r['alloc_kib']:.0f}"
+            self.stdout.write(
+                f"{name:>26} {r['method']:>6} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {queries:>7} {alloc:>9}"
+            )
+        if any(r["method"] != "GET" for r in results.values()):
+            self.stdout.write(WRITE_NOTE)
+        for route, methods in uncovered.items():
+            self.stdout.write(self.style.WARNING(f"no benchmark for {' '.join(methods)} {route}"))
+
+    def compare(self, baseline, report, opts):
+        """Print what got worse than the baseline; returns the number of regressions."""
+        if baseline.get("meta", {}).get("dataset") != report["meta"]["dataset"]:
+            self.stdout.write(self.style.WARNING("the baseline was seeded with a different dataset"))
+        allowed = 1 + opts["threshold"] / 100
+        regressions = 0
+        for name, new in report["results"].items():
+            old = baseline.get("results", {}).get(name)
+            if old is None:
+                continue
+            problems = []
+            for key in ("p50_ms", "p95_ms"):
+                if new[key] > old[key] * allowed and new[key] - old[key] >= opts["min_delta_ms"]:
+                    problems.append(f"{key} {old[key]:.2f} -> {new[key]:.2f}")
+            if None not in (old.get("queries"), new["queries"]) and new["queries"] > old["queries"]:
+                problems.append(f"queries {old['queries']:g} -> {new['queries']:g}")
+            if (
+                None not in (old.get("alloc_kib"), new["alloc_kib"])
+                and new["alloc_kib"] > old["alloc_kib"] * allowed
+                and new["alloc_kib"] - old["alloc_kib"] >= MIN_ALLOC_DELTA_KIB
+            ):
+                problems.append(f"alloc {old['alloc_kib']:.0f} -> {new['alloc_kib']:.0f} KiB")
+            if problems:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(f"REGRESSION {name}: {', '.join(problems)}"))
+        return regressions
@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.db.models import Count, Q
+
+from accounts.models import User
+from ads import lifecycle
+from ads.models import Ad, WorkRequest
+
+START = datetime(2030, 1, 1, 10, 0, tzinfo=dt_timezone.utc)
+
+
+def legacy_assign(ad_id, actor, contractor_id, scheduled_at, location):
+    # AdViewSet.assign before it moved into ads.lifecycle: read, check, write, no transaction
+    ad = Ad.objects.get(id=ad_id)
+    if ad.creator_id != actor.id:
+        raise lifecycle.TransitionForbidden("Only owner/support/admin can assign.")
+    if ad.status != Ad.Status.OPEN:
+        raise lifecycle.IllegalTransition("Only OPEN ads can be assigned.")
+    contractor = User.objects.get(id=contractor_id, role=User.Role.CONTRACTOR)
+    chosen_wr = WorkRequest.objects.get(ad=ad, contractor=contractor)
+    WorkRequest.objects.filter(ad=ad).exclude(id=chosen_wr.id).filter(
+        status=WorkRequest.Status.PENDING
+    ).update(status=WorkRequest.Status.REJECTED)
+    chosen_wr.status = WorkRequest.Status.ACCEPTED
+    chosen_wr.save(update_fields=["status"])
+    ad.assigned_contractor = contractor
+    ad.scheduled_at = scheduled_at
+    ad.location = location
+    ad.status = Ad.Status.ASSIGNED
+    ad.contractor_marked_done = False
+    ad.save(update_fields=["assigned_contractor", "scheduled_at", "location", "status", "contractor_marked_done"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency harness for ad assignment: T threads race R assigns per ad "
+        "(random requesting contractor) against a file-backed SQLite database and "
+        "report throughput, lost races, lock errors and invariant violations. "
+        "Seeded rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ads", type=int, default=200)
+        parser.add_argument("--contractors", type=int, default=8, help="requests per ad")
+        parser.add_argument("--races", type=int, default=4, help="concurrent assigns per ad")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--legacy", action="store_true", help="also run the pre-lifecycle implementation")
+
+    def handle(self, *args, **opts):
+        db = connection.settings_dict
+        if connection.vendor != "sqlite" or db["NAME"] in (":memory:", "") or "mode=memory" in str(db["NAME"]):
+            raise CommandError("bench_assign needs a file-backed SQLite database.")
+
+        runs = [("conditional update", lifecycle.assign)]
+        if opts["legacy"]:
+            runs.insert(0, ("legacy read-check-write", legacy_assign))
+
+        for label, assign in runs:
+            tag = uuid.uuid4().hex[:8]
+            customer, contractors, ad_ids = self.seed(tag, opts["ads"], opts["contractors"])
+            try:
+                self.race(label, assign, customer, contractors, ad_ids, opts)
+            finally:
+                User.objects.filter(username__startswith=f"bench_assign_{tag}_").delete()
+
+    def seed(self, tag, n_ads, n_contractors):
+        customer = User.objects.create(
+            username=f"bench_assign_{tag}_customer", phone=f"ba{tag}-0", role=User.Role.CUSTOMER,
+        )
+        User.objects.bulk_create(
+            [
+                User(username=f"bench_assign_{tag}_contractor{i}", phone=f"ba{tag}-{i + 1}", role=User.Role.CONTRACTOR)
+                for i in range(n_contractors)
+            ]
+        )
+        contractors = list(
+            User.objects.filter(username__startswith=f"bench_assign_{tag}_contractor").values_list("id", flat=True)
+        )
+        Ad.objects.bulk_create(
+            [Ad(title=f"bench {i}", description="d", category="c", creator=customer) for i in range(n_ads)]
+        )
+        ad_ids = list(Ad.objects.filter(creator=customer).values_list("id", flat=True))
+        WorkRequest.objects.bulk_create(
+            [WorkRequest(ad_id=a, contractor_id=c) for a in ad_ids for c in contractors]
+        )
+        return customer, contractors, ad_ids
+
+    def race(self, label, assign, customer, contractors, ad_ids, opts):
+        rng = random.Random(opts["seed"])
+        # one non-overlapping slot per ad, so only the per-ad race decides the outcome
+        tasks = [
+            (a, rng.choice(contractors), START + timedelta(hours=i))
+            for i, a in enumerate(ad_ids)
+            for _ in range(opts["races"])
+        ]
+        rng.shuffle(tasks)
+
+        outcomes = Counter()
+        winners = Counter()
+        lock = threading.Lock()
+        cursor = iter(tasks)
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        task = next(cursor, None)
+                    if task is None:
+                        return
+                    ad_id, contractor_id, slot = task
+                    try:
+                        assign(ad_id, customer, contractor_id, slot, "bench")
+                        result = "ok"
+                    except lifecycle.TransitionError:
+                        result = "lost"
+                    except OperationalError:
+                        result = "locked"
+                    except Exception:
+                        result = "error"
+                    with lock:
+                        outcomes[result] += 1
+                        if result == "ok":
+                            winners[ad_id] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(opts["threads"])]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        double_assigned = sum(1 for n in winners.values() if n > 1)
+        bad_requests = (
+            Ad.objects.filter(id__in=ad_ids, status=Ad.Status.ASSIGNED)
+            .annotate(
+                accepted=Count("requests", filter=Q(requests__status=WorkRequest.Status.ACCEPTED)),
+                pending=Count("requests", filter=Q(requests__status=WorkRequest.Status.PENDING)),
+            )
+            .exclude(accepted=1, pending=0)
+            .count()
+        )
+
+        attempts = len(tasks)
+        self.stdout.write(
+            f"{label:>24}: {attempts / elapsed:8.0f} assigns/s  "
+            f"ok={outcomes['ok']} lost={outcomes['lost']} locked={outcomes['locked']} error={outcomes['error']}  "
+            f"conflict rate={outcomes['lost'] / attempts:.1%}  "
+            f"double-assigned ads={double_assigned}  inconsistent request sets={bad_requests}"
+        )
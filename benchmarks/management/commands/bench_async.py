@@ -0,0 +1,174 @@
+import asyncio
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from accounts.cache import profile_cache
+from accounts.models import ContractorStats, User
+from accounts.stats import record_review
+from accounts.tokens import RoleRefreshToken
+from ads.models import Ad
+from reviews.models import Review
+from tickets.models import Ticket
+
+# endpoint -> path template ({sync} is "" for the DRF view, "async/" for the native one)
+ENDPOINTS = {
+    "contractors": "/api/contractors/{sync}",
+    "profile": "/api/contractors/{contractor}/profile/{sync}",
+    "reviews": "/api/contractors/{contractor}/reviews/{sync}",
+    "ads": "/api/ads/{sync}",
+    "ad": "/api/ads/{ad}/{sync}",
+    "tickets": "/api/tickets/{sync}",
+}
+
+
+async def call(app, path, query, headers):
+    """One GET through the ASGI application; returns the status code."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": headers, "client": ("127.0.0.1", 50000), "server": ("localhost", 80),
+    }
+    body_sent = False
+    status = None
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # the client never disconnects; Django cancels this once the response is out
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def load(app, path, query, headers, concurrency, total):
+    """`concurrency` clients issue `total` requests back to back. Returns (seconds, statuses, peak threads)."""
+    remaining = total
+    statuses = Counter()
+    peak_threads = threading.active_count()
+
+    async def client():
+        nonlocal remaining, peak_threads
+        while remaining > 0:
+            remaining -= 1
+            statuses[await call(app, path, query, headers)] += 1
+            peak_threads = max(peak_threads, threading.active_count())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, statuses, peak_threads
+
+
+class Command(BaseCommand):
+    help = (
+        "Read endpoints under ASGI, in process: the DRF (sync) views against their "
+        "native async twins. Reports requests/s, peak threads, and Python memory "
+        "allocated per concurrent connection (tracemalloc). Runs with DEBUG off "
+        "against a file-backed SQLite database. Seeded rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", default="1,16,64", help="comma-separated connection counts")
+        parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint, mode and concurrency")
+        parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help=f"any of {', '.join(ENDPOINTS)}")
+        parser.add_argument("--ads", type=int, default=300)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        db = connection.settings_dict
+        if connection.vendor != "sqlite" or db["NAME"] in (":memory:", "") or "mode=memory" in str(db["NAME"]):
+            raise CommandError("bench_async needs a file-backed SQLite database.")
+        endpoints = [e.strip() for e in opts["endpoints"].split(",") if e.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        levels = [int(c) for c in opts["concurrency"].split(",")]
+
+        tag = uuid.uuid4().hex[:8]
+        ids = self.seed(tag, opts["ads"], random.Random(opts["seed"]))
+        try:
+            # DEBUG would log every query and skew both timings and memory
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=["localhost"]):
+                from config.asgi import application
+
+                self.run(application, ids, endpoints, levels, opts["requests"])
+        finally:
+            User.objects.filter(username__startswith=f"bench_async_{tag}_").delete()
+            profile_cache.clear()
+
+    def seed(self, tag, n_ads, rng):
+        customer = User.objects.create(
+            username=f"bench_async_{tag}_customer", phone=f"bx{tag}-0", role=User.Role.CUSTOMER,
+        )
+        User.objects.bulk_create(
+            [
+                User(username=f"bench_async_{tag}_contractor{i}", phone=f"bx{tag}-{i + 1}", role=User.Role.CONTRACTOR)
+                for i in range(20)
+            ]
+        )
+        contractors = list(User.objects.filter(username__startswith=f"bench_async_{tag}_contractor"))
+        Ad.objects.bulk_create(
+            [
+                Ad(title=f"bench {i}", description="d" * 200, category="c", creator=customer,
+                   status=Ad.Status.DONE if i < 40 else Ad.Status.OPEN,
+                   assigned_contractor=contractors[i % 20] if i < 40 else None)
+                for i in range(n_ads)
+            ]
+        )
+        done = Ad.objects.filter(creator=customer, status=Ad.Status.DONE)
+        reviews = [
+            Review(ad=ad, contractor_id=ad.assigned_contractor_id, author=customer, text="ok", rating=rng.randint(1, 5))
+            for ad in done
+        ]
+        Review.objects.bulk_create(reviews)
+        ContractorStats.objects.bulk_create([ContractorStats(contractor=c) for c in contractors], ignore_conflicts=True)
+        for review in reviews:
+            record_review(review.contractor_id, review.rating)
+        Ticket.objects.bulk_create([Ticket(creator=customer, title=f"t{i}", message="m") for i in range(60)])
+        return {
+            "customer": customer,
+            "contractor": contractors[0].id,
+            "ad": Ad.objects.filter(creator=customer).values_list("id", flat=True).first(),
+        }
+
+    def run(self, app, ids, endpoints, levels, total):
+        token = RoleRefreshToken.for_user(ids["customer"]).access_token
+        headers = [(b"host", b"localhost"), (b"authorization", f"Bearer {token}".encode())]
+
+        self.stdout.write(f"{'endpoint':>12} {'mode':>5} {'conns':>5} {'req/s':>9} {'threads':>7} {'KiB/conn':>9}  statuses")
+        for name in endpoints:
+            for concurrency in levels:
+                for mode, suffix in (("sync", ""), ("async", "async/")):
+                    path = ENDPOINTS[name].format(sync=suffix, contractor=ids["contractor"], ad=ids["ad"])
+                    # warm-up: token-version cache, profile cache, connections
+                    asyncio.run(load(app, path, "", headers, 1, 5))
+
+                    elapsed, statuses, threads = asyncio.run(load(app, path, "", headers, concurrency, total))
+
+                    # memory: a separate short pass, since tracemalloc slows everything down
+                    tracemalloc.start()
+                    baseline = tracemalloc.get_traced_memory()[0]
+                    asyncio.run(load(app, path, "", headers, concurrency, concurrency * 2))
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                    per_conn = (peak - baseline) / concurrency / 1024
+                    codes = " ".join(f"{code}x{n}" for code, n in sorted(statuses.items()))
+                    self.stdout.write(
+                        f"{name:>12} {mode:>5} {concurrency:>5} {total / elapsed:9.0f} {threads:>7} {per_conn:9.1f}  {codes}"
+                    )
@@ -0,0 +1,136 @@
+import io
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from accounts.cache import profile_cache
+from accounts.models import ContractorStats, User
+from accounts.stats import record_review
+from accounts.tokens import RoleRefreshToken
+from ads.feed import ad_feed
+from ads.models import Ad, WorkRequest
+from benchmarks.utils import Rollback, best_of
+from config import json_codec
+from config.json_codec import FastJSONParser, FastJSONRenderer
+from reviews.models import Review
+from tickets.models import Ticket
+
+
+# payload -> path, asked by the seeded customer
+PAYLOADS = {
+    "ads page=50": "/api/ads/?page_size=50",
+    "ads page=200": "/api/ads/?page_size=200",
+    "ads legacy": "/api/ads/?legacy=1",
+    "work requests": "/api/ads/{ad}/requests/",
+    "reviews page=200": "/api/contractors/{contractor}/reviews/?page_size=200",
+    "contractors": "/api/contractors/",
+    "profile": "/api/contractors/{contractor}/profile/",
+    "tickets": "/api/tickets/",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Render and parse the JSON of real endpoint responses with DRF's stdlib "
+        "JSONRenderer / JSONParser and with config.json_codec. Payloads come from "
+        "seeded data fetched through the test client. Everything runs in one "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ads", type=int, default=1000)
+        parser.add_argument("--reviews", type=int, default=400)
+        parser.add_argument("--number", type=int, default=200, help="calls per timing run")
+        parser.add_argument("--repeat", type=int, default=5, help="timing runs; the fastest is reported")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        if json_codec.orjson is None:
+            self.stdout.write("orjson is not installed: FastJSONRenderer falls back to the stdlib (expect ~1.0x).")
+        try:
+            with transaction.atomic():
+                ids = self.seed(opts, random.Random(opts["seed"]))
+                payloads = self.fetch(ids)
+                self.report(payloads, opts["repeat"], opts["number"])
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            ad_feed.clear()
+            profile_cache.clear()
+
+    def seed(self, opts, rng):
+        customer = User.objects.create(username="bench_json_customer", phone="bj-0", role=User.Role.CUSTOMER)
+        User.objects.bulk_create(
+            [User(username=f"bench_json_contractor{i}", phone=f"bj-{i + 1}", role=User.Role.CONTRACTOR) for i in range(50)]
+        )
+        contractors = list(User.objects.filter(username__startswith="bench_json_contractor"))
+        n_done = min(opts["reviews"], opts["ads"])
+        Ad.objects.bulk_create(
+            [
+                Ad(
+                    title=f"Fix the kitchen tap #{i} – تعمیر", description="Leaking since last week. " * 8,
+                    category=rng.choice(["plumbing", "electrical", "painting"]), creator=customer,
+                    status=Ad.Status.DONE if i < n_done else Ad.Status.OPEN,
+                    assigned_contractor=contractors[0] if i < n_done else None,
+                    latitude=35.7 + rng.random() / 10, longitude=51.4 + rng.random() / 10,
+                )
+                for i in range(opts["ads"])
+            ]
+        )
+        done = Ad.objects.filter(creator=customer, status=Ad.Status.DONE)
+        reviews = [
+            Review(ad=ad, contractor_id=ad.assigned_contractor_id, author=customer,
+                   text="Quick and tidy work, would hire again.", rating=rng.randint(1, 5))
+            for ad in done
+        ]
+        Review.objects.bulk_create(reviews)
+        ContractorStats.objects.bulk_create([ContractorStats(contractor=c) for c in contractors], ignore_conflicts=True)
+        for review in reviews:
+            record_review(review.contractor_id, review.rating)
+
+        ad = Ad.objects.filter(creator=customer, status=Ad.Status.OPEN).first()
+        if ad is None:
+            raise CommandError("--ads must be larger than --reviews.")
+        WorkRequest.objects.bulk_create(
+            [WorkRequest(ad=ad, contractor=c, message="Available tomorrow morning.") for c in contractors]
+        )
+        Ticket.objects.bulk_create([Ticket(creator=customer, title=f"t{i}", message="m" * 200) for i in range(100)])
+        return {"customer": customer, "contractor": contractors[0].id, "ad": ad.id}
+
+    def fetch(self, ids):
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(ids['customer']).access_token}")
+        payloads = {}
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for name, template in PAYLOADS.items():
+                r = client.get(template.format(**ids))
+                if r.status_code != 200:
+                    raise CommandError(f"{name}: HTTP {r.status_code}")
+                payloads[name] = r.data
+        return payloads
+
+    def report(self, payloads, repeat, number):
+        stdlib_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        stdlib_parser, fast_parser = JSONParser(), FastJSONParser()
+        self.stdout.write(
+            f"{'payload':>18} {'KiB':>7}  {'render stdlib':>13} {'fast':>8} {'x':>5}  {'parse stdlib':>12} {'fast':>8} {'x':>5}"
+        )
+        for name, data in payloads.items():
+            body = stdlib_renderer.render(data)
+            if fast_renderer.render(data) != body:
+                raise CommandError(f"{name}: FastJSONRenderer output differs from JSONRenderer")
+
+            render = [best_of(lambda r=r: r.render(data), repeat, number) for r in (stdlib_renderer, fast_renderer)]
+            parse = [
+                best_of(lambda p=p: p.parse(io.BytesIO(body)), repeat, number) for p in (stdlib_parser, fast_parser)
+            ]
+            self.stdout.write(
+                f"{name:>18} {len(body) / 1024:7.1f}  "
+                f"{render[0]:11.0f}us {render[1]:6.0f}us {render[0] / render[1]:5.1f}  "
+                f"{parse[0]:10.0f}us {parse[1]:6.0f}us {parse[0] / parse[1]:5.1f}"
+            )
+
@@ -0,0 +1,99 @@
+import random
+import time
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from accounts.identifiers import find_login_user
+from accounts.models import User
+from benchmarks.utils import Rollback
+
+
+def legacy_lookup(identifier):
+    # LoginView before the single-probe change
+    return User.objects.filter(
+        Q(username=identifier) | Q(email=identifier) | Q(phone=identifier)
+    ).first()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark LoginView identifier resolution on N synthetic users: the old "
+        "username/email/phone OR query vs. the shape-detected single probe. "
+        "Everything runs in one transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000)
+        parser.add_argument("--lookups", type=int, default=5_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        try:
+            with transaction.atomic():
+                self.seed(opts["users"], opts["batch_size"])
+                identifiers = self.sample_identifiers(rng, opts["users"], opts["lookups"])
+                self.report(identifiers)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, n, batch_size):
+        password = make_password("bench-password")
+        started = time.perf_counter()
+        for start in range(0, n, batch_size):
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=f"bench_user_{i}",
+                        email=f"Bench.User{i}@Example.com",
+                        phone=f"+98 9{i:09d}",
+                        password=password,
+                    )
+                    for i in range(start, min(start + batch_size, n))
+                ]
+            )
+        self.stdout.write(f"seeded {n} users in {time.perf_counter() - started:.1f}s")
+
+    @staticmethod
+    def sample_identifiers(rng, n, count):
+        identifiers = []
+        for _ in range(count):
+            i = rng.randrange(n)
+            identifiers.append(
+                rng.choice([f"bench_user_{i}", f"Bench.User{i}@Example.com", f"+98 9{i:09d}"])
+            )
+        return identifiers
+
+    def report(self, identifiers):
+        hash_started = time.perf_counter()
+        check_password("bench-password", User.objects.filter(username="bench_user_0").values_list("password", flat=True)[0])
+        hash_seconds = time.perf_counter() - hash_started
+
+        for label, lookup in (("legacy OR query", legacy_lookup), ("single probe", find_login_user)):
+            started = time.perf_counter()
+            misses = sum(1 for identifier in identifiers if lookup(identifier) is None)
+            elapsed = time.perf_counter() - started
+            per_lookup = elapsed / len(identifiers)
+            self.stdout.write(
+                f"{label:>16}: {len(identifiers) / elapsed:10.0f} lookups/s  "
+                f"{per_lookup * 1e6:8.1f} us/lookup  misses={misses}  "
+                f"-> {1 / (per_lookup + hash_seconds):6.1f} logins/s per worker"
+            )
+
+        self.stdout.write(f"password check: {hash_seconds * 1e3:.1f} ms")
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                for label, qs in (
+                    ("legacy", User.objects.filter(Q(username="x") | Q(email="x") | Q(phone="x"))),
+                    ("probe/email", User.objects.filter(email_normalized="x")),
+                    ("probe/phone", User.objects.filter(phone_normalized="x")),
+                ):
+                    sql, params = qs.query.sql_with_params()
+                    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                    plan = "; ".join(row[-1] for row in cursor.fetchall())
+                    self.stdout.write(f"plan {label}: {plan}")
@@ -0,0 +1,136 @@
+import random
+import statistics
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+
+from accounts.cache import profile_cache
+from accounts.models import User
+from accounts.tokens import RoleRefreshToken
+from ads.feed import ad_feed
+from ads.models import Ad
+from benchmarks.utils import Rollback, best_of, timed
+from config.metrics import MetricsMiddleware, RequestStats, _current, count_queries, registry
+from tickets.models import Ticket
+
+
+# endpoint -> path, asked by the seeded customer
+ENDPOINTS = {
+    "ads": "/api/ads/",
+    "ads legacy": "/api/ads/?legacy=1",
+    "ad detail": "/api/ads/{ad}/",
+    "tickets": "/api/tickets/",
+    "contractors": "/api/contractors/",
+    "profile": "/api/contractors/{contractor}/profile/",
+}
+
+
+@contextmanager
+def without_query_counter():
+    """The baseline runs without the execute wrapper, as if metrics were never installed."""
+    installed = count_queries in connection.execute_wrappers
+    if installed:
+        connection.execute_wrappers.remove(count_queries)
+    try:
+        yield
+    finally:
+        if installed:
+            connection.execute_wrappers.append(count_queries)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what MetricsMiddleware adds to a request: every endpoint is driven "
+        "through the test client with METRICS ENABLED on and off, in interleaved "
+        "runs; the overhead is the median of the paired on/off ratios. The hooks' own "
+        "cost (per request, per query) is timed in isolation too, since end-to-end "
+        "numbers on a busy machine are noisy. Everything runs in one transaction that "
+        "is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ads", type=int, default=200)
+        parser.add_argument("--number", type=int, default=100, help="requests per timing run")
+        parser.add_argument("--repeat", type=int, default=11, help="paired timing runs per endpoint")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=["testserver"]):
+                ids = self.seed(opts["ads"], random.Random(opts["seed"]))
+                self.report(ids, opts["repeat"], opts["number"])
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            ad_feed.clear()
+            profile_cache.clear()
+            registry.clear()
+
+    def seed(self, n, rng):
+        customer = User.objects.create(username="bench_metrics_customer", phone="bm-0", role=User.Role.CUSTOMER)
+        contractor = User.objects.create(username="bench_metrics_contractor", phone="bm-1", role=User.Role.CONTRACTOR)
+        Ad.objects.bulk_create(
+            [
+                Ad(title=f"Fix the kitchen tap #{i}", description="Leaking since last week.",
+                   category=rng.choice(["plumbing", "electrical", "painting"]), creator=customer)
+                for i in range(n)
+            ]
+        )
+        Ticket.objects.bulk_create([Ticket(creator=customer, title=f"t{i}", message="m" * 100) for i in range(50)])
+        ad = Ad.objects.filter(creator=customer).first()
+        return {"customer": customer, "contractor": contractor.id, "ad": ad.id}
+
+    def clients(self, customer):
+        """(with metrics, without); middleware is loaded on each client's first request."""
+        auth = f"Bearer {RoleRefreshToken.for_user(customer).access_token}"
+        clients = []
+        for enabled in (True, False):
+            with override_settings(METRICS={"ENABLED": enabled}):
+                client = Client(HTTP_AUTHORIZATION=auth)
+                client.get("/api/ads/")
+            clients.append(client)
+        return clients
+
+    def report(self, ids, repeat, number):
+        on, off = self.clients(ids["customer"])
+        self.stdout.write(f"{'endpoint':>12} {'off us/req':>10} {'on':>8} {'overhead':>9}")
+        overheads = []
+        for name, template in ENDPOINTS.items():
+            path = template.format(**ids)
+            for client in (on, off):
+                r = client.get(path)
+                if r.status_code != 200:
+                    raise CommandError(f"{name}: HTTP {r.status_code}")
+            runs_on, runs_off = [], []
+            for i in range(repeat):
+                # alternate which mode goes first, so drift hits both alike
+                for mode in ("on", "off") if i % 2 == 0 else ("off", "on"):
+                    if mode == "on":
+                        runs_on.append(timed(lambda: on.get(path), number))
+                    else:
+                        with without_query_counter():
+                            runs_off.append(timed(lambda: off.get(path), number))
+            overhead = statistics.median(a / b for a, b in zip(runs_on, runs_off)) - 1
+            overheads.append(overhead)
+            self.stdout.write(f"{name:>12} {min(runs_off):10.0f} {min(runs_on):8.0f} {overhead * 100:8.2f}%")
+        self.stdout.write(f"{'median':>12} {'':>10} {'':>8} {statistics.median(overheads) * 100:8.2f}%")
+        self.hook_cost(number * 100)
+
+    def hook_cost(self, number):
+        request, response = RequestFactory().get("/api/ads/"), HttpResponse()
+        middleware = MetricsMiddleware(lambda request: response)
+        per_request = best_of(lambda: middleware(request), 5, number)
+
+        execute = lambda sql, params, many, context: None
+        token = _current.set(RequestStats())
+        try:
+            wrapped = best_of(lambda: count_queries(execute, "", None, False, None), 5, number)
+        finally:
+            _current.reset(token)
+        bare = best_of(lambda: execute("", None, False, None), 5, number)
+        registry.clear()
+        self.stdout.write(f"middleware: {per_request:.2f}us per request, {wrapped - bare:.2f}us per query")
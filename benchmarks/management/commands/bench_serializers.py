@@ -0,0 +1,118 @@
+import random
+import tracemalloc
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from accounts.serializers import AdSummarySerializer
+from ads.feed import ad_feed
+from ads.models import Ad, WorkRequest
+from ads.serializers import AdSerializer, WorkRequestSerializer
+from benchmarks.utils import Rollback, best_of
+from config.lean import lean
+from reviews.models import Review
+from reviews.serializers import ReviewSerializer
+from tickets.models import Ticket
+from tickets.serializers import TicketSerializer
+
+
+def peak_bytes(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize N rows of each hot list payload with the DRF ModelSerializer "
+        "and with its compiled twin (config/lean.py). Reports time and peak Python "
+        "memory per row, with and without the query (model instances vs "
+        "values_list tuples). Everything runs in one transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5, help="timing runs; the fastest is reported")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        try:
+            with transaction.atomic():
+                self.seed(opts["rows"], random.Random(opts["seed"]))
+                self.report(opts["rows"], opts["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            ad_feed.clear()
+
+    def seed(self, n, rng):
+        customer = User.objects.create(username="bench_ser_customer", phone="bs-0", role=User.Role.CUSTOMER)
+        contractor = User.objects.create(username="bench_ser_contractor", phone="bs-1", role=User.Role.CONTRACTOR)
+        slot = timezone.now().replace(microsecond=0)
+        Ad.objects.bulk_create(
+            [
+                Ad(
+                    title=f"Fix the kitchen tap #{i}", description="Leaking since last week. " * 4,
+                    category=rng.choice(["plumbing", "electrical", "painting"]), creator=customer,
+                    status=Ad.Status.DONE, assigned_contractor=contractor, contractor_marked_done=True,
+                    scheduled_at=slot + timedelta(hours=i), estimated_duration=timedelta(hours=2),
+                    scheduled_end=slot + timedelta(hours=i + 2), location="Tehran",
+                    latitude=35.7 + rng.random() / 10, longitude=51.4 + rng.random() / 10,
+                )
+                for i in range(n)
+            ]
+        )
+        ads = list(Ad.objects.filter(creator=customer).values_list("id", flat=True))
+        WorkRequest.objects.bulk_create(
+            [WorkRequest(ad_id=ad_id, contractor=contractor, message="Available tomorrow.") for ad_id in ads]
+        )
+        Review.objects.bulk_create(
+            [Review(ad_id=ad_id, contractor=contractor, author=customer, text="Quick and tidy.", rating=rng.randint(1, 5))
+             for ad_id in ads]
+        )
+        Ticket.objects.bulk_create(
+            [Ticket(creator=customer, ad_id=ad_id, title=f"t{i}", message="m" * 100) for i, ad_id in enumerate(ads)]
+        )
+
+    def report(self, n, repeat):
+        cases = (
+            ("AdSerializer", AdSerializer, Ad),
+            ("AdSummarySerializer", AdSummarySerializer, Ad),
+            ("WorkRequestSerializer", WorkRequestSerializer, WorkRequest),
+            ("ReviewSerializer", ReviewSerializer, Review),
+            ("TicketSerializer", TicketSerializer, Ticket),
+        )
+        self.stdout.write(
+            f"{'serializer':>22} {'':>12} {'drf us/row':>10} {'lean':>8} {'x':>5}  {'drf B/row':>9} {'lean':>7} {'x':>5}"
+        )
+        for name, serializer_class, model in cases:
+            compiled = lean(serializer_class)
+            queryset = model.objects.order_by("id")[:n]
+
+            # with the query: instances + serializer vs values_list + compiled function
+            drf = lambda: serializer_class(queryset.all(), many=True).data
+            fast = lambda: compiled.serialize(queryset.all())
+            self.line(name, "with query", n, repeat, drf, fast)
+
+            # serialization alone, rows already loaded
+            instances = list(queryset)
+            tuples = list(queryset.values_list(*compiled.columns))
+            tz = compiled._timezone()
+            drf = lambda: serializer_class(instances, many=True).data
+            fast = lambda: [compiled.to_dict(row, tz) for row in tuples]
+            self.line("", "serialize", n, repeat, drf, fast)
+
+    def line(self, name, label, n, repeat, drf, fast):
+        times = [best_of(fn, repeat) / n for fn in (drf, fast)]
+        memory = [peak_bytes(fn) / n for fn in (drf, fast)]
+        self.stdout.write(
+            f"{name:>22} {label:>12} {times[0]:10.1f} {times[1]:8.1f} {times[0] / times[1]:5.1f}  "
+            f"{memory[0]:9.0f} {memory[1]:7.0f} {memory[0] / memory[1]:5.1f}"
+        )
@@ -0,0 +1,127 @@
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections, transaction
+from django.utils import timezone
+
+from accounts.models import User
+from ads.models import Ad
+from benchmarks.utils import percentile
+from config.sqlite import LEGACY_PROFILE, sqlite_options
+from tickets.models import Ticket
+
+
+def ms(seconds):
+    return seconds * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Mixed read/write load from T threads on a file-backed SQLite database, "
+        "first with Django's defaults (rollback journal, deferred transactions), "
+        "then with settings.SQLITE_PROFILE. Reads are ad list pages. Writes are "
+        "ticket inserts (autocommit) and read-modify-write transactions on an ad, "
+        "the shape of assign / review. Reports throughput, latency and "
+        "'database is locked' errors. Seeded rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=5.0, help="run time per profile")
+        parser.add_argument("--write-ratio", type=float, default=0.2)
+        parser.add_argument("--ads", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        db = connection.settings_dict
+        if connection.vendor != "sqlite" or db["NAME"] in (":memory:", "") or "mode=memory" in str(db["NAME"]):
+            raise CommandError("bench_sqlite needs a file-backed SQLite database.")
+
+        original = connections.settings[DEFAULT_DB_ALIAS].get("OPTIONS", {})
+        tag = uuid.uuid4().hex[:8]
+        customer, ad_ids = self.seed(tag, opts["ads"])
+        try:
+            for label, profile in (("django defaults", LEGACY_PROFILE), ("SQLITE_PROFILE", settings.SQLITE_PROFILE)):
+                self.use_options(sqlite_options(profile))
+                self.run(label, customer, ad_ids, opts)
+        finally:
+            self.use_options(original)
+            User.objects.filter(username__startswith=f"bench_sqlite_{tag}_").delete()
+
+    def use_options(self, options):
+        # every connection opened from now on (one per worker thread) gets these
+        connections.settings[DEFAULT_DB_ALIAS]["OPTIONS"] = options
+        connections.close_all()
+
+    def seed(self, tag, n_ads):
+        customer = User.objects.create(
+            username=f"bench_sqlite_{tag}_customer", phone=f"bs{tag}-0", role=User.Role.CUSTOMER,
+        )
+        Ad.objects.bulk_create(
+            [Ad(title=f"bench {i}", description="d" * 200, category="c", creator=customer) for i in range(n_ads)]
+        )
+        return customer, list(Ad.objects.filter(creator=customer).values_list("id", flat=True))
+
+    def run(self, label, customer, ad_ids, opts):
+        latencies = {"read": [], "write": []}
+        outcomes = Counter()
+        lock = threading.Lock()
+        deadline = time.perf_counter() + opts["seconds"]
+
+        def read(rng):
+            list(
+                Ad.objects.filter(status=Ad.Status.OPEN)
+                .order_by("-created_at", "-id")
+                .values_list("id", "title", "status")[:50]
+            )
+
+        def write(rng):
+            if rng.random() < 0.5:
+                Ticket.objects.create(creator=customer, title="bench", message="m")
+                return
+            # read, then write, in one transaction (the shape of assign / review)
+            with transaction.atomic():
+                ad_id = rng.choice(ad_ids)
+                marked = Ad.objects.filter(id=ad_id).values_list("contractor_marked_done", flat=True).get()
+                Ad.objects.filter(id=ad_id).update(contractor_marked_done=not marked, updated_at=timezone.now())
+
+        def worker(n):
+            rng = random.Random(opts["seed"] * 1000 + n)
+            local = {"read": [], "write": []}
+            counts = Counter()
+            try:
+                while time.perf_counter() < deadline:
+                    kind = "write" if rng.random() < opts["write_ratio"] else "read"
+                    started = time.perf_counter()
+                    try:
+                        (write if kind == "write" else read)(rng)
+                        counts[kind] += 1
+                        local[kind].append(time.perf_counter() - started)
+                    except OperationalError as e:
+                        counts["locked" if "locked" in str(e) else "error"] += 1
+            finally:
+                connections.close_all()
+                with lock:
+                    outcomes.update(counts)
+                    for k in local:
+                        latencies[k].extend(local[k])
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(opts["threads"])]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{label:>16}: {(outcomes['read'] + outcomes['write']) / elapsed:8.0f} ops/s  "
+            f"reads={outcomes['read']} writes={outcomes['write']} locked={outcomes['locked']} error={outcomes['error']}  "
+            f"read p50/p95={ms(percentile(latencies['read'], 50)):.1f}/{ms(percentile(latencies['read'], 95)):.1f}ms  "
+            f"write p50/p95={ms(percentile(latencies['write'], 50)):.1f}/{ms(percentile(latencies['write'], 95)):.1f}ms"
+        )
@@ -0,0 +1,45 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.stats import rebuild_contractor_stats
+from ads.feed import ad_feed
+from benchmarks.marketplace import PASSWORD, MarketplaceGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a deterministic synthetic marketplace: N users and M ads with their "
+        "work requests, reviews and tickets, in consistent lifecycle states and with "
+        "skewed popularity (benchmarks/marketplace.py). Rows are added to what is "
+        "already there and committed batch by batch. Use a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--ads", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--anchor", type=date.fromisoformat, help="'today' for the generated timeline (YYYY-MM-DD)")
+        parser.add_argument("--days", type=int, default=365, help="ads are spread over this many days before --anchor")
+        parser.add_argument("--batch-size", type=int, default=5000, help="users / ads per transaction")
+        parser.add_argument("--requests-per-ad", type=float, default=2.5, help="mean work requests per ad")
+        parser.add_argument("--review-rate", type=float, default=0.75, help="share of DONE ads that get a review")
+        parser.add_argument("--tickets-per-ad", type=float, default=0.1)
+        parser.add_argument("--keep-indexes", action="store_true", help="load with the secondary indexes in place")
+
+    def handle(self, *args, **opts):
+        try:
+            generator = MarketplaceGenerator(
+                opts["users"], opts["ads"], seed=opts["seed"], anchor=opts["anchor"], days=opts["days"],
+                batch_size=opts["batch_size"], requests_per_ad=opts["requests_per_ad"],
+                review_rate=opts["review_rate"], tickets_per_ad=opts["tickets_per_ad"], log=self.stdout.write,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        counts = generator.run(drop_indexes=not opts["keep_indexes"])
+        written, _ = rebuild_contractor_stats()
+        ad_feed.bump()  # raw INSERTs send no signals
+
+        self.stdout.write(", ".join(f"{n} {name}" for name, n in counts.items()) + f", {written} ContractorStats")
+        self.stdout.write(self.style.SUCCESS(f"Seeded. Every generated user's password is {PASSWORD!r}."))
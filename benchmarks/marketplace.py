@@ -0,0 +1,374 @@
+# benchmarks/marketplace.py
+"""
+Deterministic synthetic marketplace data, for performance work at volume.
+
+MarketplaceGenerator writes users, then ads in batches. Each batch also
+writes the ads' work requests, reviews and tickets. Every batch is one
+INSERT ... executemany per table (RowWriter) in one transaction, and
+nothing is kept between batches except the user id pools and each
+contractor's next free slot. Rows are plain dicts rather than model
+instances: bulk_create's per-value preparation (model __init__,
+get_db_prep_save, make_naive on every datetime) capped the load at a few
+thousand rows a second. Primary keys are assigned here, after the
+tables' current maximum, so children can point at their ads without
+reading anything back.
+
+The data follows the rules the API enforces:
+
+- OPEN ads have PENDING (or CANCELED) requests and no contractor;
+- ASSIGNED and DONE ads have exactly one ACCEPTED request, from the
+  assigned contractor, and every other request REJECTED;
+- ASSIGNED jobs of one contractor never overlap (one free-slot cursor per
+  contractor), DONE jobs lie in the past;
+- reviews exist only on DONE ads, by the ad's creator, for its contractor.
+
+Popularity is skewed (Zipf-like weights): a few categories, customers
+and "power contractors" account for most of the rows. The same --seed
+and --anchor give the same rows.
+"""
+import bisect
+import functools
+import itertools
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Max
+
+from accounts.models import User
+from ads import geo
+from ads.models import Ad, WorkRequest
+from ads.search import TRIGGERS as FTS_TRIGGERS, install_fts
+from reviews.models import Review
+from tickets.models import Ticket
+
+PASSWORD = "seed-password"
+
+CATEGORIES = [
+    "plumbing", "electrical", "cleaning", "painting", "moving", "carpentry", "appliance repair",
+    "gardening", "heating", "roofing", "tiling", "locksmith", "pest control", "glazing",
+    "flooring", "plastering", "masonry", "welding", "insulation", "pool care",
+]
+JOBS = {
+    "plumbing": ["Fix a leaking kitchen tap", "Unblock the bathroom drain", "Replace the water heater"],
+    "electrical": ["Install ceiling lights", "Replace the fuse box", "Add two sockets in the office"],
+    "cleaning": ["Deep clean a two-bedroom flat", "Clean the windows", "End of tenancy cleaning"],
+    "painting": ["Paint the living room", "Repaint the front door", "Paint the kids' bedroom"],
+    "moving": ["Move a sofa to the third floor", "Help moving house", "Carry a piano downstairs"],
+}
+DETAILS = [
+    "Needed as soon as possible.", "Weekend works best for us.", "Parking is available in front.",
+    "Materials will be provided.", "Please bring your own tools.", "The building has an elevator.",
+    "Call before coming.", "Photos available on request.",
+]
+CITIES = [  # name, lat, lng, weight
+    ("Tehran", 35.6892, 51.3890, 10), ("Mashhad", 36.2605, 59.6168, 4), ("Isfahan", 32.6539, 51.6660, 3),
+    ("Shiraz", 29.5918, 52.5837, 2), ("Tabriz", 38.0800, 46.2919, 2),
+]
+DURATIONS = [timedelta(hours=h) for h in (1, 1, 2, 2, 3, 4, 6)]
+TABLES = [User, Ad, WorkRequest, Review, Ticket]
+
+
+def zipf_cum_weights(n, s):
+    """Cumulative weights 1/rank**s for ranks 1..n, for random.choices(cum_weights=...)."""
+    return list(itertools.accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def _sqlite_utc(value):
+    # what the SQLite backend stores for an aware datetime, without going through make_naive()
+    if value.tzinfo is not dt_timezone.utc:
+        value = value.astimezone(dt_timezone.utc)
+    return value.replace(tzinfo=None).isoformat(" ")
+
+
+class RowWriter:
+    """
+    INSERTs rows of one model, given as {attname: value} dicts, with one
+    executemany per call. Columns whose Python value already is the database
+    value (ids, strings, numbers, booleans) are passed as they are; aware
+    datetimes on SQLite are formatted inline; every other column goes through
+    its field's get_db_prep_save(). Missing columns get the field default,
+    evaluated once. auto_now / auto_now_add are not applied: rows carry their
+    own timestamps. Generated columns are left to the database.
+    """
+
+    _RAW = (
+        models.AutoField, models.IntegerField, models.CharField, models.TextField, models.BooleanField,
+        models.FloatField, models.ForeignKey,
+    )
+
+    def __init__(self, model):
+        fields = [f for f in model._meta.concrete_fields if not f.generated]
+        self.columns = [(f.attname, f.get_default(), self._converter(f)) for f in fields]
+        quote = connection.ops.quote_name
+        self.sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            quote(model._meta.db_table), ", ".join(quote(f.column) for f in fields), ", ".join(["%s"] * len(fields)),
+        )
+
+    @classmethod
+    def _converter(cls, field):
+        if isinstance(field, models.DateTimeField) and connection.vendor == "sqlite" and settings.USE_TZ:
+            return _sqlite_utc
+        if isinstance(field, cls._RAW) and not isinstance(field, (models.DateField, models.DecimalField)):
+            return None
+        return functools.partial(field.get_db_prep_save, connection=connection)
+
+    def write(self, rows):
+        if not rows:
+            return
+        params = []
+        for row in rows:
+            values = []
+            for attname, default, convert in self.columns:
+                value = row.get(attname, default)
+                values.append(value if convert is None or value is None else convert(value))
+            params.append(values)
+        with connection.cursor() as cursor:
+            cursor.executemany(self.sql, params)
+
+
+@contextmanager
+def secondary_indexes_dropped(models):
+    """
+    Drop the non-unique indexes of `models` (and the FTS triggers on ads_ad)
+    while the block runs, then rebuild them, each in one pass. SQLite only;
+    elsewhere the block runs with the indexes in place.
+    """
+    if connection.vendor != "sqlite":
+        yield []
+        return
+    tables = [model._meta.db_table for model in models]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            f"AND sql NOT LIKE 'CREATE UNIQUE%%' AND tbl_name IN ({', '.join(['%s'] * len(tables))})",
+            tables,
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+        for name in FTS_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    try:
+        yield [name for name, _ in indexes]
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+            cursor.execute("ANALYZE")  # fresh planner statistics for the new volume
+        install_fts(connection)  # triggers are missing: reinstalls them and reindexes every ad
+
+
+class MarketplaceGenerator:
+    def __init__(self, users, ads, seed=1, anchor=None, days=365, batch_size=5000,
+                 requests_per_ad=2.5, review_rate=0.75, tickets_per_ad=0.1, log=None):
+        if users < 4:
+            raise ValueError("users must be at least 4: a customer, a contractor, a support agent and an admin.")
+        self.n_users, self.n_ads = users, ads
+        self.seed = seed
+        self.rng = random.Random(seed)
+        day = anchor or datetime.now(dt_timezone.utc).date()
+        self.anchor = datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
+        self.days = days
+        self.batch_size = batch_size
+        self.requests_per_ad = requests_per_ad
+        self.review_rate = review_rate
+        self.tickets_per_ad = tickets_per_ad
+        self.log = log or (lambda message: None)
+        self.counts = dict.fromkeys((model.__name__ for model in TABLES), 0)
+
+    def _next_ids(self):
+        return {model: (model.objects.aggregate(m=Max("id"))["m"] or 0) + 1 for model in TABLES}
+
+    def run(self, drop_indexes=True):
+        """Write everything. Returns {model name: rows written}."""
+        started = time.perf_counter()
+        ids = self._next_ids()
+        indexes = secondary_indexes_dropped(TABLES) if drop_indexes else nullcontext([])
+        self.writers = {model: RowWriter(model) for model in TABLES}
+        with indexes as dropped:
+            if dropped:
+                self.log(f"dropped {len(dropped)} indexes")
+            self._users(ids[User])
+            self._ads(ids)
+            # explicit ids don't advance sequences (SQLite's AUTOINCREMENT follows by itself)
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), TABLES):
+                    cursor.execute(sql)
+            if drop_indexes:
+                self.log("rebuilding indexes")
+        rows = sum(self.counts.values())
+        elapsed = time.perf_counter() - started
+        self.log(f"{rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s)")
+        return self.counts
+
+    # -------------------------
+    # users
+    # -------------------------
+    def _users(self, first_id):
+        rng, n = self.rng, self.n_users
+        # one hash for everybody (hashing per user would dominate the load), salted by the seed
+        password = make_password(PASSWORD, salt=f"marketplace{self.seed}")
+        n_support, n_admin = max(1, n // 2000), max(1, n // 20000)
+        roles = [User.Role.CONTRACTOR] * max(1, round(n * 0.15)) + [User.Role.SUPPORT] * n_support
+        roles += [User.Role.ADMIN] * n_admin
+        roles += [User.Role.CUSTOMER] * (n - len(roles))
+        rng.shuffle(roles)
+
+        customers, contractors = [], []
+        for start in range(0, n, self.batch_size):
+            batch = []
+            for i in range(start, min(start + self.batch_size, n)):
+                pk, role = first_id + i, roles[i]
+                batch.append(dict(
+                    id=pk, username=f"user{pk}", email=f"user{pk}@example.com", phone=f"+98 9{pk:09d}",
+                    password=password, role=role,
+                    # joined over the `days` before the first ad
+                    date_joined=self.anchor - timedelta(days=self.days * (2 - i / n)),
+                ))
+                if role == User.Role.CUSTOMER:
+                    customers.append(pk)
+                elif role == User.Role.CONTRACTOR:
+                    contractors.append(pk)
+            with transaction.atomic():
+                self.writers[User].write(batch)
+            self.counts["User"] += len(batch)
+        self.log(f"users: {n} ({len(customers)} customers, {len(contractors)} contractors)")
+
+        # popularity by rank; shuffled so the busiest aren't simply the oldest accounts
+        rng.shuffle(customers)
+        rng.shuffle(contractors)
+        self.customers, self.customer_weights = customers, zipf_cum_weights(len(customers), 0.8)
+        self.contractors, self.contractor_weights = contractors, zipf_cum_weights(len(contractors), 1.1)
+        self.category_weights = zipf_cum_weights(len(CATEGORIES), 1.2)
+        self.city_weights = list(itertools.accumulate(city[3] for city in CITIES))
+        # contractor -> (next free slot for an ASSIGNED job, mean rating)
+        self.next_free = {}
+        self.quality = {}
+
+    # -------------------------
+    # ads and what hangs off them
+    # -------------------------
+    def _ads(self, ids):
+        ad_id, request_id, review_id, ticket_id = ids[Ad], ids[WorkRequest], ids[Review], ids[Ticket]
+        for start in range(0, self.n_ads, self.batch_size):
+            ads, requests, reviews, tickets = [], [], [], []
+            for i in range(start, min(start + self.batch_size, self.n_ads)):
+                ad, children = self._ad(ad_id, i)
+                ad_id += 1
+                ads.append(ad)
+                for request in children:
+                    request["id"], request_id = request_id, request_id + 1
+                    requests.append(request)
+                review = self._review(ad)
+                if review is not None:
+                    review["id"], review_id = review_id, review_id + 1
+                    reviews.append(review)
+                if self.rng.random() < self.tickets_per_ad:
+                    ticket = self._ticket(ad)
+                    ticket["id"], ticket_id = ticket_id, ticket_id + 1
+                    tickets.append(ticket)
+            with transaction.atomic():
+                for model, rows in ((Ad, ads), (WorkRequest, requests), (Review, reviews), (Ticket, tickets)):
+                    self.writers[model].write(rows)
+                    self.counts[model.__name__] += len(rows)
+            self.log(f"ads: {start + len(ads)}/{self.n_ads}")
+
+    def _between(self, start, end):
+        """A random moment in [start, min(end, anchor)), or `start` when that is empty."""
+        end = min(end, self.anchor)
+        return start + (end - start) * self.rng.random() if end > start else start
+
+    def _contractor(self):
+        return self.rng.choices(self.contractors, cum_weights=self.contractor_weights)[0]
+
+    def _ad(self, pk, i):
+        rng = self.rng
+        # created in id order over the last `days` days; older ads are more often finished
+        age = 1 - i / max(self.n_ads, 1)
+        created = self.anchor - timedelta(days=self.days * age) + timedelta(seconds=rng.randrange(60))
+        status = rng.choices(
+            (Ad.Status.OPEN, Ad.Status.ASSIGNED, Ad.Status.DONE, Ad.Status.CANCELED),
+            weights=(0.05 + 0.7 * (1 - age), 0.05 + 0.15 * (1 - age), 0.05 + 0.8 * age, 0.08),
+        )[0]
+        if status == Ad.Status.DONE and created > self.anchor - timedelta(days=2):
+            status = Ad.Status.ASSIGNED  # no time left to have finished it
+        category = CATEGORIES[bisect.bisect_left(self.category_weights, rng.random() * self.category_weights[-1])]
+        title = rng.choice(JOBS.get(category, [f"Need help with {category}"]))
+        city, lat, lng, _ = CITIES[bisect.bisect_left(self.city_weights, rng.random() * self.city_weights[-1])]
+        duration = rng.choice(DURATIONS)
+        ad = dict(
+            id=pk, title=title, description=" ".join(rng.sample(DETAILS, 2)), category=category,
+            creator_id=rng.choices(self.customers, cum_weights=self.customer_weights)[0],
+            status=status, estimated_duration=duration, created_at=created, updated_at=created,
+        )
+        if rng.random() < 0.8:
+            ad["latitude"], ad["longitude"] = lat + rng.gauss(0, 0.08), lng + rng.gauss(0, 0.08)
+            ad["geohash"] = geo.encode(ad["latitude"], ad["longitude"])
+
+        # requesting contractors, busiest most often; at most one request each
+        wanted = int(rng.expovariate(1 / self.requests_per_ad)) + (status in (Ad.Status.ASSIGNED, Ad.Status.DONE))
+        contractors = list(dict.fromkeys(self._contractor() for _ in range(min(wanted, 30))))
+        requests = []
+        for contractor in contractors:
+            at = self._between(created, created + timedelta(days=3))
+            requests.append(dict(
+                ad_id=pk, contractor_id=contractor, message=rng.choice(["", "Available tomorrow.", "I can do it today."]),
+                status=WorkRequest.Status.CANCELED if rng.random() < 0.05 else WorkRequest.Status.PENDING,
+                created_at=at, updated_at=at,
+            ))
+
+        if status in (Ad.Status.ASSIGNED, Ad.Status.DONE):
+            chosen = requests[0]
+            decided = max(r["created_at"] for r in requests)
+            if status == Ad.Status.ASSIGNED:
+                start = self._free_slot(chosen["contractor_id"], max(decided, self.anchor), duration)
+                marked_done = rng.random() < 0.1
+            else:
+                start = self._between(decided, min(decided + timedelta(days=14), self.anchor - duration))
+                marked_done = True
+            ad.update(
+                assigned_contractor_id=chosen["contractor_id"], location=city, contractor_marked_done=marked_done,
+                scheduled_at=start, scheduled_end=start + duration, updated_at=decided,
+            )
+            for request in requests:
+                request["status"] = WorkRequest.Status.ACCEPTED if request is chosen else WorkRequest.Status.REJECTED
+                request["updated_at"] = decided
+        return ad, requests
+
+    def _free_slot(self, contractor, earliest, duration):
+        """The contractor's next free start at or after `earliest`, on the half hour."""
+        slot = max(self.next_free.get(contractor, earliest), earliest)
+        slot += timedelta(minutes=30 * self.rng.randrange(0, 96))
+        slot = slot.replace(minute=30 if slot.minute >= 30 else 0, second=0, microsecond=0)
+        self.next_free[contractor] = slot + duration + timedelta(minutes=30)
+        return slot
+
+    def _review(self, ad):
+        if ad["status"] != Ad.Status.DONE or self.rng.random() >= self.review_rate:
+            return None
+        rng = self.rng
+        contractor = ad["assigned_contractor_id"]
+        quality = self.quality.setdefault(contractor, rng.uniform(3.0, 4.9))
+        at = self._between(ad["scheduled_end"], ad["scheduled_end"] + timedelta(days=3))
+        return dict(
+            ad_id=ad["id"], contractor_id=contractor, author_id=ad["creator_id"],
+            text=rng.choice(["Great work.", "On time and tidy.", "Good, but a bit late.", "Would hire again."]),
+            rating=min(5, max(1, round(rng.gauss(quality, 0.8)))), created_at=at, updated_at=at,
+        )
+
+    def _ticket(self, ad):
+        rng = self.rng
+        status = rng.choice([Ticket.STATUS_OPEN, Ticket.STATUS_IN_PROGRESS, Ticket.STATUS_CLOSED])
+        at = self._between(ad["created_at"], ad["created_at"] + timedelta(days=7))
+        return dict(
+            creator_id=ad["creator_id"], ad_id=ad["id"] if rng.random() < 0.7 else None,
+            title=f"About: {ad['title']}"[:200], message="The contractor has not answered yet.",
+            support_reply="" if status == Ticket.STATUS_OPEN else "We have contacted them.",
+            status=status, created_at=at, updated_at=at,
+        )
@@ -0,0 +1,29 @@
+# benchmarks/utils.py
+"""Helpers shared by the benchmark commands, so their figures compare."""
+import math
+import time
+
+
+class Rollback(Exception):
+    """Raised inside a command's transaction.atomic() to throw the seeded rows away."""
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of `values` (any order); 0.0 when there are none."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def timed(fn, number):
+    """Mean microseconds per call over `number` calls of `fn`."""
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - started) / number * 1e6
+
+
+def best_of(fn, repeat, number=1):
+    """The fastest of `repeat` timed() runs: microseconds per call."""
+    return min(timed(fn, number) for _ in range(repeat))
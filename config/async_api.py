@@ -0,0 +1,97 @@
+# config/async_api.py
+"""
+Native async read endpoints for the ASGI stack (config/asgi.py).
+
+DRF's APIView is sync, so under ASGI every request to it goes through
+sync_to_async and holds a worker thread until it finishes. These views are
+coroutines instead:
+- Authentication uses ClaimsJWTAuthentication.aauthenticate. With a warm
+  token-version cache it never leaves the event loop.
+- Queries use Django's async ORM (`async for`, afirst, aaggregate).
+- The existing DRF serializers run on rows that are already loaded, so
+  serialization never touches the database.
+
+Responses match the sync endpoints: same JSON, same cursor pagination,
+the same ETag handling, and DRF-style error bodies ({"detail": ...}).
+"""
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from accounts.authentication import ClaimsJWTAuthentication
+
+from .conditional import alist_state, make_etag, not_modified, set_validators
+from .pagination import KeysetCursorPagination
+
+
+def json_response(data, status=200):
+    """`data` rendered by the configured JSON renderer, so the bytes match the sync endpoints."""
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+
+
+class AsyncAPIView(View):
+    """Authenticated async GET endpoint; handlers get a DRF Request (query_params, user)."""
+
+    authentication = ClaimsJWTAuthentication()
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            auth = await self.authentication.aauthenticate(request)
+            if auth is None:
+                raise NotAuthenticated()
+            self.request = Request(request, authenticators=())
+            self.request.user, self.request.auth = auth
+            return await super().dispatch(self.request, *args, **kwargs)
+        except APIException as e:
+            detail = e.detail if isinstance(e.detail, (dict, list)) else {"detail": e.detail}
+            response = json_response(detail, status=e.status_code)
+            if e.status_code == 401:
+                response["WWW-Authenticate"] = self.authentication.authenticate_header(request)
+            return response
+
+
+class AsyncListView(AsyncAPIView):
+    """Async twin of ConditionalGetMixin.list + KeysetCursorPagination."""
+
+    serializer_class = None
+    basename = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    async def get(self, request):
+        queryset = self.get_queryset()
+        paginator = KeysetCursorPagination()
+        state = await alist_state(queryset, request, paginator)
+        etag = make_etag("list", self.basename, request.user.pk, request.get_full_path(), state)
+        response = not_modified(request, etag)
+        if response is None:
+            page = await paginator.apaginate_queryset(queryset, request)
+            if page is None:
+                response = json_response(self.serializer_class([obj async for obj in queryset], many=True).data)
+            else:
+                data = self.serializer_class(page, many=True).data
+                response = json_response(paginator.get_paginated_response(data).data)
+        return set_validators(response, etag)
+
+
+class AsyncDetailView(AsyncAPIView):
+    """Async twin of ConditionalGetMixin.retrieve (same ETag as the sync endpoint)."""
+
+    serializer_class = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    async def get(self, request, pk):
+        instance = await self.get_queryset().filter(pk=pk).afirst()
+        if instance is None:
+            raise NotFound()
+        etag = make_etag("detail", instance._meta.label, instance.pk, instance.updated_at)
+        response = not_modified(request, etag, instance.updated_at)
+        if response is None:
+            response = json_response(self.serializer_class(instance).data)
+        return set_validators(response, etag, instance.updated_at)
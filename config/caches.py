@@ -0,0 +1,20 @@
+# config/caches.py
+"""
+Which CACHES aliases are shared between worker processes.
+
+In-process caches (ads/feed.py, accounts/cache.py) keep their invalidation
+counters in such an alias; without one, a write handled by one worker never
+reaches the others, so those caches stay off unless forced on.
+"""
+from django.conf import settings
+
+# backends whose entries a process keeps to itself
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared_cache(alias):
+    """Whether `alias` names a cache every worker process sees."""
+    return bool(alias) and settings.CACHES.get(alias, {}).get("BACKEND") not in LOCAL_CACHE_BACKENDS
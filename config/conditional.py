@@ -0,0 +1,111 @@
+"""
+Conditional GET (ETag / Last-Modified) for API views.
+
+Validators are computed from cheap queries (a row's updated_at, a keyset
+page's (pk, updated_at) rows, or COUNT + MAX(updated_at) over an unpaged
+list) so a matching request gets its 304 before anything is loaded or
+serialized.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from rest_framework.response import Response
+
+from .lean import lean
+from .pagination import KeysetCursorPagination
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha256(repr(parts).encode()).hexdigest()[:32])
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """A 304 (or 412) response if the request's preconditions say so, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # validators depend on who is asking, and the body on the negotiated renderer (JSON / browsable)
+    patch_vary_headers(response, ("Authorization", "Accept"))
+    return response
+
+
+def queryset_state(queryset):
+    """(row count, MAX(updated_at)) in one aggregate query."""
+    state = queryset.order_by().aggregate(count=Count("pk"), last=Max("updated_at"))
+    return state["count"], state["last"]
+
+
+async def aqueryset_state(queryset):
+    state = await queryset.order_by().aaggregate(count=Count("pk"), last=Max("updated_at"))
+    return state["count"], state["last"]
+
+
+def list_state(queryset, request, paginator):
+    """
+    What a list's ETag is made of: the rows of the page being returned when
+    `paginator` is keyset-paged (so a 304 costs one page probe however large
+    the set), else queryset_state() of the whole list, which is the body anyway.
+    """
+    if isinstance(paginator, KeysetCursorPagination):
+        state = paginator.page_state(queryset, request)
+        if state is not None:
+            return state
+    return queryset_state(queryset)
+
+
+async def alist_state(queryset, request, paginator):
+    if isinstance(paginator, KeysetCursorPagination):
+        state = await paginator.apage_state(queryset, request)
+        if state is not None:
+            return state
+    return await aqueryset_state(queryset)
+
+
+class ConditionalGetMixin:
+    """
+    list/retrieve for viewsets whose model has `updated_at`.
+
+    retrieve: ETag + Last-Modified from the row's (id, updated_at).
+    list: ETag from list_state() (the page's (pk, updated_at) rows, or
+    COUNT + MAX(updated_at) when unpaged), the caller and the full URL
+    (cursor, page size). No Last-Modified on lists: a deletion doesn't move
+    any updated_at.
+
+    With `lean_list = True`, list bodies are built by the compiled
+    serializer (config/lean.py) straight from `.values_list()` rows.
+    """
+
+    lean_list = False
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = make_etag("detail", instance._meta.label, instance.pk, instance.updated_at)
+        response = not_modified(request, etag, instance.updated_at)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return set_validators(response, etag, instance.updated_at)
+
+    def list(self, request, *args, **kwargs):
+        state = list_state(self.filter_queryset(self.get_queryset()), request, self.paginator)
+        etag = make_etag("list", self.basename, request.user.pk, request.get_full_path(), state)
+        response = not_modified(request, etag)
+        if response is None:
+            response = self._lean_list(request) if self.lean_list else super().list(request, *args, **kwargs)
+        return set_validators(response, etag)
+
+    def _lean_list(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = lean(self.get_serializer_class())
+        page = self.paginator.paginate_lean(queryset, request, serializer)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(serializer.serialize(queryset))
@@ -0,0 +1,157 @@
+# config/db_router.py
+"""
+Read/write splitting across the primary ("default") and read replicas.
+
+ReplicaRoutingMiddleware decides per request:
+- GET / HEAD / OPTIONS read from one of READ_REPLICAS["ALIASES"].
+- Any other method uses the primary for everything, and pins the client
+  (its Authorization header, or its address when there is none) to the
+  primary for READ_REPLICAS["PIN_SECONDS"]. The pin lives in the default
+  cache, so use a shared cache when several workers serve the API. That
+  way a client sees its own write on the next GET even while the replicas
+  lag behind.
+- A safe request that writes anyway switches to the primary for the rest
+  of the request. Reads inside transaction.atomic() use the primary too,
+  and so do reads inside primary_reads().
+
+ReplicaRouter reads that decision. Outside a request (management commands,
+on_commit hooks of a write, tests) every query goes to the primary. Writes
+always go to the primary, and only the primary is migrated: replicas are
+copies of it (see the sync_replica command).
+"""
+import hashlib
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+PRIMARY = "default"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+DEFAULTS = {
+    "ALIASES": [],      # read aliases, e.g. ["replica"]; empty means everything uses the primary
+    "PIN_SECONDS": 5,   # read-your-writes window after a client's last write
+}
+
+
+class _Route:
+    __slots__ = ("alias",)
+
+    def __init__(self, alias):
+        self.alias = alias
+
+
+# the current request's read alias (None: primary); a ContextVar follows both
+# threads (sync views) and tasks (async views)
+_route = ContextVar("db_route", default=None)
+
+
+def replica_settings():
+    return {**DEFAULTS, **getattr(settings, "READ_REPLICAS", {})}
+
+
+def read_alias():
+    """Alias reads go to right now."""
+    route = _route.get()
+    return route.alias if route is not None and route.alias else PRIMARY
+
+
+@contextmanager
+def primary_reads():
+    """
+    Send the block's reads to the primary, request or not. For data that must
+    not be stale: revocation checks, and rebuilds of caches keyed by a version
+    or generation just read (a replica's older rows would be stored under it).
+    """
+    token = _route.set(_Route(None))
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if connections[PRIMARY].in_atomic_block:
+            # reads inside a transaction belong to it
+            return PRIMARY
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        route = _route.get()
+        if route is not None:
+            # read-your-writes inside this request too
+            route.alias = None
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+def _pin_key(request):
+    who = request.META.get("HTTP_AUTHORIZATION") or request.META.get("REMOTE_ADDR", "")
+    return "db-pin:" + hashlib.sha256(who.encode()).hexdigest()[:32]
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _choose(self, request, aliases, pinned_until):
+        if request.method not in SAFE_METHODS:
+            return None
+        if pinned_until is not None and pinned_until > time.time():
+            return None
+        return random.choice(aliases)
+
+    def _pin(self, request):
+        seconds = replica_settings()["PIN_SECONDS"]
+        return _pin_key(request), time.time() + seconds, seconds
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        aliases = replica_settings()["ALIASES"]
+        if not aliases:
+            return self.get_response(request)
+
+        pinned_until = cache.get(_pin_key(request)) if request.method in SAFE_METHODS else None
+        token = _route.set(_Route(self._choose(request, aliases, pinned_until)))
+        try:
+            response = self.get_response(request)
+        finally:
+            _route.reset(token)
+        if request.method not in SAFE_METHODS:
+            key, until, seconds = self._pin(request)
+            cache.set(key, until, seconds)
+        return response
+
+    async def __acall__(self, request):
+        aliases = replica_settings()["ALIASES"]
+        if not aliases:
+            return await self.get_response(request)
+
+        pinned_until = await cache.aget(_pin_key(request)) if request.method in SAFE_METHODS else None
+        token = _route.set(_Route(self._choose(request, aliases, pinned_until)))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _route.reset(token)
+        if request.method not in SAFE_METHODS:
+            key, until, seconds = self._pin(request)
+            await cache.aset(key, until, seconds)
+        return response
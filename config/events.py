@@ -0,0 +1,181 @@
+# config/events.py
+"""
+In-process pub/sub hub behind the Server-Sent Events stream (config/sse.py).
+
+Write paths call `publish_on_commit(user_ids, kind, data)`. After the
+transaction commits, each recipient gets an event with a new sequence number.
+The event is appended to that user's bounded backlog and pushed to any open
+streams. A reconnecting client sends `Last-Event-ID` and the backlog replays
+what it missed. If the gap can't be covered (events already evicted, or the
+id is from another process / before a restart), the stream opens with a
+`reset` event and the client should refetch.
+
+The hub lives in one process. With several workers, a stream only sees
+events published by its own worker, so run the stream on one ASGI worker
+or route each user to one worker.
+"""
+import asyncio
+import json
+import secrets
+import threading
+from collections import OrderedDict, deque, namedtuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+DEFAULTS = {
+    "BACKLOG": 100,        # events kept per user for Last-Event-ID resume
+    "MAX_USERS": 10000,    # users with a backlog (least recently published to is dropped first)
+    "MAX_PENDING": 1000,   # undelivered events per open stream before it is closed as lagging
+    "KEEPALIVE": 15,       # seconds between keep-alive comments on an idle stream
+}
+
+Event = namedtuple("Event", "seq kind data")
+
+
+class Subscription:
+    """One open stream. Events are handed over on the stream's own event loop."""
+
+    def __init__(self, user_id, loop, max_pending):
+        self.user_id = user_id
+        self.loop = loop
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.lagged = False
+        self._wakeup = asyncio.Event()
+
+    def push(self, event):
+        """Thread-safe; called by the hub from whichever thread published."""
+        self.loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event):
+        if len(self.pending) >= self.max_pending:
+            self.lagged = True
+        else:
+            self.pending.append(event)
+        self._wakeup.set()
+
+    async def next_batch(self, timeout):
+        """Everything pending, waiting up to `timeout` seconds for something (else [])."""
+        if not self.pending and not self.lagged:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._wakeup.clear()
+        batch = list(self.pending)
+        self.pending.clear()
+        return batch
+
+
+class EventHub:
+    def __init__(self, backlog=100, max_users=10000, max_pending=1000, keepalive=15):
+        self.backlog = backlog
+        self.max_users = max_users
+        self.max_pending = max_pending
+        self.keepalive = keepalive
+        # ids from another process or an earlier run are never trusted for resume
+        self.boot = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._seq = 0
+        # user id -> [floor, deque of events]; events with seq <= floor may have been dropped
+        self._backlogs = OrderedDict()
+        self._floor = 0
+        self._subscribers = {}
+
+    @classmethod
+    def from_settings(cls):
+        conf = {**DEFAULTS, **getattr(settings, "EVENT_STREAM", {})}
+        return cls(
+            backlog=conf["BACKLOG"], max_users=conf["MAX_USERS"],
+            max_pending=conf["MAX_PENDING"], keepalive=conf["KEEPALIVE"],
+        )
+
+    def event_id(self, seq):
+        return f"{self.boot}-{seq}"
+
+    def parse_event_id(self, raw):
+        """The sequence number in one of our own ids, else None."""
+        boot, _, seq = (raw or "").partition("-")
+        if boot != self.boot or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _user_backlog(self, user_id):
+        entry = self._backlogs.get(user_id)
+        if entry is None:
+            entry = self._backlogs[user_id] = [self._floor, deque()]
+            if len(self._backlogs) > self.max_users:
+                _, (floor, events) = self._backlogs.popitem(last=False)
+                self._floor = max(self._floor, events[-1].seq if events else floor)
+        else:
+            self._backlogs.move_to_end(user_id)
+        return entry
+
+    def publish(self, user_ids, kind, data):
+        targets = []
+        with self._lock:
+            for user_id in dict.fromkeys(user_ids):
+                if user_id is None:
+                    continue
+                self._seq += 1
+                event = Event(self._seq, kind, data)
+                entry = self._user_backlog(user_id)
+                if len(entry[1]) >= self.backlog:
+                    entry[0] = entry[1].popleft().seq
+                entry[1].append(event)
+                targets.extend((sub, event) for sub in self._subscribers.get(user_id, ()))
+
+        for sub, event in targets:
+            try:
+                sub.push(event)
+            except RuntimeError:
+                # the stream's loop is gone; it unsubscribes on its way out
+                pass
+
+    def subscribe(self, user_id, last_event_id=None):
+        """
+        Register a stream for `user_id` on the running loop.
+
+        Returns (subscription, replay, reset_seq). `replay` is the list of
+        backlog events after `last_event_id`. `reset_seq` is set, to the
+        current sequence number, when the client must refetch instead.
+        Registering and reading the backlog happen under one lock, so no
+        event is missed or sent twice.
+        """
+        sub = Subscription(user_id, asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(sub)
+            if last_event_id is None:
+                return sub, [], None
+
+            after = self.parse_event_id(last_event_id)
+            entry = self._backlogs.get(user_id)
+            floor = entry[0] if entry else self._floor
+            if after is None or after < floor or after > self._seq:
+                return sub, [], self._seq
+            events = entry[1] if entry else ()
+            return sub, [e for e in events if e.seq > after], None
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+    def encode(self, event):
+        data = json.dumps(event.data, separators=(",", ":"), cls=DjangoJSONEncoder)
+        return f"id: {self.event_id(event.seq)}\nevent: {event.kind}\ndata: {data}\n\n"
+
+
+hub = EventHub.from_settings()
+
+
+def publish_on_commit(user_ids, kind, data):
+    """Publish once the surrounding transaction commits (immediately in autocommit)."""
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: hub.publish(user_ids, kind, data))
@@ -0,0 +1,70 @@
+# config/json_codec.py
+"""
+JSON renderer / parser pair on orjson when it is installed.
+
+DRF's JSONRenderer runs the stdlib encoder in Python for every dict and
+every field, then encodes the resulting str to bytes. orjson does the whole
+walk in C and returns bytes. Datetimes are native there too (OPT_UTC_Z gives
+DRF's "Z" suffix); anything orjson doesn't know (Decimal, lazy strings,
+timedelta, querysets) goes through DRF's JSONEncoder.default, so the bytes
+match what JSONRenderer writes.
+
+Without orjson, or when a client asks for an indent other than 2 or a
+config orjson can't honour (UNICODE_JSON / COMPACT_JSON off), both classes
+behave exactly like the DRF ones they extend.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+_fallback = JSONEncoder()
+
+# DRF escapes these two so the output is also valid JavaScript
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def dumps(data, indent=None):
+    """`data` as compact JSON bytes (the same bytes JSONRenderer produces)."""
+    option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    if indent == 2:
+        option |= orjson.OPT_INDENT_2
+    ret = orjson.dumps(data, default=_fallback.default, option=option)
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in ret:
+            ret = ret.replace(raw, escaped)
+    return ret
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent not in (None, 2):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data, indent)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # rejects NaN / Infinity like the strict stdlib parser
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,149 @@
+# config/lean.py
+"""
+Compiled read-only twins of ModelSerializers for list payloads.
+
+`ModelSerializer(queryset, many=True).data` builds a model instance per row,
+then for every field calls get_attribute() and to_representation() through
+the serializer machinery. `lean(SerializerClass)` looks at the serializer's
+fields once and compiles a plain function from a `.values_list()` row to
+the same dict:
+
+- model columns whose Python value already is the representation (ints,
+  strings, bools, choices, foreign key ids) are copied as they are;
+- DateTimeFields in ISO 8601 are formatted inline, in the current timezone;
+- any other field calls that field's own to_representation().
+
+The output is the same dict, key for key, so the rendered JSON is byte for
+byte what the serializer produces. Only plain model fields and
+PrimaryKeyRelatedFields are supported; anything else (nested serializers,
+SerializerMethodField, dotted sources) is rejected when compiling.
+"""
+import functools
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .metrics import timed_serialization
+
+CHUNK_SIZE = 2000
+
+# a row with its keyset position; KeysetCursorPagination reads .created_at / .pk
+LeanRow = namedtuple("LeanRow", "created_at pk data")
+
+# (serializer field, model field) pairs whose database value is already the representation
+_RAW = (
+    (serializers.IntegerField, (models.IntegerField, models.AutoField)),
+    (serializers.CharField, (models.CharField, models.TextField)),
+    (serializers.BooleanField, (models.BooleanField,)),
+)
+
+
+def _iso_datetime(field):
+    def convert(value, tz):
+        if tz is None or timezone.is_naive(value):
+            return field.to_representation(value)
+        text = value.astimezone(tz).isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    return convert
+
+
+class LeanSerializer:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        serializer = serializer_class()
+        model = serializer.Meta.model
+
+        columns, entries, converters = [], [], {}
+        for i, (name, field) in enumerate(
+            (name, field) for name, field in serializer.fields.items() if not field.write_only
+        ):
+            column, kind, convert = self._plan(model, name, field)
+            columns.append(column)
+            value = f"row[{i}]"
+            if kind == "raw":
+                expr = value
+            elif kind == "datetime":
+                converters[f"_c{i}"] = convert
+                expr = f"None if {value} is None else _c{i}({value}, tz)"
+            else:
+                converters[f"_c{i}"] = convert
+                expr = f"None if {value} is None else _c{i}({value})"
+            entries.append(f"{name!r}: {expr}")
+
+        self.columns = tuple(columns)
+        source = "def to_dict(row, tz):\n    return {" + ", ".join(entries) + "}\n"
+        namespace = dict(converters)
+        exec(compile(source, f"<lean {serializer_class.__qualname__}>", "exec"), namespace)
+        self.to_dict = namespace["to_dict"]
+
+    def _plan(self, model, name, field):
+        """(values_list column, kind, converter) for one serializer field."""
+        where = f"{self.serializer_class.__name__}.{name}"
+        if field.source == "*" or "." in field.source or isinstance(field, serializers.SerializerMethodField):
+            raise ImproperlyConfigured(f"{where}: only model columns can be compiled.")
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(f"{where}: {field.source!r} is not a field of {model.__name__}.")
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                return model_field.attname, "field", field.pk_field.to_representation
+            return model_field.attname, "raw", None
+        if model_field.is_relation and not model_field.concrete:
+            raise ImproperlyConfigured(f"{where}: reverse and many-to-many relations can't be compiled.")
+
+        column = model_field.attname
+        if model_field.is_relation:
+            # e.g. creator_id = IntegerField(): the column holds the related key
+            model_field = model_field.target_field
+        if type(field) is serializers.ChoiceField and all(
+            str(value) == key for key, value in field.choice_strings_to_values.items()
+        ):
+            return column, "raw", None
+        for serializer_type, model_types in _RAW:
+            if type(field) is serializer_type and isinstance(model_field, model_types):
+                return column, "raw", None
+        if type(field) is serializers.FloatField:
+            return column, "field", float
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if (
+            type(field) is serializers.DateTimeField
+            and not hasattr(field, "timezone")
+            and isinstance(output_format, str)
+            and output_format.lower() == ISO_8601
+        ):
+            return column, "datetime", _iso_datetime(field)
+        return column, "field", field.to_representation
+
+    @staticmethod
+    def _timezone():
+        return timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def serialize(self, queryset):
+        """The serializer's `many=True` data for `queryset`, as a list of dicts."""
+        to_dict, tz = self.to_dict, self._timezone()
+        with timed_serialization():
+            # iterator(): the tuples are not kept in the queryset's result cache
+            return [to_dict(row, tz) for row in queryset.values_list(*self.columns).iterator(CHUNK_SIZE)]
+
+    def rows(self, queryset):
+        """LeanRows for `queryset` (ordering and slicing are the caller's)."""
+        to_dict, tz = self.to_dict, self._timezone()
+        with timed_serialization():
+            return [
+                LeanRow(row[-2], row[-1], to_dict(row, tz))
+                for row in queryset.values_list(*self.columns, "created_at", "pk").iterator(CHUNK_SIZE)
+            ]
+
+
+@functools.cache
+def lean(serializer_class):
+    """The LeanSerializer for `serializer_class`, compiled on first use."""
+    return LeanSerializer(serializer_class)
@@ -0,0 +1,289 @@
+# config/metrics.py
+"""
+Per-route request metrics in Prometheus text format, at /api/metrics (admins only).
+
+For every request, MetricsMiddleware records under the resolved route
+pattern (e.g. `api/contractors/<int:contractor_id>/profile/`) and method:
+
+- latency, as a histogram (METRICS["BUCKETS"], seconds);
+- SQL statements and the time spent in them, counted by a wrapper every
+  database connection gets when it opens (install_query_counter);
+- time spent rendering the response body, and in the compiled list
+  serializers (config/lean.py);
+- requests per status class (2xx, 4xx, ...).
+
+Aggregation is in-process. Each thread adds to its own shard, so recording
+never takes a lock; a scrape sums the shards. Under several worker
+processes every process serves its own numbers. Requests that match no
+route are counted under route="<unmatched>", so junk URLs can't blow up
+the label set.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework.views import APIView
+
+from accounts.permissions import IsAdmin
+
+DEFAULTS = {
+    "ENABLED": True,
+    "BUCKETS": (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+}
+
+UNMATCHED = "<unmatched>"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, "METRICS", {})}
+
+
+class RequestStats:
+    """What one request spent; shared with the threads its async view hops to."""
+
+    __slots__ = ("queries", "db_seconds", "render_seconds", "serialize_seconds", "render_started")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.render_started = None
+
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class _RouteStats:
+    __slots__ = ("buckets", "count", "seconds", "queries", "db_seconds", "render_seconds", "serialize_seconds", "statuses")
+
+    def __init__(self, n_buckets):
+        self.buckets = [0] * (n_buckets + 1)  # last one is +Inf
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.statuses = {}
+
+    def merge(self, other):
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.seconds += other.seconds
+        self.queries += other.queries
+        self.db_seconds += other.db_seconds
+        self.render_seconds += other.render_seconds
+        self.serialize_seconds += other.serialize_seconds
+        for status, n in list(other.statuses.items()):
+            self.statuses[status] = self.statuses.get(status, 0) + n
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=DEFAULTS["BUCKETS"]):
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._lock = threading.Lock()   # taken once per thread, to register its shard
+        self._shards = []
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, route, method, status, seconds, stats):
+        shard = self._shard()
+        entry = shard.get((route, method))
+        if entry is None:
+            entry = shard[(route, method)] = _RouteStats(len(self.buckets))
+        entry.buckets[bisect.bisect_left(self.buckets, seconds)] += 1
+        entry.count += 1
+        entry.seconds += seconds
+        entry.queries += stats.queries
+        entry.db_seconds += stats.db_seconds
+        entry.render_seconds += stats.render_seconds
+        entry.serialize_seconds += stats.serialize_seconds
+        status_class = f"{status // 100}xx"
+        entry.statuses[status_class] = entry.statuses.get(status_class, 0) + 1
+
+    def snapshot(self):
+        """{(route, method): _RouteStats} summed over every thread's shard."""
+        with self._lock:
+            shards = list(self._shards)
+        totals = {}
+        for shard in shards:
+            # a thread may add a key while we read: copy the items first
+            for key, entry in list(shard.items()):
+                if key not in totals:
+                    totals[key] = _RouteStats(len(self.buckets))
+                totals[key].merge(entry)
+        return totals
+
+    def clear(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+
+    def render(self):
+        """The snapshot in Prometheus text exposition format (0.0.4)."""
+        snapshot = sorted(self.snapshot().items())
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("api_request_duration_seconds", "histogram", "Request latency by route.")
+        for (route, method), entry in snapshot:
+            labels = _labels(route=route, method=method)
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), entry.buckets):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"api_request_duration_seconds_bucket{{{labels},le=\"{le}\"}} {cumulative}")
+            lines.append(f"api_request_duration_seconds_sum{{{labels}}} {entry.seconds!r}")
+            lines.append(f"api_request_duration_seconds_count{{{labels}}} {entry.count}")
+
+        family("api_requests_total", "counter", "Requests by route and status class.")
+        for (route, method), entry in snapshot:
+            for status, n in sorted(entry.statuses.items()):
+                lines.append(f"api_requests_total{{{_labels(route=route, method=method, status=status)}}} {n}")
+
+        for name, attribute, help_text in (
+            ("api_db_queries_total", "queries", "SQL statements executed by route."),
+            ("api_db_duration_seconds_total", "db_seconds", "Time spent executing SQL by route."),
+            ("api_render_duration_seconds_total", "render_seconds", "Time spent rendering response bodies by route."),
+            ("api_serialize_duration_seconds_total", "serialize_seconds", "Time spent in compiled list serializers by route."),
+        ):
+            family(name, "counter", help_text)
+            for (route, method), entry in snapshot:
+                lines.append(f"{name}{{{_labels(route=route, method=method)}}} {getattr(entry, attribute)!r}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+registry = MetricsRegistry(metrics_settings()["BUCKETS"])
+
+
+# -------------------------
+# recording hooks
+# -------------------------
+def count_queries(execute, sql, params, many, context):
+    """Database execute wrapper: counts statements and their time against the current request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def install_query_counter(sender=None, connection=None, **kwargs):
+    """connection_created receiver: every new connection gets count_queries."""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+@contextmanager
+def timed_serialization():
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = metrics_settings()["ENABLED"]
+        if self.enabled:
+            connection_created.connect(install_query_counter, dispatch_uid="config.metrics")
+            # connections this thread opened before the middleware was loaded
+            for connection in connections.all(initialized_only=True):
+                install_query_counter(connection=connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _record(self, request, response, started, stats):
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match is not None else UNMATCHED
+        registry.observe(route, request.method, response.status_code, time.perf_counter() - started, stats)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, started, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, started, stats)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this returns
+        stats = _current.get()
+        if stats is not None:
+            stats.render_started = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self._rendered(stats))
+        return response
+
+    @staticmethod
+    def _rendered(stats):
+        stats.render_seconds += time.perf_counter() - stats.render_started
+
+
+class MetricsView(APIView):
+    """GET /api/metrics: the registry in Prometheus text format."""
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,215 @@
+import bisect
+import heapq
+from operator import attrgetter
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+def keyset_filter(created_at, pk, reverse=False):
+    """
+    Rows strictly after (created_at, pk) in newest-first order
+    (or strictly before it when walking backwards).
+
+    Written as `created_at <= c AND (created_at < c OR id < pk)` so the
+    leading column stays a plain range the (created_at, id) index can seek.
+    """
+    if reverse:
+        return Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(id__gt=pk))
+    return Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(id__lt=pk))
+
+
+def encode_position(created_at, pk):
+    return f"{created_at.isoformat()}|{pk}"
+
+
+def decode_position(position):
+    try:
+        raw_created_at, raw_pk = position.rsplit("|", 1)
+        created_at = parse_datetime(raw_created_at)
+        pk = int(raw_pk)
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if created_at is None:
+        return None
+    return created_at, pk
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Opaque cursor pagination ordered on (created_at, id), newest first.
+
+    Every page is one index range probe with LIMIT page_size + 1:
+    no COUNT(*) and no OFFSET, so page 1000 costs the same as page 1.
+
+    Old clients can send `?legacy=1` to get the previous flat list.
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-created_at", "-id")
+    legacy_query_param = "legacy"
+
+    def is_legacy(self, request):
+        return request.query_params.get(self.legacy_query_param, "").lower() in ("1", "true", "yes")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_legacy(request):
+            return None
+        queryset, reverse = self._page_query(queryset, request)
+        return self._set_page(list(queryset), reverse)
+
+    def paginate_lean(self, queryset, request, lean):
+        """paginate_queryset() that reads the page as `.values_list()` rows through a
+        config.lean.LeanSerializer; returns the serialized dicts."""
+        if self.is_legacy(request):
+            return None
+        queryset, reverse = self._page_query(queryset, request)
+        return [row.data for row in self._set_page(lean.rows(queryset), reverse)]
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views (config/async_api.py): same probe, async ORM."""
+        if self.is_legacy(request):
+            return None
+        queryset, reverse = self._page_query(queryset, request)
+        return self._set_page([row async for row in queryset], reverse)
+
+    def page_state(self, queryset, request):
+        """
+        (pk, updated_at) of every row the page probe reads, the look-ahead row
+        included: a list validator that costs one LIMIT page_size + 1 probe,
+        not an aggregate over the whole set. None for legacy requests.
+        """
+        if self.is_legacy(request):
+            return None
+        queryset, _ = self._page_query(queryset, request)
+        return tuple(queryset.values_list("pk", "updated_at"))
+
+    async def apage_state(self, queryset, request):
+        if self.is_legacy(request):
+            return None
+        queryset, _ = self._page_query(queryset, request)
+        return tuple([row async for row in queryset.values_list("pk", "updated_at")])
+
+    def paginate_segments(self, segments, request):
+        """
+        paginate_queryset() over rows already in memory (ads/feed.py): disjoint
+        lists of LeanRows (or anything with .created_at / .pk), each sorted
+        oldest first.
+        Bisects every segment at the cursor and merges page_size + 1 rows.
+        """
+        if self.is_legacy(request):
+            return None
+        position, reverse = self._read_cursor(request)
+        limit = self.page_size + 1
+        key = attrgetter("created_at", "pk")
+
+        picked = []
+        for rows in segments:
+            if reverse:
+                start = bisect.bisect_right(rows, position, key=key)
+                picked.append(rows[start:start + limit])
+            else:
+                end = len(rows) if position is None else bisect.bisect_left(rows, position, key=key)
+                picked.append(rows[max(end - limit, 0):end][::-1])
+        merged = list(heapq.merge(*picked, key=key, reverse=not reverse))
+        return self._set_page(merged[:limit], reverse)
+
+    def _read_cursor(self, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = None
+        if self.cursor is not None:
+            position = decode_position(self.cursor.position)
+            if position is None:
+                raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _page_query(self, queryset, request):
+        position, reverse = self._read_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(*position, reverse=reverse))
+
+        if reverse:
+            queryset = queryset.order_by("created_at", "id")
+        else:
+            queryset = queryset.order_by("-created_at", "-id")
+        return queryset[: self.page_size + 1], reverse
+
+    def _set_page(self, rows, reverse):
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        position = encode_position(last.created_at, last.pk)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        first = self.page[0]
+        position = encode_position(first.created_at, first.pk)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+
+class RankCursorPagination(CursorPagination):
+    """
+    Forward-only opaque cursor over ranked results ordered on (score, id),
+    e.g. full-text search. `fetch(after, limit)` returns (id, score) rows
+    strictly after `after`.
+
+    Scores depend on corpus statistics, so a cursor is exact only while the
+    corpus is unchanged; between writes a page boundary may shift slightly.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_ranked(self, request, fetch):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        after = None
+        if self.cursor is not None:
+            try:
+                raw_score, raw_pk = self.cursor.position.rsplit("|", 1)
+                after = (float(raw_score), int(raw_pk))
+            except (AttributeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        rows = fetch(after, self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        pk, score = self.page[-1]
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=f"{score!r}|{pk}"))
+
+    def get_previous_link(self):
+        return None
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from config.sqlite import sqlite_options
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,10 +50,13 @@ INSTALLED_APPS = [
     "ads",
     "tickets",
     "reviews",
+    "benchmarks",
 ]
 
 MIDDLEWARE = [
+    'config.metrics.MetricsMiddleware',  # first, so its latency covers the whole stack
     'django.middleware.security.SecurityMiddleware',
+    'config.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -82,13 +88,44 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# SQLite engine profile (config/sqlite.py): WAL, synchronous=NORMAL, busy timeout,
+# BEGIN IMMEDIATE for atomic(), mmap / page cache / in-memory temp tables
+SQLITE_PROFILE = {
+    "JOURNAL_MODE": "WAL",
+    "SYNCHRONOUS": "NORMAL",
+    "BUSY_TIMEOUT_MS": 5000,
+    "TRANSACTION_MODE": "IMMEDIATE",
+    "MMAP_SIZE": 256 * 1024 * 1024,
+    "CACHE_SIZE_KIB": 64 * 1024,
+    "TEMP_STORE": "MEMORY",
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': sqlite_options(SQLITE_PROFILE),
     }
 }
 
+# Read replicas (config/db_router.py): safe-method requests read from these aliases,
+# writes and a client's reads right after its writes go to "default".
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+READ_REPLICAS = {
+    "ALIASES": [],
+    "PIN_SECONDS": 5,
+}
+
+# Local replica: DJANGO_READ_REPLICA=1, refreshed from db.sqlite3 with `python manage.py sync_replica`
+if os.environ.get("DJANGO_READ_REPLICA"):
+    DATABASES["replica"] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'OPTIONS': sqlite_options(SQLITE_PROFILE),
+        'TEST': {'MIRROR': 'default'},
+    }
+    READ_REPLICAS["ALIASES"] = ["replica"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -130,7 +167,17 @@ STATIC_URL = 'static/'
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.ClaimsJWTAuthentication",
+    ),
+    # orjson when installed, DRF's stdlib JSON otherwise (config/json_codec.py)
+    "DEFAULT_RENDERER_CLASSES": (
+        "config.json_codec.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "config.json_codec.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
 }
 
@@ -146,3 +193,44 @@ SIMPLE_JWT = {
     "ALGORITHM": "HS256",
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=2),
 }
+
+# How long a user's token_version is cached by ClaimsJWTAuthentication (seconds).
+# Revocations are immediate within a process; across processes they need a shared CACHES backend.
+TOKEN_VERSION_CACHE_TTL = 60
+
+# Thread pool for password hashing in the async auth views (accounts/hashing.py)
+PASSWORD_HASH_POOL = {
+    "WORKERS": 4,
+    "MAX_PENDING": 32,
+}
+
+# Server-Sent Events hub behind /api/events/ (config/events.py); one per process
+EVENT_STREAM = {
+    "BACKLOG": 100,
+    "MAX_PENDING": 1000,
+    "KEEPALIVE": 15,
+}
+
+# Contractor profile documents (accounts/cache.py)
+CONTRACTOR_PROFILE_CACHE = {
+    "ENABLED": None,  # None: on only when SHARED_CACHE is shared between processes (see accounts/cache.py)
+    "MAX_ENTRIES": 1024,
+    "TTL": 300,
+    "SHARED_CACHE": None,  # set to a CACHES alias to share documents between workers
+    "STALE_WHILE_REVALIDATE": False,
+}
+
+# Per-route request metrics at /api/metrics (config/metrics.py)
+METRICS = {
+    "ENABLED": True,
+    "BUCKETS": (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+}
+
+# Cached /api/ads/ listing (ads/feed.py)
+ADS_FEED_CACHE = {
+    "ENABLED": None,  # None: on only when SHARED_CACHE is shared between processes (see ads/feed.py)
+    "MAX_SHARED_ROWS": 5000,
+    "MAX_USERS": 10000,
+    "TTL": 60,
+    "SHARED_CACHE": None,  # set to a CACHES alias so every worker sees generation bumps
+}
@@ -0,0 +1,65 @@
+# config/sse.py
+"""
+GET /api/events/ — Server-Sent Events for the current user (ASGI only).
+
+Replaces polling for assignment, job status and ticket replies. Each event is
+
+    id: <opaque id>
+    event: ad | work_request | ticket | reset
+    data: <json>
+
+Reconnect with the `Last-Event-ID` header (or `?last_event_id=`) to resume.
+A `reset` event means the missed events are gone: refetch, then carry on.
+Idle streams get a comment every EVENT_STREAM["KEEPALIVE"] seconds.
+"""
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
+
+from accounts.authentication import ClaimsJWTAuthentication
+
+from .events import hub
+
+RETRY_MS = 3000
+
+
+async def event_stream(sub, replay, reset_seq):
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if reset_seq is not None:
+            yield f"id: {hub.event_id(reset_seq)}\nevent: reset\ndata: {{}}\n\n"
+        for event in replay:
+            yield hub.encode(event)
+        while not sub.lagged:
+            batch = await sub.next_batch(hub.keepalive)
+            if not batch and not sub.lagged:
+                yield ": keepalive\n\n"
+            for event in batch:
+                yield hub.encode(event)
+        # too slow to keep up: end the stream, the client resumes from the backlog
+    finally:
+        hub.unsubscribe(sub)
+
+
+class EventStreamView(View):
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            # under WSGI Django drains an async iterator into a list: the stream would never end,
+            # and the events would go to the event loop async_to_sync has already closed
+            return JsonResponse({"detail": "The event stream needs an ASGI server."}, status=501)
+        try:
+            auth = await ClaimsJWTAuthentication().aauthenticate(request)
+        except AuthenticationFailed as e:
+            return JsonResponse(e.detail if isinstance(e.detail, dict) else {"detail": e.detail}, status=401)
+        if auth is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+        user = auth[0]
+        last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+        sub, replay, reset_seq = hub.subscribe(user.pk, last_event_id)
+
+        response = StreamingHttpResponse(event_stream(sub, replay, reset_seq), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+        return response
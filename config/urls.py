@@ -20,9 +20,14 @@ from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework.routers import DefaultRouter
 
+from ads.async_views import AsyncAdDetailView, AsyncAdListView
 from ads.views import AdViewSet, WorkRequestViewSet
+from tickets.async_views import AsyncTicketListView
 from tickets.views import TicketViewSet
 
+from .metrics import MetricsView
+from .sse import EventStreamView
+
 
 router = DefaultRouter()
 router.register(r"ads", AdViewSet, basename="ads")
@@ -32,7 +37,13 @@ router.register(r"tickets", TicketViewSet, basename="tickets")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    # async read variants for ASGI deployments; ahead of the router, whose ads/<pk>/ would match "async"
+    path("api/ads/async/", AsyncAdListView.as_view()),
+    path("api/ads/<int:pk>/async/", AsyncAdDetailView.as_view()),
+    path("api/tickets/async/", AsyncTicketListView.as_view()),
     path("api/", include(router.urls)),
+    path("api/events/", EventStreamView.as_view()),  # SSE, ASGI only
+    path("api/metrics", MetricsView.as_view()),  # Prometheus text format, admins only
     path("api/", include("accounts.urls")),
     path("api/", include("ads.urls")),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
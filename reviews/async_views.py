@@ -0,0 +1,32 @@
+# reviews/async_views.py
+"""Native async contractor reviews for the ASGI stack (see config/async_api.py)."""
+from django.db.models import Avg, Count, Max
+from rest_framework.exceptions import NotFound
+
+from accounts.models import User
+from config.async_api import AsyncAPIView, json_response
+from config.conditional import make_etag, not_modified, set_validators
+
+from .models import Review
+from .serializers import ReviewSerializer
+from .views import filter_reviews
+
+
+class AsyncContractorReviewsView(AsyncAPIView):
+    async def get(self, request, contractor_id):
+        if not await User.objects.filter(id=contractor_id, role=User.Role.CONTRACTOR).aexists():
+            raise NotFound("Contractor not found")
+
+        qs = filter_reviews(Review.objects.filter(contractor_id=contractor_id).order_by("-created_at"), request.query_params)
+
+        state = await qs.order_by().aaggregate(count=Count("pk"), avg=Avg("rating"), last=Max("updated_at"))
+        etag = make_etag("contractor-reviews", request.get_full_path(), state["count"], state["last"])
+        response = not_modified(request, etag)
+        if response is None:
+            response = json_response({
+                "contractor_id": contractor_id,
+                "review_count": state["count"],
+                "avg_rating": float(state["avg"] or 0),
+                "reviews": ReviewSerializer([r async for r in qs], many=True).data,
+            })
+        return set_validators(response, etag)
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 01:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0005_ad_ad_creator_created_idx_ad_ad_contractor_sched_idx_and_more'),
+        ('reviews', '0002_alter_review_rating'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['contractor', 'created_at'], name='review_contractor_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_review_review_contractor_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
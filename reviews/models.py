@@ -24,6 +24,13 @@ class Review(models.Model):
     rating = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
 
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # contractor reviews / profile: contractor=? ORDER BY created_at DESC
+            models.Index(fields=["contractor", "created_at"], name="review_contractor_created_idx"),
+        ]
+
     def __str__(self):
       return f"Review #{self.id} ({self.rating})"
\ No newline at end of file
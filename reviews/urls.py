@@ -1,6 +1,8 @@
 from django.urls import path
 from .views import ContractorReviewsAPIView
+from .async_views import AsyncContractorReviewsView
 
 urlpatterns = [
     path("contractors/<int:contractor_id>/reviews/", ContractorReviewsAPIView.as_view()),
+    path("contractors/<int:contractor_id>/reviews/async/", AsyncContractorReviewsView.as_view()),
 ]
@@ -1,14 +1,42 @@
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Max
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound, ValidationError
 
 from accounts.models import User
+from config.conditional import make_etag, not_modified, set_validators
+from config.lean import lean
 from .models import Review
 from .serializers import ReviewSerializer
 
 
+def filter_reviews(qs, params):
+    """Apply ?rating= / ?min_rating= (1..5) to a review queryset."""
+    rating = params.get("rating")
+    min_rating = params.get("min_rating")
+
+    if rating is not None:
+        try:
+            rating = int(rating)
+        except ValueError:
+            raise ValidationError({"rating": "Must be an integer"})
+        if rating < 1 or rating > 5:
+            raise ValidationError({"rating": "Must be between 1 and 5"})
+        qs = qs.filter(rating=rating)
+
+    if min_rating is not None:
+        try:
+            min_rating = int(min_rating)
+        except ValueError:
+            raise ValidationError({"min_rating": "Must be an integer"})
+        if min_rating < 1 or min_rating > 5:
+            raise ValidationError({"min_rating": "Must be between 1 and 5"})
+        qs = qs.filter(rating__gte=min_rating)
+
+    return qs
+
+
 class ContractorReviewsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -18,32 +46,17 @@ class ContractorReviewsAPIView(APIView):
         except User.DoesNotExist:
             raise NotFound("Contractor not found")
 
-        qs = Review.objects.filter(contractor=contractor).order_by("-created_at")
-
-        rating = request.query_params.get("rating")
-        min_rating = request.query_params.get("min_rating")
-
-        if rating is not None:
-            try:
-                rating = int(rating)
-            except ValueError:
-                raise ValidationError({"rating": "Must be an integer"})
-            if rating < 1 or rating > 5:
-                raise ValidationError({"rating": "Must be between 1 and 5"})
-            qs = qs.filter(rating=rating)
-
-        if min_rating is not None:
-            try:
-                min_rating = int(min_rating)
-            except ValueError:
-                raise ValidationError({"min_rating": "Must be an integer"})
-            if min_rating < 1 or min_rating > 5:
-                raise ValidationError({"min_rating": "Must be between 1 and 5"})
-            qs = qs.filter(rating__gte=min_rating)
-
-        return Response({
-            "contractor_id": contractor.id,
-            "review_count": qs.count(),
-            "avg_rating": float(qs.aggregate(avg=Avg("rating"))["avg"] or 0),
-            "reviews": ReviewSerializer(qs, many=True).data,
-        })
+        qs = filter_reviews(Review.objects.filter(contractor=contractor).order_by("-created_at"), request.query_params)
+
+        # one aggregate gives both the numbers and the validator
+        state = qs.order_by().aggregate(count=Count("pk"), avg=Avg("rating"), last=Max("updated_at"))
+        etag = make_etag("contractor-reviews", request.get_full_path(), state["count"], state["last"])
+        response = not_modified(request, etag)
+        if response is None:
+            response = Response({
+                "contractor_id": contractor.id,
+                "review_count": state["count"],
+                "avg_rating": float(state["avg"] or 0),
+                "reviews": lean(ReviewSerializer).serialize(qs),
+            })
+        return set_validators(response, etag)
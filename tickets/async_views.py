@@ -0,0 +1,14 @@
+# tickets/async_views.py
+"""Native async ticket list for the ASGI stack (see config/async_api.py)."""
+from config.async_api import AsyncListView
+
+from .serializers import TicketSerializer
+from .views import visible_tickets
+
+
+class AsyncTicketListView(AsyncListView):
+    serializer_class = TicketSerializer
+    basename = "tickets"
+
+    def get_queryset(self):
+        return visible_tickets(self.request.user)
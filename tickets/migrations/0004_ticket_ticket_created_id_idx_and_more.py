@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-17 01:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0004_ad_ad_created_id_idx'),
+        ('tickets', '0003_remove_ticket_response_remove_ticket_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['created_at', 'id'], name='ticket_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['creator', 'created_at', 'id'], name='ticket_creator_created_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-17 02:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0009_updated_at'),
+        ('tickets', '0004_ticket_ticket_created_id_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['updated_at'], name='ticket_updated_idx'),
+        ),
+    ]
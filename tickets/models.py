@@ -35,6 +35,16 @@ class Ticket(models.Model):
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_OPEN)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # keyset pagination: support sees all, everyone else only their own
+            models.Index(fields=["created_at", "id"], name="ticket_created_id_idx"),
+            models.Index(fields=["creator", "created_at", "id"], name="ticket_creator_created_idx"),
+            # unpaged (?legacy=1) list validators (support): COUNT/MAX(updated_at) from the index alone
+            models.Index(fields=["updated_at"], name="ticket_updated_idx"),
+        ]
 
     def __str__(self):
         return f"Ticket #{self.id} - {self.status}"
@@ -0,0 +1,41 @@
+# tickets/tests/test_tickets_conditional_get.py
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from accounts.tokens import RoleRefreshToken
+
+User = get_user_model()
+
+
+def create_user(username, role, phone):
+    return User.objects.create(username=username, email=f"{username}@test.com", phone=phone, role=role)
+
+
+class TicketConditionalGetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = create_user("tcg_customer", "CUSTOMER", "09127780001")
+        cls.support = create_user("tcg_support", "SUPPORT", "09127780002")
+
+    def auth(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(user).access_token}")
+
+    def test_reply_invalidates_the_customers_copy(self):
+        self.auth(self.customer)
+        r = self.client.post("/api/tickets/", {"title": "help", "message": "it broke"}, format="json")
+        self.assertEqual(r.status_code, 201)
+        url = f"/api/tickets/{r.data['id']}/"
+
+        detail_etag = self.client.get(url)["ETag"]
+        list_etag = self.client.get("/api/tickets/")["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 304)
+        self.assertEqual(self.client.get("/api/tickets/", HTTP_IF_NONE_MATCH=list_etag).status_code, 304)
+
+        self.auth(self.support)
+        self.assertEqual(self.client.post(f"{url}reply/", {"support_reply": "fixed"}, format="json").status_code, 200)
+
+        self.auth(self.customer)
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["support_reply"], "fixed")
+        self.assertEqual(self.client.get("/api/tickets/", HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
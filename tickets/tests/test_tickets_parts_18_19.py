@@ -4,6 +4,8 @@ from django.contrib.auth.models import Group
 from rest_framework.test import APITestCase
 from rest_framework import status
 
+from config.events import hub
+
 User = get_user_model()
 
 
@@ -63,13 +65,13 @@ class TicketTests(APITestCase):
         self.as_user("tix_customer")
         r = self.client.get("/api/tickets/")
         self.assertEqual(r.status_code, 200)
-        for t in r.data:
+        for t in r.data["results"]:
             self.assertEqual(t["creator_id"], self.customer.id)
 
         self.as_user("tix_support")
         r2 = self.client.get("/api/tickets/")
         self.assertEqual(r2.status_code, 200)
-        self.assertGreaterEqual(len(r2.data), len(r.data))
+        self.assertGreaterEqual(len(r2.data["results"]), len(r.data["results"]))
 
     def test_part19_only_support_can_reply_once(self):
         # create ticket
@@ -109,3 +111,26 @@ class TicketTests(APITestCase):
         self.assertEqual(r2.status_code, 200)
         self.assertIn("support_reply", r2.data)
         self.assertNotEqual(r2.data["support_reply"], "hack")
+
+    def test_ticket_list_legacy_flag_returns_flat_list(self):
+        self.as_user("tix_customer")
+        self.client.post("/api/tickets/", {"title": "L", "message": "L", "ad": None}, format="json")
+
+        r = self.client.get("/api/tickets/?legacy=1")
+        self.assertEqual(r.status_code, 200)
+        self.assertIsInstance(r.data, list)
+        self.assertEqual(r.data[0]["creator_id"], self.customer.id)
+
+    def test_reply_is_pushed_to_the_ticket_creator(self):
+        self.as_user("tix_customer")
+        tid = self.client.post("/api/tickets/", {"title": "E", "message": "E", "ad": None}, format="json").data["id"]
+
+        self.as_user("tix_support")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/api/tickets/{tid}/reply/", {"support_reply": "On it"}, format="json")
+
+        last = hub._backlogs[self.customer.id][1][-1]
+        self.assertEqual(
+            (last.kind, last.data),
+            ("ticket", {"ticket_id": tid, "status": "IN_PROGRESS", "support_reply": "On it"}),
+        )
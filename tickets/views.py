@@ -8,16 +8,26 @@ from accounts.models import User
 from .models import Ticket
 from .serializers import TicketSerializer
 
+from config.conditional import ConditionalGetMixin
+from config.events import publish_on_commit
+from config.pagination import KeysetCursorPagination
 
-class TicketViewSet(viewsets.ModelViewSet):
+
+def visible_tickets(user):
+    """Tickets `user` can see: support/admin see all, everyone else their own."""
+    if user.role in (User.Role.SUPPORT, User.Role.ADMIN):
+        return Ticket.objects.all().order_by("-created_at")
+    return Ticket.objects.filter(creator=user).order_by("-created_at")
+
+
+class TicketViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = TicketSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    lean_list = True
 
     def get_queryset(self):
-        u = self.request.user
-        if u.role in (User.Role.SUPPORT, User.Role.ADMIN):
-            return Ticket.objects.all().order_by("-created_at")
-        return Ticket.objects.filter(creator=u).order_by("-created_at")
+        return visible_tickets(self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(creator=self.request.user)
@@ -82,4 +92,9 @@ class TicketViewSet(viewsets.ModelViewSet):
          ticket.status = Ticket.STATUS_IN_PROGRESS
 
      ticket.save()
+     publish_on_commit(
+         [ticket.creator_id],
+         "ticket",
+         {"ticket_id": ticket.id, "status": ticket.status, "support_reply": ticket.support_reply},
+     )
      return Response(TicketSerializer(ticket).data, status=200)